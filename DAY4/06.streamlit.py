@@ -1,4 +1,5 @@
 import os
+import time
 import streamlit as st
 
 from dotenv import load_dotenv
@@ -27,15 +28,27 @@ if prompt := st.chat_input("User : "):
     with st.chat_message("user"):
         st.markdown(prompt)
 
-    response_text = ""
     with st.chat_message("assistant"):
         placeholder = st.empty()
         
         #response_text = model.invoke(st.session_state["messages"].content)
         #placeholder.markdown(response_text)
        
+        # 청크마다 전체 문자열을 다시 그리지 않고 50ms 또는 512바이트마다 모아서 갱신 (첫 토큰과 마지막은 즉시)
+        parts = []
+        pending_bytes = 0
+        last_flush = None
         for chunk in model.stream(st.session_state["messages"]):
-            response_text += chunk.content
-            placeholder.markdown(response_text)
+            if not chunk.content:
+                continue
+            parts.append(chunk.content)
+            pending_bytes += len(chunk.content.encode("utf-8"))
+            now = time.monotonic()
+            if last_flush is None or now - last_flush >= 0.05 or pending_bytes >= 512:
+                placeholder.markdown("".join(parts))
+                pending_bytes = 0
+                last_flush = now
+        response_text = "".join(parts)
+        placeholder.markdown(response_text)
 
     st.session_state["messages"].append({"role":"assistant", "content": response_text})
\ No newline at end of file
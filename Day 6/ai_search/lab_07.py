@@ -1,8 +1,15 @@
 import os
+import sys
+from pathlib import Path
+
 import openai
 from azure.search.documents import SearchClient
 from azure.core.credentials import AzureKeyCredential
 
+# MVP 프로젝트의 검색 서비스 모듈(modules/retriever.py)을 함께 사용
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "ktds-msai-6th-mvp"))
+from modules.retriever import Retriever, RetrievalQuery
+
 # === Environment Variables ===
 AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_SERVICE_ENDPOINT", "https://winkey-openai-002.openai.azure.com")
 AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY", "YOUR_OPENAI_API_KEY")
@@ -18,11 +25,12 @@ openai.api_base = AZURE_OPENAI_ENDPOINT
 # Refer to: https://learn.microsoft.com/azure/cognitive-services/openai/reference for details.
 
 # === Retrieve Documents Using Azure Cognitive Search ===
-def retrieve_documents(query):
+# 필요한 필드(id, content)만 요청하고 상위 top_k개만 가져옵니다.
+def retrieve_documents(query, top_k=5):
     credential = AzureKeyCredential(AZURE_SEARCH_API_KEY)
     search_client = SearchClient(endpoint=AZURE_SEARCH_ENDPOINT, index_name=AZURE_INDEX_NAME, credential=credential)
-    results = search_client.search(query)
-    documents = [doc for doc in results]
+    retriever = Retriever(search_client, select=["id", "content"])
+    documents = [doc.to_dict() for doc in retriever.iter(RetrievalQuery(text=query, top_k=top_k))]
     return documents
 
 # === Generate Answer Using OpenAI Library ===
@@ -1,6 +1,7 @@
 import os
 import json
 import time
+import threading
 import streamlit as st
 from dotenv import load_dotenv
 import logging
@@ -27,6 +28,9 @@ if logger:
         logger.info("Application started: ktds-msai-mvp")
     except Exception:
         pass
+    # 모델 호출 서킷 브레이커의 상태 변화(circuit_breaker 이벤트)도 같은 App Insights로 기록 (modules/resilient_client.py)
+    from modules.resilient_client import attach_telemetry
+    attach_telemetry(logger)
 
 
 # 앱 종료 시 Application Insights에 종료 이벤트를 전송하고
@@ -121,6 +125,41 @@ if st.sidebar.button("게시글 보기"):
 UPLOAD_DIR = os.path.join("data", "uploads")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+
+# 업로드 파일의 블루/그린 재구축 상태 (프로세스 공용, 한 번에 하나만 실행)
+@st.cache_resource
+def _rebuild_job():
+    return {"lock": threading.Lock(), "running": None, "last": None}
+
+
+# 기본 코퍼스 + 지금까지 업로드한 JSON 전체로 새 인덱스를 만들어 검증 후 전환합니다. (백그라운드 스레드에서 실행)
+# 업로드 파일만으로 인덱스를 만들면 통과 시 전체 코퍼스를 대체하므로 항상 전체를 다시 색인합니다.
+def _start_upload_rebuild(save_name):
+    job = _rebuild_job()
+    with job["lock"]:
+        if job["running"]:
+            return False
+        job["running"] = save_name
+    uploads = sorted(os.path.join(UPLOAD_DIR, n) for n in os.listdir(UPLOAD_DIR) if n.lower().endswith(".json"))
+
+    def run():
+        from modules.index_rebuild import rebuild
+        try:
+            report = rebuild(extra_files=uploads)
+        except Exception as e:
+            if logger:
+                try:
+                    logger.exception(f"Rebuild failed for {save_name}: {e}")
+                except Exception:
+                    pass
+            report = {"error": str(e)}
+        with job["lock"]:
+            job["running"], job["last"] = None, {"name": save_name, **report}
+
+    threading.Thread(target=run, name="upload-rebuild", daemon=True).start()
+    return True
+
+
 uploaded_files = st.sidebar.file_uploader("인덱스할 파일을 업로드하세요", accept_multiple_files=True)
 if uploaded_files:
     if "uploaded_files" not in st.session_state:
@@ -192,10 +231,18 @@ if uploaded_files:
                                 logger.info(f"Start indexing file: {save_path}")
                             except Exception:
                                 pass
-                        asc = AzureSearchClient()
-                        asc.ensure_index_exists()
-                        res = asc.index_from_file(file_path=save_path)
-                        msg = f"인덱싱 완료: 총={res.get('total')}, 성공={res.get('success')}, 실패={res.get('failed')}"
+                        if os.getenv("AZURE_SEARCH_BLUE_GREEN", "0") == "1":
+                            # 기본 코퍼스 + 업로드 전체로 새 인덱스를 만들어 검증 후 별칭을 전환 (modules/index_rebuild.py, 백그라운드)
+                            if _start_upload_rebuild(save_name):
+                                msg = "새 인덱스 재구축을 시작했습니다. (기본 코퍼스 + 업로드 파일, 검증 후 전환)"
+                            else:
+                                msg = "이미 인덱스 재구축이 진행 중입니다. 끝난 뒤 다시 업로드해 주세요."
+                        else:
+                            # 서비스 중인 인덱스에 업로드 파일을 추가 색인
+                            asc = AzureSearchClient()
+                            asc.ensure_index_exists()
+                            res = asc.index_from_file(file_path=save_path)
+                            msg = f"인덱싱 완료: 총={res.get('total')}, 성공={res.get('success')}, 실패={res.get('failed')}"
 
                         # 잠깐 메인에 표시하고 자동으로 제거
                         #main_ph.success(f"파일 인덱싱 성공: {save_name} — {msg}")
@@ -237,6 +284,17 @@ if uploaded_files:
         except Exception as e:
             st.sidebar.error(f"파일 저장 실패: {e}")
 
+# 업로드 재구축 진행/결과 표시 (다른 세션이 시작한 재구축도 함께 보임)
+_job = _rebuild_job()
+if _job["running"]:
+    st.sidebar.info(f"인덱스 재구축 중: {_job['running']}")
+elif _job["last"]:
+    _last = _job["last"]
+    if _last.get("swapped"):
+        st.sidebar.success(f"인덱스 재구축 완료: {_last['name']} — {_last['index']}로 전환")
+    else:
+        st.sidebar.warning(f"인덱스 재구축 실패: {_last['name']} — 전환하지 않음: {_last.get('error')}")
+
 mode = st.sidebar.selectbox("모드 선택", ["Azure Search", "일반검색"])
 
 # 모드 변경 시 이전 대화 메시지 초기화
@@ -247,180 +305,114 @@ elif st.session_state["last_mode"] != mode:
     st.session_state["messages"] = []
     st.session_state["last_mode"] = mode
 
+# --- 인덱스 상태 패널 ---
+# modules/index_health.py가 수집한 기록(data/index_health.jsonl)의 최신 값과 경고를 표시합니다.
+with st.sidebar.expander("🩺 인덱스 상태", expanded=False):
+    from modules.index_health import read_history, run_check
+    if st.button("지금 점검", key="index_health_check"):
+        try:
+            with st.spinner("인덱스 상태를 수집 중입니다..."):
+                run_check(telemetry=logger)
+        except Exception as e:
+            st.error(f"점검 실패: {e}")
+    health_history = read_history(20)
+    if health_history:
+        last = health_history[-1]
+        st.caption(f"{last['ts']} · {last.get('index')}")
+        prev_docs = health_history[-2]["documents"] if len(health_history) > 1 else None
+        st.metric("문서 수", last["documents"], delta=None if prev_docs is None else last["documents"] - prev_docs)
+        if last.get("missing_vector_ratio") is None:
+            # has_vector 필드가 없는 이전 인덱스는 벡터 누락을 셀 수 없음 (index_rebuild로 다시 만들면 표시)
+            st.metric("벡터 없는 문서", "알 수 없음")
+        else:
+            st.metric("벡터 없는 문서", f"{last['missing_vector_ratio']:.1%} ({last['missing_vectors']}건)")
+        st.metric("프로브 p95", f"{last['probe']['p95_ms']:.0f} ms")
+        if last.get("storage_bytes"):
+            st.metric("저장소 / 벡터 인덱스", f"{last['storage_bytes'] / 1e6:.1f} / {(last.get('vector_index_bytes') or 0) / 1e6:.1f} MB")
+        for alert in last.get("alerts") or []:
+            st.warning(f"{alert['check']}: {alert['value']} (기준 {alert['threshold']})")
+        st.table({"카테고리": list(last["by_category"]), "문서 수": list(last["by_category"].values())})
+        st.line_chart({"프로브 p95(ms)": [h["probe"]["p95_ms"] for h in health_history]})
+    else:
+        st.caption("기록이 없습니다. '지금 점검'을 누르거나 python -m modules.index_health 를 실행하세요.")
+
+# 모델 배포의 서킷 브레이커가 열려 있으면 (예비 배포로 전환 중이거나 호출 차단) 사이드바에 표시
+from modules.resilient_client import breaker_stats
+for _target, _breaker in breaker_stats().items():
+    if _breaker["state"] != "closed":
+        st.sidebar.warning(f"🔌 {_target}: 응답 지연/오류로 호출을 잠시 멈췄습니다. ({_breaker['state']}, 연속 실패 {_breaker['consecutive_failures']}회)")
+
 # 게시글 모듈 분리 호출
 if st.session_state["show_board"]:
     try:
         from modules.newssummary import show_board
-        show_board()
+        show_board(telemetry=logger)
     except Exception as e:
         st.error(f"게시글 모듈을 로드할 수 없습니다: {e}")
     raise SystemExit  # 게시판 화면만 보여주고 종료 (이후 코드는 실행하지 않음)
 
 # --- 유틸리티 함수들 ---
-# 환경변수 키를 읽어 딕셔너리로 반환합니다.
-# 반환값 예시: {"search_endpoint": "...", "search_key": "...", "search_index": "...", ...}
-def _get_env_keys():
-    return {
-        "search_endpoint": os.getenv("AZURE_SEARCH_ENDPOINT"),
-        "search_key": os.getenv("AZURE_SEARCH_API_KEY"),
-        "search_index": os.getenv("AZURE_SEARCH_INDEX_NAME"),
-        "embedding_deployment": os.getenv("AZURE_EMBEDDING_DEPLOYMENT"),
-        "chat_deployment": "gpt-4.1-mini",
-        "azure_endpoint": os.getenv("AZURE_ENDPOINT"),
-        "openai_key": os.getenv("OPENAI_API_KEY"),
-        "openai_version": os.getenv("OPENAI_API_VERSION")
-    }
-
-# Azure Search용 SearchClient를 초기화하여 반환합니다.
-# 인자: endpoint(검색 서비스 엔드포인트), key(검색 서비스 키), index(인덱스 이름)
-# 반환: SearchClient 인스턴스 또는 초기화 실패 시 None
-def _init_search_client(endpoint, key, index):
-    if not (endpoint and key and index):
-        return None
-    try:
-        from azure.search.documents import SearchClient
-        from azure.core.credentials import AzureKeyCredential
-        return SearchClient(endpoint=endpoint, index_name=index, credential=AzureKeyCredential(key))
-    except Exception:
-        return None
-
-# 주어진 프롬프트에 대해 Azure OpenAI 임베딩을 요청하여 벡터를 반환합니다.
-# 인자: prompt(텍스트), deployment(임베딩 모델 이름), env(환경변수 딕셔너리)
-# 반환: embedding 벡터(list) 또는 실패 시 None
-def _get_embedding(prompt, deployment, env):
-    if not deployment:
-        return None
-    try:
-        import importlib
-        oa_mod = importlib.import_module("azure.ai.openai")
-        OpenAIClient = getattr(oa_mod, "OpenAIClient")
-        from azure.core.credentials import AzureKeyCredential as CoreAzureKey
-        if not (env["openai_key"] and env["azure_endpoint"]):
-            return None
-        oa_client = OpenAIClient(env["azure_endpoint"], CoreAzureKey(env["openai_key"]))
-        emb_resp = oa_client.embeddings.create(model=deployment, input=prompt)
-        return emb_resp.data[0].embedding
-    except Exception:
-        return None
-
-# Azure Search에서 프롬프트(또는 임베딩)를 사용해 문서를 검색하여 리스트로 반환합니다.
-# 인자: search_client, prompt, embedding_vector, top_k
-# 반환: 문서 dict 리스트 (id, domain, category, content, score 등)
-def _retrieve_documents(search_client, prompt, embedding_vector, top_k):
-    docs = []
-    if not search_client:
-        return docs
-    try:
-        if embedding_vector is not None:
-            try:
-                results = search_client.search(search_text="*", vector={"value": embedding_vector, "fields": "content_vector", "k": top_k})
-            except TypeError:
-                results = search_client.search(search_text="", vector={"value": embedding_vector, "fields": "content_vector", "k": top_k})
-        else:
-            results = search_client.search(search_text=prompt, top=top_k)
-
-        for r in results:
-            docs.append({
-                "id": r.get("id") or r.get("@search.documentId"),
-                "domain": r.get("domain"),
-                "category": r.get("category") or r.get("title") or "",
-                "content": r.get("content") or r.get("text") or "",
-                "score": r.get("@search.score")
-            })
-    except Exception as e:
-        st.error(f"Azure Search 조회 실패: {e}")
-    return docs
-
-def _build_context_text(retrieved_docs):
-    """
-    검색된 문서 리스트로부터 모델에 주입할 컨텍스트 텍스트를 생성합니다.
-    각 문서마다 출처 헤더를 붙여 하나의 문자열로 합쳐 반환합니다.
-    """
-    if not retrieved_docs:
-        return ""
-    parts = []
-    for i, d in enumerate(retrieved_docs):
-        header = f"[출처 {i+1}] "
-        if d.get("domain"):
-            header += d.get("domain") + " | "
-        parts.append(header + d.get("content", ""))
-    return "\n\n".join(parts)
-
-def _inject_context_into_messages(messages, context_text):
-    """
-    기존 메시지 목록에 시스템 컨텍스트 메시지를 삽입하여 반환합니다.
-    context_text가 빈 경우 원본 메시지를 그대로 반환합니다.
-    """
-    if not context_text:
-        return messages
-    system_context = {
-        "role": "system",
-        "content": (
-            "당신은 주식회사 KT의 컴플라이언스 담당자입니다.\n"
-            "사용자들의 컴플라이언스 관련 질의에 답변을 도와주는 helpful assistant입니다.\n"
-            "컴플라이언스는 기업활동에서 벌어질 수 있는 법률적, 윤리적, 재무적, 비재무적 위험요소를 사전에 억제하고 방지하는 활동을 의미합니다.\n"
-            "확실하지 않거나 답변이 없으면 모른다고 명시하세요.\n\n"
-        ) + context_text
-    }
-    msgs = [m for m in messages]
-    insert_pos = max(0, len(msgs) - 1)
-    msgs.insert(insert_pos, system_context)
-    return msgs
+# 임베딩/검색/컨텍스트 구성 등 RAG 공통 함수는 modules/rag_pipeline.py에 있습니다.
+# (벤치마크 등 Streamlit 없이 실행되는 도구와 같은 코드를 공유)
+from modules.rag_pipeline import (
+    get_env_keys,
+    init_chat_model,
+    usage_summary,
+)
+from modules.category_matcher import CategoryMatcher
+from modules.intent_gate import IntentGate
+from modules.stream_render import StreamRenderer
+from modules.category_briefs import format_briefs
+from modules.singleflight import SingleFlight
+from modules.llm_governor import LLMQueueTimeout, current_session_id, governed
+from modules.deadlines import degraded_notice
+from modules.chat_pipeline import CANNED_ANSWER, decide_scope, start_turn
 
 # 모델 스트리밍 응답을 받아 Streamlit 채팅 UI에 실시간으로 출력하고 최종 응답 텍스트를 반환합니다.
-# 인자: model(스트리밍 모델 래퍼), messages_for_model(모델에 전달할 메시지 리스트)
+# 청크마다 다시 그리지 않고 StreamRenderer가 시간 간격/누적 바이트 기준으로 모아서 갱신합니다. (첫 토큰과 마지막은 즉시)
+# 마지막 청크의 토큰 사용량(프롬프트 캐시 적중 토큰 포함)과 첫 토큰 지연을 App Insights llm_usage 이벤트로 기록합니다.
+# 인자: model(스트리밍 모델 래퍼), messages_for_model(모델에 전달할 메시지 리스트),
+#       chunks(선택: 이미 실행 중인 스트림, 예: singleflight 구독), track_usage(사용량 이벤트 기록 여부)
 # 반환: 모델이 생성한 전체 응답 문자열
-def _stream_response_to_chat(model, messages_for_model):
-    response_text = ""
+def _stream_response_to_chat(model, messages_for_model, chunks=None, track_usage=True):
+    usage, first_token_ms = None, None
+    started = time.perf_counter()
     with st.chat_message("assistant"):
         placeholder = st.empty()
+        renderer = StreamRenderer(placeholder.markdown)
+
+        def consume(stream):
+            nonlocal usage, first_token_ms
+            for chunk in stream:
+                if chunk.content and first_token_ms is None:
+                    first_token_ms = round((time.perf_counter() - started) * 1000, 1)
+                usage = usage_summary(getattr(chunk, "usage_metadata", None)) or usage
+                renderer.write(chunk.content)
+
         try:
-            for chunk in model.stream(messages_for_model):
-                response_text += chunk.content
-                placeholder.markdown(response_text)
+            if chunks is not None:
+                consume(chunks)
+            else:
+                # 직접 호출할 때는 LLM 동시 호출 제어기의 차례를 기다리며 대기 순번을 표시
+                with governed(env["chat_deployment"], messages_for_model, current_session_id(), "interactive",
+                              on_wait=lambda position: placeholder.info(f"⏳ 요청이 많아 대기 중입니다. 현재 {position}번째 순서입니다."),
+                              telemetry=logger) as ticket:
+                    placeholder.empty()
+                    consume(model.stream(messages_for_model))
+                    if ticket is not None and usage:
+                        ticket.used_tokens = usage["input_tokens"] + usage["output_tokens"]
+        except LLMQueueTimeout as e:
+            st.warning(f"{e} 잠시 후 다시 시도해 주세요.")
         except Exception as e:
             st.error(f"모델 호출 중 오류: {e}")
+        response_text = renderer.close()
+    if usage and logger and track_usage:
+        try:
+            logger.track_event("llm_usage", dict(usage, first_token_ms=first_token_ms, source="chat"))
+        except Exception:
+            pass
     return response_text
 
-# LangChain 기반 AzureChatOpenAI 모델을 초기화하여 반환합니다.
-# 인자: env(환경변수 딕셔너리), deployment(챗 모델 배포 이름)
-# 반환: 모델 인스턴스 또는 실패 시 None
-def _init_chat_model(env, deployment):
-    try:
-        from langchain_openai import AzureChatOpenAI
-        return AzureChatOpenAI(
-            azure_endpoint=env["azure_endpoint"],
-            api_key=env["openai_key"],
-            api_version=env["openai_version"],
-            azure_deployment=deployment
-        )
-    except Exception as e:
-        st.error(f"모델 초기화 실패: {e}")
-        return None
-
-# 로컬 JSON에서 카테고리명을 읽어 리스트로 반환합니다.
-# 반환값에는 원본 '번호. 이름'과 번호를 제거한 단축명(예: '산업안전보건')을 모두 포함합니다.
-def _load_local_categories(path="data/9_field.json"):
-    cats = []
-    try:
-        if os.path.exists(path):
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            if isinstance(data, list):
-                for item in data:
-                    c = item.get("category")
-                    if c:
-                        cats.append(c)
-                        # 숫자 접두사 제거 (예: '7. 산업안전보건' -> '산업안전보건')
-                        short = c
-                        if "." in c:
-                            short = c.split(".", 1)[1].strip()
-                        cats.append(short)
-    except Exception:
-        # 실패해도 빈 리스트 반환
-        return []
-    return list(dict.fromkeys([c for c in cats if c]))
-
 
 def _format_messages_for_slack(messages):
     # 간단한 텍스트로 변환: 역할 구분과 내용
@@ -459,10 +451,33 @@ if "rag_top_k" not in st.session_state:
     st.session_state["rag_top_k"] = 5
 
 # 화면 렌더링
-env = _get_env_keys()
+env = get_env_keys()
+
+# 로컬 JSON의 카테고리 이름/동의어로 만든 매처 (rerun마다 다시 만들지 않도록 캐시)
+@st.cache_resource
+def _load_category_matcher():
+    return CategoryMatcher.from_file()
+
+
+CATEGORY_MATCHER = _load_category_matcher()
+
+
+# 컴플라이언스 무관 질문을 검색 전에 걸러내는 로컬 분류기 (앱 시작 시 한 번 학습)
+@st.cache_resource
+def _load_intent_gate():
+    return IntentGate.from_files()
+
+
+INTENT_GATE = _load_intent_gate()
+
+
+@st.cache_resource
+def _load_single_flight():
+    return SingleFlight()
+
+
+SINGLE_FLIGHT = _load_single_flight()
 
-# 로컬 JSON에서 카테고리 목록을 미리 로드
-LOCAL_CATEGORIES = _load_local_categories()
 
 if mode == "Azure Search":
     if not (env["search_endpoint"] and env["search_key"] and env["search_index"]):
@@ -470,7 +485,7 @@ if mode == "Azure Search":
     else:
         st.title("😀컴플라이언스 챗봇")
         st.caption("Azure AI Search와 OpenAI GPT-4.1-mini를 활용한 실시간 컴플라이언스 RAG 챗봇입니다.")
-        model = _init_chat_model(env, env["chat_deployment"])
+        model = init_chat_model(env, env["chat_deployment"], on_error=st.error)
         if not model:
             st.error("챗봇 모델을 초기화할 수 없습니다.")
         else:
@@ -487,24 +502,35 @@ if mode == "Azure Search":
 
                 # 사용자 블록 종료 후 검색 및 모델 호출 로직을 실행하여
                 # assistant 메시지가 별도의 채팅 블록으로 렌더되도록 합니다.
-                search_client = _init_search_client(env["search_endpoint"], env["search_key"], env["search_index"])
-                embedding_vector = _get_embedding(prompt, env["embedding_deployment"], env)
                 top_k = int(st.session_state.get("rag_top_k", 5))
-                # 카테고리 개요 요청 판별: 로컬 카테고리 이름이 프롬프트에 포함된 경우
-                is_category_overview = any(cat in prompt for cat in LOCAL_CATEGORIES)
-
-                if is_category_overview:
-                    # agg 문서(item_index == -1)를 우선 조회하여 카테고리 설명을 확보
-                    retrieved_docs = _retrieve_documents(search_client, prompt, embedding_vector, top_k)
-                    # 필터링 없이 이미 index에서 agg_doc가 생성되어 있으면 포함되어야 함
-                else:
-                    retrieved_docs = _retrieve_documents(search_client, prompt, embedding_vector, top_k)
-
-                if not retrieved_docs:
-                    canned = "컴플라이언스 관련 문의에 대해서만 답변을 제공하고 있음을 안내드립니다.\n그 외의 문의사항은 답변이 어려운 점 양해 부탁드립니다."
-                    st.info(canned)
+                # 검색 계획/의도 판별 → 동일 질문 합치기 → 검색 → 모델 라우팅 → 스트리밍은 modules/chat_pipeline.py에서 실행
+                # (부하 생성기 modules/load_gen.py도 같은 코드로 질문을 처리)
+                category_plan, in_scope = decide_scope(CATEGORY_MATCHER, INTENT_GATE, prompt, top_k, telemetry=logger)
+                flight, leader = start_turn(SINGLE_FLIGHT, prompt, category_plan, in_scope, top_k, model,
+                                            list(st.session_state["messages"]), current_session_id(), env, telemetry=logger)
+                try:
+                    meta = flight.wait_meta()
+                except Exception as e:
+                    st.error(f"검색 중 오류: {e}")
+                    meta = {}
+                for message in meta.get("errors") or []:
+                    st.error(message)
+                briefs = meta.get("briefs") or []
+                retrieved_docs = meta.get("docs") or []
+                # 임베딩/검색 단계가 마감을 넘겨 축소된 경우 안내 (첫 토큰 지연 안내는 답변 본문에 포함)
+                notice = degraded_notice([d for d in meta.get("degraded") or [] if d["stage"] != "first_token"])
+                if notice:
+                    st.warning(f"⚠️ {notice}")
+
+                if briefs:
+                    answer = format_briefs(briefs)
+                    with st.chat_message("assistant"):
+                        st.markdown(answer)
+                    st.session_state["messages"].append({"role": "assistant", "content": answer})
+                elif not retrieved_docs:
+                    st.info(CANNED_ANSWER)
                     # 모델을 호출하지 않고 고정 응답을 대화 이력에 추가
-                    st.session_state["messages"].append({"role": "assistant", "content": canned})
+                    st.session_state["messages"].append({"role": "assistant", "content": CANNED_ANSWER})
                 else:
                     st.subheader(f"검색 결과 ({len(retrieved_docs)})")
                     for d in retrieved_docs:
@@ -514,10 +540,15 @@ if mode == "Azure Search":
                             content = (d.get("content") or "").lstrip()  # 선행 공백 제거
                             st.text(content)  # 또는 st.write(content) / st.markdown(content) 대신 st.text 사용
 
-                    context_text = _build_context_text(retrieved_docs)
-                    messages_for_model = _inject_context_into_messages(st.session_state["messages"], context_text)
-
-                    response_text = _stream_response_to_chat(model, messages_for_model)
+                    # 모델 호출 차례를 기다리는 동안 대기 순번 표시
+                    wait_box = st.empty()
+                    while not flight.wait_started(0.3):
+                        position = flight.status.get("queue_position")
+                        if position:
+                            wait_box.info(f"⏳ 요청이 많아 대기 중입니다. 현재 {position}번째 순서입니다.")
+                    wait_box.empty()
+                    # 토큰은 run_rag_pipeline(modules/chat_pipeline.py)이 한 번만 생성하고, 구독한 모든 세션에 같은 순서로 전달됨
+                    response_text = _stream_response_to_chat(model, None, chunks=flight.stream(), track_usage=leader)
                     # 모델이 생성한 응답을 세션 이력에 저장하여 다음 질문 시 이전 답변이 유지되게 함
                     try:
                         if response_text:
@@ -531,7 +562,7 @@ else:
     # 챗봇 기본 화면 (RAG 없음)
     st.title("ktds-msai-6th-mvp 🤖")
     st.caption("Azure OpenAI의 최신 GPT-4.1-mini 모델을 사용한 스트리밍 챗봇입니다.")
-    model = _init_chat_model(env, "gpt-4.1-mini")
+    model = init_chat_model(env, "gpt-4.1-mini", on_error=st.error)
     if not model:
         st.error("챗봇 모델을 초기화할 수 없습니다.")
     else:
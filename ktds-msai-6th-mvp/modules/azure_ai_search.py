@@ -13,6 +13,7 @@ RAG 파이프라인을 위한 벡터 검색 및 문서 인덱싱 담당
 
 import os
 import json
+import hashlib
 import logging
 from typing import Dict, List, Optional
 
@@ -30,6 +31,10 @@ from azure.search.documents.indexes.models import (
 	VectorSearchAlgorithmKind,
 	VectorSearchAlgorithmMetric,
 	HnswAlgorithmConfiguration,
+	ScalarQuantizationCompression,
+	BinaryQuantizationCompression,
+	RescoringOptions,
+	VectorSearchCompressionRescoreStorageMethod,
 )
 
 from dotenv import load_dotenv
@@ -38,6 +43,153 @@ load_dotenv()
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# HNSW 파라미터 프로필 (modules/hnsw_tuner.py가 측정 후 저장). 파일이 없으면 기본값 사용
+HNSW_PROFILE_PATH = os.getenv("AZURE_SEARCH_HNSW_PROFILE") or os.path.join("data", "hnsw_profile.json")
+DEFAULT_HNSW_PARAMETERS = {"m": 4, "efConstruction": 400, "efSearch": 500}
+# Azure AI Search가 허용하는 HNSW 파라미터 범위
+HNSW_PARAMETER_RANGES = {"m": (4, 10), "efConstruction": (100, 1000), "efSearch": (100, 1000)}
+
+# 임베딩 차원 (rag_pipeline과 같은 AZURE_EMBEDDING_DIMENSIONS 사용, 0이면 모델 기본 차원=1536)
+EMBEDDING_DIMENSIONS = int(os.getenv("AZURE_EMBEDDING_DIMENSIONS") or 1536) or 1536
+# 벡터 압축: none | scalar(int8) | binary(1bit). 압축 시 원본 벡터로 재채점(rescoring)
+VECTOR_COMPRESSION = (os.getenv("AZURE_SEARCH_VECTOR_COMPRESSION") or "none").strip().lower()
+RESCORE_OVERSAMPLING = float(os.getenv("AZURE_SEARCH_RESCORE_OVERSAMPLING") or 4.0)
+
+
+def load_hnsw_parameters(path: str = None) -> Dict:
+	"""HNSW 프로필 JSON을 읽어 m/efConstruction/efSearch를 반환 (허용 범위를 벗어나면 범위 안으로 보정)"""
+	params = dict(DEFAULT_HNSW_PARAMETERS)
+	path = path or HNSW_PROFILE_PATH
+	if not os.path.exists(path):
+		return params
+	try:
+		with open(path, "r", encoding="utf-8") as f:
+			profile = json.load(f)
+	except Exception:
+		logger.exception(f"HNSW 프로필 로드 실패 - 기본값 사용: {path}")
+		return params
+	for key, (lo, hi) in HNSW_PARAMETER_RANGES.items():
+		value = profile.get(key)
+		if value is None:
+			continue
+		clamped = max(lo, min(hi, int(value)))
+		if clamped != value:
+			logger.warning(f"HNSW {key}={value}는 허용 범위({lo}~{hi})를 벗어나 {clamped}로 보정합니다.")
+		params[key] = clamped
+	logger.info(f"HNSW 프로필 적용: {path} -> {params}")
+	return params
+
+
+# 확인한 인덱스의 스키마 지문 캐시 {(endpoint, 인덱스 이름): 지문}. ensure_index_exists가 매번 get_index를 호출하지 않도록 함
+_INDEX_STATE: Dict[tuple, str] = {}
+
+
+def schema_fingerprint(index: SearchIndex) -> str:
+	"""필드 이름/타입/벡터 차원으로 만든 스키마 지문 (HNSW 등 알고리즘 파라미터는 제외)"""
+	fields = sorted(
+		(f.name, str(f.type), getattr(f, "vector_search_dimensions", None) or 0)
+		for f in (index.fields or [])
+	)
+	return hashlib.sha256(json.dumps(fields).encode("utf-8")).hexdigest()[:16]
+
+
+def build_vector_compressions(kind: str = None) -> List:
+	"""압축 방식 이름으로 VectorSearch.compressions 목록을 만든다 (none이면 빈 목록)
+
+	- 검색은 압축 벡터로 빠르게 수행하고, 상위 후보를 oversampling 배수만큼 더 뽑아
+	  보존한 원본(full precision) 벡터로 다시 점수를 매겨 recall 손실을 줄입니다.
+	"""
+	kind = (kind or VECTOR_COMPRESSION).lower()
+	if kind in ("", "none"):
+		return []
+	rescoring = RescoringOptions(
+		enable_rescoring=True,
+		default_oversampling=RESCORE_OVERSAMPLING,
+		rescore_storage_method=VectorSearchCompressionRescoreStorageMethod.PRESERVE_ORIGINALS,
+	)
+	if kind == "scalar":
+		return [ScalarQuantizationCompression(compression_name="default-compression", rescoring_options=rescoring)]
+	if kind == "binary":
+		return [BinaryQuantizationCompression(compression_name="default-compression", rescoring_options=rescoring)]
+	raise ValueError(f"지원되지 않는 벡터 압축 방식입니다: {kind} (none|scalar|binary)")
+
+
+def build_index_documents(data, source: str) -> List[Dict]:
+	"""로드한 JSON 데이터를 인덱스 업로드용 문서 리스트로 변환
+
+	- 항목 문서(item_index >= 0)와 카테고리별 통합 문서(item_index == -1)를 함께 반환합니다.
+	- 벤치마크/평가 도구가 Azure 없이 같은 코퍼스를 만들 수 있도록 모듈 함수로 분리했습니다.
+	"""
+	# JSON을 문서 목록 형식으로 변환
+	docs = []
+	if isinstance(data, dict):
+		# 형태: {"01_부패방지": [...], ...}
+		for cat_key, items in data.items():
+			for idx, item in enumerate(items):
+				docs.append({
+					"id": f"{cat_key}-{idx}",
+					"category": cat_key,
+					"category_no": None,
+					"content": item,
+					"source": source,
+					"item_index": idx,
+				})
+	elif isinstance(data, list):
+		# 리스트의 각 항목이 dict(이미 구조화)인 경우
+		for idx, item in enumerate(data):
+			if isinstance(item, dict):
+				cid = item.get("id") or f"{item.get('category_no','')}-{idx}"
+				docs.append({
+					"id": str(cid),
+					"category": item.get("category") or item.get("category", ""),
+					"category_no": item.get("category_no"),
+					"domain": item.get("domain"),
+					"content": item.get("content") or item.get("text") or json.dumps(item, ensure_ascii=False),
+					"source": source,
+					"item_index": idx,
+				})
+			else:
+				# 단순 문자열 리스트 처리
+				docs.append({
+					"id": f"item-{idx}",
+					"category": None,
+					"category_no": None,
+					"content": str(item),
+					"source": source,
+					"item_index": idx,
+				})
+	else:
+		raise ValueError("지원되지 않는 JSON 구조입니다.")
+
+	# 배치 업로드 전 추가 처리
+	# --- 카테고리별 통합(doc per category) 문서 생성 ---
+	# 같은 카테고리의 content들을 합쳐 별도의 요약/집계 문서를 생성하면
+	# "컴플라이언스 9대분야 설명해줘" 같은 질문에 더 적합한 컨텍스트가 됩니다.
+	agg_map = {}
+	for d in docs:
+		cat_key = d.get("category") or str(d.get("category_no")) or "unknown"
+		agg_map.setdefault(cat_key, []).append(d.get("content", ""))
+
+	for cat, pieces in agg_map.items():
+		# 기존 문서에서 대표 category_no를 가져오려고 시도
+		cat_no = None
+		for d in docs:
+			if d.get("category") == cat and d.get("category_no") is not None:
+				cat_no = d.get("category_no")
+				break
+
+		agg_doc = {
+			"id": f"cat-{cat_no or cat}",
+			"category": cat,
+			"category_no": cat_no,
+			"domain": "컴플라이언스 9대분야",
+			"content": "\n\n".join(pieces),
+			"source": source,
+			"item_index": -1,
+		}
+		docs.append(agg_doc)
+
+	return docs
 
 
 class AzureSearchClient:
@@ -67,51 +219,73 @@ class AzureSearchClient:
 		self.index_client = SearchIndexClient(endpoint=self.endpoint, credential=self.credential)
 		logger.info("Azure SearchIndexClient 초기화 완료")
 
-	def create_compliance_index(self) -> bool:
+	def build_compliance_index(self, index_name: str = None) -> SearchIndex:
 		"""
-		컴플라이언스(9개 분야)용 인덱스 생성
+		컴플라이언스(9개 분야)용 인덱스 정의 생성
 		- content(검색가능), category/ category_no 필터 가능
 		- content_vector 필드는 벡터 검색을 위해 준비되어 있음(임베딩이 있을 때 업로드 가능)
+		- HNSW 파라미터는 data/hnsw_profile.json(hnsw_tuner가 저장)이 있으면 그 값을 사용
+		- content_vector는 검색에만 쓰이므로 응답에서 제외(hidden)하고 원본 저장(stored)도 하지 않음
+		- AZURE_SEARCH_VECTOR_COMPRESSION=scalar|binary 이면 압축 + 재채점 설정을 추가
 		"""
+		hnsw = load_hnsw_parameters()
+		compressions = build_vector_compressions()
+		vector_search = VectorSearch(
+			profiles=[
+				VectorSearchProfile(
+					name="default-profile",
+					algorithm_configuration_name="default-hnsw",
+					compression_name=compressions[0].compression_name if compressions else None,
+				)
+			],
+			compressions=compressions or None,
+			algorithms=[
+				HnswAlgorithmConfiguration(
+					name="default-hnsw",
+					kind=VectorSearchAlgorithmKind.HNSW,
+					parameters={
+						"m": hnsw["m"],
+						"efConstruction": hnsw["efConstruction"],
+						"efSearch": hnsw["efSearch"],
+						"metric": VectorSearchAlgorithmMetric.COSINE,
+					},
+				)
+			],
+		)
+
+		fields = [
+			# 스냅샷 내보내기가 id 순서로 페이지를 나누므로(keyset) 필터/정렬 가능
+			SimpleField(name="id", type=SearchFieldDataType.String, key=True, filterable=True, sortable=True),
+			SimpleField(name="category_no", type=SearchFieldDataType.Int32, filterable=True, sortable=True),
+			SimpleField(name="category", type=SearchFieldDataType.String, filterable=True),
+			SimpleField(name="domain", type=SearchFieldDataType.String, filterable=True),
+			SearchableField(name="content", type=SearchFieldDataType.String, analyzer_name=None),
+			SimpleField(name="source", type=SearchFieldDataType.String, filterable=True, facetable=False),
+			SimpleField(name="item_index", type=SearchFieldDataType.Int32, filterable=True, sortable=True),
+			# 카테고리 통합 문서(item_index == -1)의 사전 생성 요약과 버전 해시 (modules/category_briefs.py)
+			SimpleField(name="brief", type=SearchFieldDataType.String),
+			SimpleField(name="brief_hash", type=SearchFieldDataType.String, filterable=True),
+			# 임베딩 배치 실패로 벡터 없이 올라간 문서를 찾기 위한 표시 (content_vector는 필터/조회 불가)
+			SimpleField(name="has_vector", type=SearchFieldDataType.Boolean, filterable=True),
+			SearchField(
+				name="content_vector",
+				type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
+				searchable=True,
+				hidden=True,
+				stored=False,
+				vector_search_dimensions=EMBEDDING_DIMENSIONS,
+				vector_search_profile_name="default-profile",
+			),
+		]
+
+		return SearchIndex(name=index_name or self.index_name, fields=fields, vector_search=vector_search)
+
+	def create_compliance_index(self, index_name: str = None) -> bool:
+		"""컴플라이언스 인덱스 생성/업데이트 (index_name 미지정 시 AZURE_SEARCH_INDEX_NAME)"""
 		try:
-			vector_search = VectorSearch(
-				profiles=[
-					VectorSearchProfile(name="default-profile", algorithm_configuration_name="default-hnsw")
-				],
-				algorithms=[
-					HnswAlgorithmConfiguration(
-						name="default-hnsw",
-						kind=VectorSearchAlgorithmKind.HNSW,
-						parameters={
-							"m": 4,
-							"efConstruction": 400,
-							"efSearch": 500,
-							"metric": VectorSearchAlgorithmMetric.COSINE,
-						},
-					)
-				],
-			)
-
-			fields = [
-				SimpleField(name="id", type=SearchFieldDataType.String, key=True),
-				SimpleField(name="category_no", type=SearchFieldDataType.Int32, filterable=True, sortable=True),
-				SimpleField(name="category", type=SearchFieldDataType.String, filterable=True),
-				SimpleField(name="domain", type=SearchFieldDataType.String, filterable=True),
-				SearchableField(name="content", type=SearchFieldDataType.String, analyzer_name=None),
-				SimpleField(name="source", type=SearchFieldDataType.String, filterable=True, facetable=False),
-				SimpleField(name="item_index", type=SearchFieldDataType.Int32, filterable=True, sortable=True),
-				SearchField(
-					name="content_vector",
-					type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
-					searchable=True,
-					vector_search_dimensions=1536,
-					vector_search_profile_name="default-profile",
-				),
-			]
-
-			index = SearchIndex(name=self.index_name, fields=fields, vector_search=vector_search)
-
+			index = self.build_compliance_index(index_name)
 			result = self.index_client.create_or_update_index(index)
+			_INDEX_STATE[(self.endpoint, result.name)] = schema_fingerprint(index)
 			logger.info(f"인덱스 생성/업데이트 완료: {result.name}")
 			return True
 
@@ -119,19 +293,30 @@ class AzureSearchClient:
 			logger.exception("인덱스 생성 실패")
 			return False
 
-	def get_search_client(self) -> SearchClient:
-		return SearchClient(endpoint=self.endpoint, index_name=self.index_name, credential=self.credential)
+	def get_search_client(self, index_name: str = None) -> SearchClient:
+		return SearchClient(endpoint=self.endpoint, index_name=index_name or self.index_name, credential=self.credential)
+
+	def ensure_index_exists(self, index_name: str = None) -> bool:
+		"""인덱스 존재 여부 확인 후 없으면 생성한다.
 
-	def ensure_index_exists(self) -> bool:
-		"""인덱스 존재 여부 확인 후 없으면 생성한다."""
+		- 한 번 확인한 인덱스는 프로세스 캐시(_INDEX_STATE)에 스키마 지문과 함께 기록하여 다시 조회하지 않음
+		- 기존 인덱스의 스키마가 현재 정의와 다르면 경고 (스키마 변경은 modules/index_rebuild.py로 새 인덱스에 반영)
+		"""
+		name = index_name or self.index_name
+		if (self.endpoint, name) in _INDEX_STATE:
+			return True
 		try:
 			# 인덱스 존재 여부 확인
-			self.index_client.get_index(self.index_name)
-			logger.info(f"인덱스가 이미 존재합니다: {self.index_name}")
-			return True
+			existing = self.index_client.get_index(name)
+			logger.info(f"인덱스가 이미 존재합니다: {name}")
 		except Exception:
-			logger.info(f"인덱스를 찾을 수 없습니다. 생성을 시도합니다: {self.index_name}")
-			return self.create_compliance_index()
+			logger.info(f"인덱스를 찾을 수 없습니다. 생성을 시도합니다: {name}")
+			return self.create_compliance_index(name)
+		fingerprint = schema_fingerprint(existing)
+		if fingerprint != schema_fingerprint(self.build_compliance_index(name)):
+			logger.warning(f"인덱스 스키마가 현재 정의와 다릅니다: {name} (python -m modules.index_rebuild 로 재구축 권장)")
+		_INDEX_STATE[(self.endpoint, name)] = fingerprint
+		return True
 
 	def _load_json_candidates(self, paths: List[str]) -> Optional[object]:
 		"""여러 후보 경로에서 첫 번째로 존재하는 JSON을 로드하여 반환"""
@@ -144,9 +329,12 @@ class AzureSearchClient:
 					logger.exception(f"JSON 로드 실패: {p}")
 		return None
 
-	def index_from_file(self, file_path: str = None, batch_size: int = 200) -> Dict:
+	def index_from_file(self, file_path: str = None, batch_size: int = 200, index_name: str = None,
+						snapshot_dir: str = None) -> Dict:
 		"""로컬 JSON 파일을 읽어 인덱스에 업로드
 		2) ./data/9_field.json
+		- index_name: 업로드 대상 인덱스 (미지정 시 AZURE_SEARCH_INDEX_NAME, 블루/그린 재구축 시 새 인덱스 이름)
+		- snapshot_dir: 업로드하는 문서와 임베딩을 스냅샷으로도 저장 (벡터는 인덱스에서 다시 읽을 수 없으므로 색인 시점에 보관)
 		"""
 		candidates = []
 		if file_path:
@@ -159,74 +347,15 @@ class AzureSearchClient:
 		if data is None:
 			raise FileNotFoundError("인덱싱할 JSON 파일을 찾을 수 없습니다. 후보: " + ",".join(candidates))
 
-	# JSON을 문서 목록 형식으로 변환
-		docs = []
-		if isinstance(data, dict):
-			# 형태: {"01_부패방지": [...], ...}
-			for cat_key, items in data.items():
-				for idx, item in enumerate(items):
-					docs.append({
-						"id": f"{cat_key}-{idx}",
-						"category": cat_key,
-						"category_no": None,
-						"content": item,
-						"source": os.path.basename(candidates[0]),
-						"item_index": idx,
-					})
-		elif isinstance(data, list):
-			# 리스트의 각 항목이 dict(이미 구조화)인 경우
-			for idx, item in enumerate(data):
-				if isinstance(item, dict):
-					cid = item.get("id") or f"{item.get('category_no','')}-{idx}"
-					docs.append({
-						"id": str(cid),
-						"category": item.get("category") or item.get("category", ""),
-						"category_no": item.get("category_no"),
-						"domain": item.get("domain"),
-						"content": item.get("content") or item.get("text") or json.dumps(item, ensure_ascii=False),
-						"source": os.path.basename(candidates[0]),
-						"item_index": idx,
-					})
-				else:
-					# 단순 문자열 리스트 처리
-					docs.append({
-						"id": f"item-{idx}",
-						"category": None,
-						"category_no": None,
-						"content": str(item),
-						"source": os.path.basename(candidates[0]),
-						"item_index": idx,
-					})
-		else:
-			raise ValueError("지원되지 않는 JSON 구조입니다.")
+		docs = build_index_documents(data, os.path.basename(candidates[0]))
 
-	# 배치 업로드 전 추가 처리
-	# --- 카테고리별 통합(doc per category) 문서 생성 ---
-	# 같은 카테고리의 content들을 합쳐 별도의 요약/집계 문서를 생성하면
-	# "컴플라이언스 9대분야 설명해줘" 같은 질문에 더 적합한 컨텍스트가 됩니다.
-		agg_map = {}
-		for d in docs:
-			cat_key = d.get("category") or str(d.get("category_no")) or "unknown"
-			agg_map.setdefault(cat_key, []).append(d.get("content", ""))
-
-		for cat, pieces in agg_map.items():
-			# 기존 문서에서 대표 category_no를 가져오려고 시도
-			cat_no = None
-			for d in docs:
-				if d.get("category") == cat and d.get("category_no") is not None:
-					cat_no = d.get("category_no")
-					break
-
-			agg_doc = {
-				"id": f"cat-{cat_no or cat}",
-				"category": cat,
-				"category_no": cat_no,
-				"domain": "컴플라이언스 9대분야",
-				"content": "\n\n".join(pieces),
-				"source": os.path.basename(candidates[0]),
-				"item_index": -1,
-			}
-			docs.append(agg_doc)
+	# --- 카테고리 요약(brief) 생성 ---
+	# 통합 문서 내용이 바뀐 카테고리만 LLM으로 다시 요약하고, 나머지는 캐시(data/category_briefs.json)를 재사용합니다.
+		try:
+			from modules.category_briefs import attach_briefs
+			attach_briefs(docs)
+		except Exception:
+			logger.exception("카테고리 요약 생성 실패 - 요약 없이 업로드합니다.")
 
 	# 배치 업로드 준비
 
@@ -239,13 +368,16 @@ class AzureSearchClient:
 
 		if embedding_model and oa_key and oa_endpoint:
 			try:
-				emb_client = OpenAIClient(oa_endpoint, AzureKeyCredential(oa_key))
+				from openai import AzureOpenAI
+				emb_client = AzureOpenAI(azure_endpoint=oa_endpoint, api_key=oa_key, api_version=os.getenv("OPENAI_API_VERSION"))
+				# 인덱스 스키마와 같은 차원으로 요청 (0이면 dimensions 미전송)
+				extra = {"dimensions": EMBEDDING_DIMENSIONS} if os.getenv("AZURE_EMBEDDING_DIMENSIONS") != "0" else {}
 				# 작은 배치로 나눠 임베딩 생성
 				chunk = 20
 				for i in range(0, len(docs), chunk):
 					inputs = [d.get("content", "") for d in docs[i : i + chunk]]
 					try:
-						resp = emb_client.embeddings.create(model=embedding_model, input=inputs)
+						resp = emb_client.embeddings.create(model=embedding_model, input=inputs, **extra)
 						for j, item in enumerate(resp.data):
 							vec = item.embedding
 								# 해당 문서에 벡터 할당
@@ -258,11 +390,25 @@ class AzureSearchClient:
 				logger.exception("임베딩 클라이언트 초기화 실패 - 벡터를 생성하지 않습니다.")
 		else:
 			logger.info("임베딩 환경변수 미설정 - content_vector를 생성하지 않습니다.")
+		for d in docs:
+			d["has_vector"] = d.get("content_vector") is not None
+
+	# 스냅샷 저장(선택) - 이후 import_snapshot으로 임베딩 없이 다른 인덱스에 복원 가능
+		snapshot_dir = snapshot_dir or os.getenv("AZURE_SEARCH_SNAPSHOT_DIR")
+		if snapshot_dir:
+			try:
+				from modules.index_snapshot import SnapshotWriter
+				fields = [f.name for f in self.build_compliance_index(index_name).fields]
+				with SnapshotWriter(snapshot_dir, fields, EMBEDDING_DIMENSIONS, meta={"index": index_name or self.index_name, "source": os.path.basename(candidates[0])}) as writer:
+					for d in docs:
+						writer.write(d)
+			except Exception:
+				logger.exception(f"스냅샷 저장 실패: {snapshot_dir}")
 
 	# 배치 업로드
 	# 인덱스 존재 확인(없으면 생성)
-		self.ensure_index_exists()
-		client = self.get_search_client()
+		self.ensure_index_exists(index_name)
+		client = self.get_search_client(index_name)
 		total = len(docs)
 		success = 0
 		failed = 0
@@ -282,6 +428,124 @@ class AzureSearchClient:
 
 		return {"total": total, "success": success, "failed": failed}
 
+	def export_snapshot(self, out_dir: str, index_name: str = None, page_size: int = 1000, vectors_from: str = None) -> Dict:
+		"""인덱스의 모든 문서를 페이지 단위로 읽어 스냅샷 폴더(열 파일 + float32 벡터 파일)로 내보냄
+
+		- 응답으로 읽을 수 있는(hidden이 아닌) 필드만 요청
+		- id 오름차순 + "id gt 마지막 id" 필터로 페이지를 나눔 (점수가 모두 같은 "*" 검색의 skip 페이지는 순서가 바뀔 수 있음)
+		- 벡터 필드를 읽을 수 없으면 vectors_from 스냅샷에서 id와 내용이 같은 문서의 벡터를 사용
+		- 내보낸 문서 수가 인덱스 문서 수와 다르면 RuntimeError (manifest를 쓰지 않으므로 가져올 수 없는 스냅샷이 됨)
+		반환: manifest (+ "missing_vectors")
+		"""
+		from modules.category_matcher import odata_quote
+		from modules.index_snapshot import SnapshotWriter, content_sha1, load_snapshot_vectors
+
+		name = index_name or self.index_name
+		try:
+			index = self.index_client.get_index(name)
+		except Exception:
+			index = None
+		# 모의 서버 등 스키마 필드 정보가 없으면 현재 정의를 사용
+		if index is None or not index.fields:
+			index = self.build_compliance_index(name)
+		id_field = next((f for f in index.fields if f.name == "id"), None)
+		if id_field is None or not (id_field.filterable and id_field.sortable):
+			raise ValueError(f"'{name}' 인덱스의 id 필드가 필터/정렬 불가능하여 순서대로 내보낼 수 없습니다. "
+							 "python -m modules.index_rebuild로 현재 스키마의 인덱스를 다시 만든 뒤 내보내 주세요.")
+		vector_field = "content_vector"
+		fields = [f.name for f in index.fields if not f.hidden]
+		vector_readable = vector_field in fields
+		known_vectors = load_snapshot_vectors(vectors_from) if (vectors_from and not vector_readable) else {}
+
+		client = self.get_search_client(name)
+		meta = {"index": name, "schema_fingerprint": schema_fingerprint(index)}
+		seen, missing, last_id = set(), 0, None
+		with SnapshotWriter(out_dir, [f for f in fields if f != vector_field], EMBEDDING_DIMENSIONS, vector_field, meta) as writer:
+			while True:
+				keyset = None if last_id is None else f"id gt '{odata_quote(last_id)}'"
+				page = list(client.search(search_text="*", select=fields, filter=keyset, order_by=["id asc"], top=page_size))
+				for r in page:
+					doc = {k: r.get(k) for k in fields}
+					key = str(doc.get("id"))
+					if key in seen:
+						raise RuntimeError(f"같은 문서가 두 페이지에 나왔습니다: {key} (페이지 순서가 보장되지 않음)")
+					seen.add(key)
+					last_id = key
+					if not vector_readable:
+						cached = known_vectors.get(key)
+						if cached and cached[0] == content_sha1(doc.get("content")):
+							doc[vector_field] = cached[1]
+					if doc.get(vector_field) is None:
+						missing += 1
+					writer.write(doc)
+				if len(page) < page_size:
+					break
+			expected = client.get_document_count()
+			if expected != writer.count:
+				raise RuntimeError(f"내보낸 문서 수({writer.count})가 인덱스 문서 수({expected})와 다릅니다. "
+								   "내보내는 동안 색인이 진행되지 않았는지 확인 후 다시 실행해 주세요.")
+		manifest = writer.manifest
+		logger.info(f"스냅샷 내보내기 완료: {out_dir} ({manifest['count']}건, 벡터 없음 {missing}건)")
+		return {**manifest, "missing_vectors": missing}
+
+	def import_snapshot(self, src_dir: str, index_name: str = None, batch_size: int = 500, workers: int = 4) -> Dict:
+		"""스냅샷을 배치로 나눠 병렬 업로드 (임베딩 재계산 없음, 대상 인덱스가 없으면 생성)
+
+		- 동시에 처리 중인 배치를 workers * 2개로 제한하여 메모리 사용량을 일정하게 유지
+		- 스냅샷 벡터 차원이 인덱스 스키마와 다르면 업로드하지 않음
+		반환: {"total", "success", "failed", "without_vector"}
+		"""
+		from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+		from modules.index_snapshot import iter_snapshot, read_manifest
+
+		manifest = read_manifest(src_dir)
+		if manifest["vectors"] and manifest["dimensions"] != EMBEDDING_DIMENSIONS:
+			raise ValueError(f"스냅샷 벡터 차원({manifest['dimensions']})이 인덱스 차원({EMBEDDING_DIMENSIONS})과 다릅니다. AZURE_EMBEDDING_DIMENSIONS를 맞춰 주세요.")
+		self.ensure_index_exists(index_name)
+		client = self.get_search_client(index_name)
+		stats = {"total": 0, "success": 0, "failed": 0, "without_vector": 0}
+
+		def upload(batch):
+			ok = bad = 0
+			try:
+				for r in client.upload_documents(documents=batch):
+					if getattr(r, "succeeded", False):
+						ok += 1
+					else:
+						bad += 1
+						logger.error(f"업로드 실패: {getattr(r, 'error_message', r)}")
+			except Exception:
+				logger.exception("배치 업로드 중 오류")
+				bad = len(batch)
+			return ok, bad
+
+		def collect(done):
+			for fut in done:
+				ok, bad = fut.result()
+				stats["success"] += ok
+				stats["failed"] += bad
+
+		pending = set()
+		with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+			batch = []
+			for doc in iter_snapshot(src_dir):
+				stats["total"] += 1
+				doc["has_vector"] = doc.get(manifest["vector_field"]) is not None
+				if not doc["has_vector"]:
+					stats["without_vector"] += 1
+				batch.append(doc)
+				if len(batch) >= batch_size:
+					pending.add(pool.submit(upload, batch))
+					batch = []
+					if len(pending) >= max(1, workers) * 2:
+						done, pending = wait(pending, return_when=FIRST_COMPLETED)
+						collect(done)
+			if batch:
+				pending.add(pool.submit(upload, batch))
+			collect(wait(pending)[0])
+		logger.info(f"스냅샷 가져오기 완료: {src_dir} -> {index_name or self.index_name} {stats}")
+		return stats
+
 
 def main_create_and_index(file_path: str = None):
 	client = AzureSearchClient()
@@ -0,0 +1,327 @@
+"""
+게시판 → 검색 인덱스 증분 동기화
+
+컴플라이언스 뉴스 게시판(data/board_data.json)의 게시글을 뉴스 인덱스(AZURE_SEARCH_BOARD_INDEX_NAME)에 올려
+채팅(연합 검색의 board 소스)에서 최근 뉴스를 검색할 수 있게 합니다.
+
+- 커서: (수정 시각, postid). 수정 시각은 updatedate/modifydate가 있으면 그 값, 없으면 createdate
+  커서 이후의 게시글만 처리하므로 매번 전체를 다시 임베딩하지 않음
+- 내용 해시: 커서 이후라도 제목+본문 해시가 같으면 건너뜀 (--full 이면 전체 게시글의 해시만 다시 비교)
+- HTML → 텍스트 변환은 게시글당 한 번, 문단 경계 기준으로 청크 분할 후 배치 임베딩
+- merge_or_upload로 청크를 올리고, 수정으로 청크 수가 줄면 남은 청크를 삭제
+- 업로드에 성공한 게시글까지만 커서를 전진 (실패한 게시글부터 다음 실행에서 다시 처리)
+- 상태 파일: data/board_sync_state.json (BOARD_SYNC_STATE로 변경)
+- 업로드 전에 바뀐 게시글을 분야 태깅(modules/news_tagger.py)하고 대표 분야를 tag_category 필드에 기록
+
+사용법 (ktds-msai-6th-mvp 폴더에서):
+  python -m modules.board_sync                # 한 번 동기화
+  python -m modules.board_sync --interval 120 # 2분마다 동기화
+  python -m modules.board_sync --full --dry-run
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BOARD_DATA_PATH = os.getenv("BOARD_DATA_PATH") or os.path.join("data", "board_data.json")
+STATE_PATH = os.getenv("BOARD_SYNC_STATE") or os.path.join("data", "board_sync_state.json")
+DEFAULT_BOARD_INDEX = "compliance-news"
+BOARD_DOMAIN = "컴플라이언스 뉴스"
+CHUNK_CHARS = 800
+CHUNK_OVERLAP = 100
+EMBED_BATCH = 16
+UPLOAD_BATCH = 200
+
+
+def board_index_name() -> str:
+    return (os.getenv("AZURE_SEARCH_BOARD_INDEX_NAME") or DEFAULT_BOARD_INDEX).strip().strip('"').strip("'")
+
+
+def post_to_text(post: Dict) -> str:
+    """게시글 HTML 본문을 문단 단위 텍스트로 변환"""
+    from bs4 import BeautifulSoup
+
+    text = BeautifulSoup(post.get("message") or "", "html.parser").get_text(separator="\n")
+    lines = [line.strip() for line in text.splitlines()]
+    return "\n".join(line for line in lines if line)
+
+
+def post_modified(post: Dict) -> str:
+    return post.get("updatedate") or post.get("modifydate") or post.get("createdate") or ""
+
+
+def post_key(post: Dict) -> tuple:
+    """커서 비교용 키 (수정 시각, postid)"""
+    return (post_modified(post), int(post.get("postid") or 0))
+
+
+def content_hash(title: str, text: str) -> str:
+    return hashlib.sha1(f"{title}\n{text}".encode("utf-8")).hexdigest()
+
+
+def chunk_text(text: str, size: int = CHUNK_CHARS, overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """문단 경계에서 size 글자 이내로 자르고, 앞 청크의 끝 overlap 글자를 다음 청크 앞에 붙임"""
+    chunks, current = [], ""
+    for para in text.split("\n"):
+        while len(para) > size:
+            # 한 문단이 너무 길면 글자 수로 자름
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(para[:size])
+            para = para[size - overlap:]
+        if current and len(current) + 1 + len(para) > size:
+            chunks.append(current)
+            current = current[-overlap:] + "\n" + para if overlap else para
+        else:
+            current = f"{current}\n{para}" if current else para
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def post_chunks(post: Dict, text: Optional[str] = None, tag_category: Optional[str] = None) -> List[Dict]:
+    """게시글 하나를 인덱스 문서(청크) 목록으로 변환. 청크마다 제목을 앞에 붙여 검색 문맥을 유지"""
+    title = post.get("title") or ""
+    text = post_to_text(post) if text is None else text
+    postid = int(post.get("postid") or 0)
+    return [{
+        "id": f"post-{postid}-{i}",
+        "post_id": postid,
+        "chunk_index": i,
+        "domain": BOARD_DOMAIN,
+        "category": title,
+        "content": f"{title}\n{chunk}",
+        "createdate": post.get("createdate"),
+        "source": "board",
+        "tag_category": tag_category,
+    } for i, chunk in enumerate(chunk_text(text) or [""])]
+
+
+def load_state(path: str = STATE_PATH) -> Dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {"cursor": None, "posts": {}}
+
+
+def save_state(state: Dict, path: str = STATE_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def build_board_index(asc, name: str):
+    """뉴스 인덱스 정의 (벡터 검색 설정은 컴플라이언스 인덱스와 동일)"""
+    from azure.search.documents.indexes.models import (
+        SearchField, SearchFieldDataType, SearchIndex, SearchableField, SimpleField,
+    )
+    from modules.azure_ai_search import EMBEDDING_DIMENSIONS
+
+    fields = [
+        SimpleField(name="id", type=SearchFieldDataType.String, key=True),
+        SimpleField(name="post_id", type=SearchFieldDataType.Int32, filterable=True, sortable=True),
+        SimpleField(name="chunk_index", type=SearchFieldDataType.Int32, filterable=True),
+        SimpleField(name="domain", type=SearchFieldDataType.String, filterable=True),
+        SearchableField(name="category", type=SearchFieldDataType.String),
+        SearchableField(name="content", type=SearchFieldDataType.String),
+        SimpleField(name="createdate", type=SearchFieldDataType.DateTimeOffset, filterable=True, sortable=True),
+        SimpleField(name="source", type=SearchFieldDataType.String, filterable=True),
+        SimpleField(name="tag_category", type=SearchFieldDataType.String, filterable=True, facetable=True),
+        SimpleField(name="has_vector", type=SearchFieldDataType.Boolean, filterable=True),
+        SearchField(
+            name="content_vector",
+            type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
+            searchable=True,
+            hidden=True,
+            stored=False,
+            vector_search_dimensions=EMBEDDING_DIMENSIONS,
+            vector_search_profile_name="default-profile",
+        ),
+    ]
+    vector_search = asc.build_compliance_index(name).vector_search
+    return SearchIndex(name=name, fields=fields, vector_search=vector_search)
+
+
+def ensure_board_index(asc, name: str):
+    try:
+        index = asc.index_client.get_index(name)
+    except Exception:
+        logger.info(f"뉴스 인덱스를 생성합니다: {name}")
+        asc.index_client.create_or_update_index(build_board_index(asc, name))
+        return
+    # 필드 추가는 재색인 없이 가능하므로 이전 스키마의 인덱스에는 빠진 필드만 추가
+    existing = {f.name for f in (getattr(index, "fields", None) or [])}
+    if existing and "tag_category" not in existing:
+        logger.info(f"뉴스 인덱스에 tag_category 필드를 추가합니다: {name}")
+        asc.index_client.create_or_update_index(build_board_index(asc, name))
+
+
+def embed_chunks(chunks: List[Dict], env: Dict, client=None, batch_size: int = EMBED_BATCH) -> int:
+    """청크를 batch_size개씩 묶어 임베딩하고 content_vector를 채움. 성공한 청크 수 반환 (실패 배치는 벡터 없이 진행)"""
+    from modules.rag_pipeline import init_embedding_client
+
+    deployment = env.get("embedding_deployment")
+    client = client or (init_embedding_client(env) if deployment else None)
+    if client is None:
+        logger.info("임베딩 설정이 없어 벡터 없이 업로드합니다.")
+        return 0
+    dims = env.get("embedding_dimensions")
+    extra = {"dimensions": dims} if dims else {}
+    embedded = 0
+    for i in range(0, len(chunks), batch_size):
+        batch = chunks[i:i + batch_size]
+        try:
+            resp = client.embeddings.create(model=deployment, input=[c["content"] for c in batch], **extra)
+            for c, item in zip(batch, resp.data):
+                c["content_vector"] = item.embedding
+            embedded += len(batch)
+        except Exception:
+            logger.exception("청크 임베딩 실패 (해당 배치는 벡터 없이 업로드)")
+    return embedded
+
+
+def select_changed_posts(posts: List[Dict], state: Dict, full: bool = False) -> List[tuple]:
+    """처리할 게시글 [(post, text, hash), ...] (커서 순). 해시가 같은 게시글은 건너뜀"""
+    cursor = tuple(state["cursor"]) if state.get("cursor") else None
+    changed = []
+    for post in sorted(posts, key=post_key):
+        if not full and cursor is not None and post_key(post) <= cursor:
+            continue
+        text = post_to_text(post)
+        h = content_hash(post.get("title") or "", text)
+        if (state.get("posts") or {}).get(str(post.get("postid")), {}).get("hash") == h:
+            continue
+        changed.append((post, text, h))
+    return changed
+
+
+def sync_once(asc=None, posts_path: str = BOARD_DATA_PATH, state_path: str = STATE_PATH,
+              full: bool = False, dry_run: bool = False, embedding_client=None) -> Dict:
+    """커서 이후의 신규/수정 게시글을 뉴스 인덱스에 반영하고 결과 보고서를 반환"""
+    from modules.rag_pipeline import get_env_keys
+
+    t0 = time.perf_counter()
+    with open(posts_path, "r", encoding="utf-8") as f:
+        posts = json.load(f)
+    state = load_state(state_path)
+    state.setdefault("posts", {})
+    changed = select_changed_posts(posts, state, full)
+    report = {"posts": len(posts), "changed": len(changed), "chunks": 0, "embedded": 0,
+              "uploaded": 0, "deleted": 0, "failed_posts": []}
+    if not changed:
+        if not full and posts:
+            # 해시가 같아 건너뛴 게시글이 있으면 커서만 최신으로 맞춤
+            latest = max(post_key(p) for p in posts)
+            if not state.get("cursor") or tuple(state["cursor"]) < latest:
+                state["cursor"] = list(latest)
+                if not dry_run:
+                    save_state(state, state_path)
+        report["elapsed_s"] = round(time.perf_counter() - t0, 2)
+        return report
+
+    from modules.news_tagger import post_tags, primary_category, tag_posts
+
+    tags = {}
+    if not dry_run:
+        try:
+            # 해시가 바뀐 게시글만 임베딩되므로 전체 목록을 넘겨도 추가 비용 없음 (삭제된 게시글 태그 정리)
+            tag_posts(posts, client=embedding_client)
+        except Exception:
+            logger.exception("뉴스 분야 태깅 실패 (태그 없이 동기화)")
+        tags = post_tags()
+    chunks_by_post = {}
+    for post, text, _ in changed:
+        pid = str(post.get("postid"))
+        chunks_by_post[pid] = post_chunks(post, text, primary_category(tags.get(pid) or []))
+    all_chunks = [c for chunks in chunks_by_post.values() for c in chunks]
+    report["chunks"] = len(all_chunks)
+    if dry_run:
+        report["elapsed_s"] = round(time.perf_counter() - t0, 2)
+        return report
+
+    if asc is None:
+        from modules.azure_ai_search import AzureSearchClient
+        asc = AzureSearchClient()
+    name = board_index_name()
+    ensure_board_index(asc, name)
+    client = asc.get_search_client(name)
+
+    report["embedded"] = embed_chunks(all_chunks, get_env_keys(), embedding_client)
+    for c in all_chunks:
+        c["has_vector"] = c.get("content_vector") is not None
+
+    ok_ids = set()
+    for i in range(0, len(all_chunks), UPLOAD_BATCH):
+        batch = all_chunks[i:i + UPLOAD_BATCH]
+        try:
+            for r in client.merge_or_upload_documents(documents=batch):
+                if getattr(r, "succeeded", False):
+                    ok_ids.add(r.key)
+                else:
+                    logger.error(f"뉴스 청크 업로드 실패: {r.key} {getattr(r, 'error_message', '')}")
+        except Exception:
+            logger.exception("뉴스 청크 배치 업로드 실패")
+    report["uploaded"] = len(ok_ids)
+
+    # 게시글 단위로 결과를 반영: 모든 청크가 올라간 게시글만 상태에 기록하고, 실패한 첫 게시글 앞까지만 커서 전진
+    cursor = state.get("cursor")
+    blocked = False
+    for post, _, h in changed:
+        pid = str(post.get("postid"))
+        chunks = chunks_by_post[pid]
+        if not all(c["id"] in ok_ids for c in chunks):
+            report["failed_posts"].append(post.get("postid"))
+            blocked = True
+            continue
+        previous = state["posts"].get(pid) or {}
+        stale = [{"id": f"post-{pid}-{i}"} for i in range(len(chunks), previous.get("chunks", 0))]
+        if stale:
+            try:
+                client.delete_documents(documents=stale)
+                report["deleted"] += len(stale)
+            except Exception:
+                logger.exception(f"이전 청크 삭제 실패: post {pid}")
+        state["posts"][pid] = {"hash": h, "chunks": len(chunks), "synced_at": datetime.now().isoformat(timespec="seconds")}
+        if not blocked and (cursor is None or tuple(cursor) < post_key(post)):
+            cursor = list(post_key(post))
+    state["cursor"] = cursor
+    save_state(state, state_path)
+    report["cursor"] = cursor
+    report["elapsed_s"] = round(time.perf_counter() - t0, 2)
+    logger.info(f"게시판 동기화: {report}")
+    return report
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO)
+    logging.getLogger("httpx2").setLevel(logging.WARNING)
+
+    parser = argparse.ArgumentParser(description="게시판 → 뉴스 인덱스 증분 동기화")
+    parser.add_argument("--posts", default=BOARD_DATA_PATH)
+    parser.add_argument("--state", default=STATE_PATH)
+    parser.add_argument("--interval", type=float, default=0, help="동기화 주기(초). 0이면 한 번만 실행")
+    parser.add_argument("--full", action="store_true", help="커서와 관계없이 전체 게시글의 해시를 비교")
+    parser.add_argument("--dry-run", action="store_true", help="변경 대상만 계산하고 업로드하지 않음")
+    args = parser.parse_args(argv)
+
+    while True:
+        report = sync_once(posts_path=args.posts, state_path=args.state, full=args.full, dry_run=args.dry_run)
+        print(json.dumps(report, ensure_ascii=False))
+        if args.interval <= 0:
+            return 1 if report["failed_posts"] else 0
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
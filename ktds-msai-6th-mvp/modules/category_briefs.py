@@ -0,0 +1,157 @@
+"""
+카테고리 요약(brief) 사전 생성/조회
+
+"9대분야 설명해줘" 같은 개요 질문마다 카테고리 통합 문서(item_index == -1) 전문을 모델에 보내는 대신,
+색인 시점에 카테고리별 요약을 한 번만 만들어 통합 문서의 brief 필드에 함께 저장하고
+앱은 개요 질문에 그 요약을 바로 보여줍니다. (LLM 호출 없음)
+
+- 버전 관리: 통합 문서 내용 + 프롬프트 버전의 해시(brief_hash)가 바뀐 카테고리만 다시 생성
+- 로컬 캐시: data/category_briefs.json ({카테고리: {"hash", "brief"}}) — 재색인 시 재사용,
+  brief 필드가 없는 이전 스키마에서는 해시가 현재 통합 문서 내용과 같을 때만 사용
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+BRIEF_CACHE_PATH = os.getenv("CATEGORY_BRIEF_CACHE") or os.path.join("data", "category_briefs.json")
+# 요약 프롬프트를 바꾸면 버전을 올려 모든 요약을 다시 생성
+BRIEF_PROMPT_VERSION = "v1"
+BRIEF_PROMPT = (
+    "당신은 주식회사 KT의 컴플라이언스 담당자입니다.\n"
+    "아래는 컴플라이언스 '{category}' 분야의 준수사항 전문입니다.\n"
+    "임직원이 한눈에 이해할 수 있도록 핵심 준수사항을 5개 이내의 글머리표로 요약하세요.\n"
+    "전문에 없는 내용은 추가하지 마세요.\n\n{content}"
+)
+
+
+def brief_hash(content: str) -> str:
+    """통합 문서 내용과 프롬프트 버전으로 만든 요약 버전 해시"""
+    return hashlib.sha256(f"{BRIEF_PROMPT_VERSION}\n{content}".encode("utf-8")).hexdigest()[:16]
+
+
+def load_brief_cache(path: str = BRIEF_CACHE_PATH) -> Dict:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        logger.exception(f"요약 캐시 로드 실패: {path}")
+        return {}
+
+
+def save_brief_cache(cache: Dict, path: str = BRIEF_CACHE_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+
+
+def generate_brief(model, category: str, content: str) -> str:
+    resp = model.invoke([{"role": "user", "content": BRIEF_PROMPT.format(category=category, content=content)}])
+    return (getattr(resp, "content", None) or str(resp)).strip()
+
+
+def attach_briefs(docs: List[Dict], model=None, cache_path: str = BRIEF_CACHE_PATH) -> Dict:
+    """통합 문서(item_index == -1)에 brief/brief_hash 필드를 채운다
+
+    - 캐시의 해시가 같으면 재사용, 다르거나 없으면 model로 생성 (model이 None이면 필요할 때 초기화)
+    - 모델을 쓸 수 없으면 brief 없이 진행 (앱은 기존처럼 LLM으로 답변)
+    반환: {"generated": n, "reused": n, "missing": n}
+    """
+    cache = load_brief_cache(cache_path)
+    stats = {"generated": 0, "reused": 0, "missing": 0}
+    for doc in docs:
+        if doc.get("item_index") != -1:
+            continue
+        category = doc.get("category") or ""
+        h = brief_hash(doc.get("content") or "")
+        cached = cache.get(category) or {}
+        if cached.get("hash") == h and cached.get("brief"):
+            doc["brief"], doc["brief_hash"] = cached["brief"], h
+            stats["reused"] += 1
+            continue
+        if model is None:
+            from modules.rag_pipeline import get_env_keys, init_chat_model
+            env = get_env_keys()
+            model = init_chat_model(env, env["chat_deployment"]) if env.get("azure_endpoint") else None
+            if model is None:
+                model = False
+        if not model:
+            stats["missing"] += 1
+            continue
+        try:
+            brief = generate_brief(model, category, doc.get("content") or "")
+        except Exception:
+            logger.exception(f"카테고리 요약 생성 실패: {category}")
+            stats["missing"] += 1
+            continue
+        doc["brief"], doc["brief_hash"] = brief, h
+        cache[category] = {"hash": h, "brief": brief}
+        stats["generated"] += 1
+    if stats["generated"]:
+        save_brief_cache(cache, cache_path)
+    logger.info(f"카테고리 요약: {stats}")
+    return stats
+
+
+def _category_order(category: str):
+    m = re.match(r"\s*(\d+)", category or "")
+    return (int(m.group(1)) if m else 999, category or "")
+
+
+def lookup_briefs(search_client, plan: Dict, cache_path: str = BRIEF_CACHE_PATH) -> List[Dict]:
+    """개요 질문의 검색 계획(category_matcher.plan)으로 저장된 요약을 조회
+
+    인덱스의 통합 문서에서 brief를 읽고, brief 필드가 없는 이전 스키마면 로컬 캐시의 요약을 사용합니다.
+    어느 쪽이든 현재 인덱스의 통합 문서 내용으로 계산한 brief_hash와 같은 요약만 사용하고,
+    인덱스 조회가 실패하거나 요청한 카테고리 중 하나라도 유효한 요약이 없으면 빈 리스트(→ LLM 경로)를 반환합니다.
+    전체 개요(categories가 빈 목록)는 전체 카테고리 수(plan["category_count"])만큼 요약이 모두 있어야 합니다.
+    반환: [{"category": ..., "brief": ...}, ...] (카테고리 번호 순)
+    """
+    if not plan.get("overview") or search_client is None:
+        return []
+    from modules.retriever import Retriever, RetrievalQuery
+
+    query = RetrievalQuery(text="*", filter=plan["filter"], top_k=plan["top"])
+    try:
+        docs = Retriever(search_client, select=["id", "category", "content", "brief", "brief_hash"]).search(query)
+    except Exception:
+        # brief/brief_hash 필드가 없는 이전 스키마: 내용만 읽어 로컬 캐시의 해시와 비교
+        logger.info("인덱스에 카테고리 요약 필드가 없어 로컬 캐시와 비교합니다.", exc_info=True)
+        try:
+            docs = Retriever(search_client, select=["id", "category", "content"]).search(query)
+        except Exception:
+            logger.warning("인덱스에서 카테고리 통합 문서 조회 실패 - LLM 경로로 답변", exc_info=True)
+            return []
+    cache = None
+    briefs = []
+    for d in docs:
+        h = brief_hash(d.content or "")
+        brief = d.extra.get("brief") if d.extra.get("brief_hash") == h else None
+        if not brief:
+            cache = load_brief_cache(cache_path) if cache is None else cache
+            cached = cache.get(d.category) or {}
+            brief = cached.get("brief") if cached.get("hash") == h else None
+        briefs.append({"category": d.category, "brief": brief})
+    found = {b["category"] for b in briefs}
+    categories = plan.get("categories") or []
+    if not briefs or any(c not in found for c in categories):
+        return []
+    # 전체 개요: 일부 카테고리 요약만으로 전체 답변을 만들지 않음
+    if not categories and (not plan.get("category_count") or len(found) < plan["category_count"]):
+        return []
+    if not all(b.get("brief") for b in briefs):
+        return []
+    return sorted(briefs, key=lambda b: _category_order(b["category"]))
+
+
+def format_briefs(briefs: List[Dict]) -> str:
+    """요약 목록을 답변용 마크다운으로 변환"""
+    if len(briefs) == 1:
+        return f"**{briefs[0]['category']}**\n\n{briefs[0]['brief']}"
+    return "\n\n".join(f"#### {b['category']}\n{b['brief']}" for b in briefs)
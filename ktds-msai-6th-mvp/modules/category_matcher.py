@@ -0,0 +1,211 @@
+"""
+컴플라이언스 카테고리 매처
+
+질문에 등장하는 카테고리 이름/동의어를 Aho-Corasick 오토마톤으로 한 번에 찾아
+Azure Search OData 필터(category / item_index)로 변환합니다.
+
+- 개요 질문(예: "산업안전보건 설명해줘") : 사전 생성된 카테고리 통합 문서(item_index == -1)를 필터로 바로 조회
+  개요 표현(설명/개요/소개/전체/정리)이 있고 카테고리 이름 외에 구체적인 주제어가 없을 때만 개요로 봅니다.
+- 조항 질문(예: "하도급 대금 지급 시기 알려줘") : 해당 카테고리의 항목 문서(item_index >= 0) 안에서만 검색
+- 카테고리가 없으면 필터 없이 기존처럼 전체 검색
+
+오토마톤은 카테고리 파일(data/9_field.json)로 한 번만 만들고, 질문 길이에 비례하는 시간으로 매칭합니다.
+"""
+import json
+import os
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_CATEGORY_PATH = os.path.join("data", "9_field.json")
+
+# 카테고리 번호별 동의어/대표 키워드 (카테고리 이름과 번호를 뗀 단축명은 자동으로 포함)
+CATEGORY_SYNONYMS = {
+    1: ["부정청탁", "청탁금지", "김영란법", "반부패", "뇌물", "금품", "향응", "공직자", "공무원"],
+    2: ["공정거래법", "불공정거래", "공정위", "담합", "거래거절"],
+    3: ["하도급법", "하청", "수급사업자", "하도급대금"],
+    4: ["개인정보", "정보보안", "보안"],
+    5: ["계약서", "정보통신공사", "전기공사"],
+    6: ["불법파견", "파견", "노무", "채용"],
+    7: ["산업안전", "안전보건", "중대재해", "위험성평가", "산재"],
+    8: ["회계", "세무", "전표", "증빙서류"],
+    9: ["이용자", "소비자보호", "불완전판매"],
+}
+
+# 카테고리 설명/개요를 묻는 표현 ("알려줘", "뭐야"처럼 조항 질문에도 흔한 요청 표현은 제외)
+OVERVIEW_PATTERNS = ["설명", "개요", "소개", "전체", "정리"]
+# 개요 질문에서 주제어로 보지 않는 요청/수식 표현 (이것과 카테고리 이름, 한 글자 조사만 남으면 개요 질문)
+OVERVIEW_FILLER = ["해줘", "해주세요", "해줄래", "해주라", "부탁", "알려", "주세요", "줘", "좀", "간단히", "자세히", "한번",
+                   "대해", "대한", "관해", "관한", "관련", "규정", "지침", "내용", "분야", "주요", "핵심", "kt", "컴플라이언스"]
+# 9대 분야 전체를 묻는 표현
+ALL_CATEGORY_PATTERNS = ["9대분야", "9개분야", "아홉개분야", "모든분야", "분야전체", "전체분야"]
+
+_STRIP_RE = re.compile(r"[\s·ㆍ\-_/]+")
+
+
+def normalize(text: str) -> str:
+    """공백/가운뎃점 등을 제거하고 소문자로 바꿔 띄어쓰기 차이(예: '이용자 보호')를 무시"""
+    return _STRIP_RE.sub("", text or "").lower()
+
+
+class AhoCorasick:
+    """여러 패턴을 한 번의 텍스트 순회로 찾는 Aho-Corasick 오토마톤
+
+    patterns: {패턴 문자열: 값}. find()는 (시작 위치, 끝 위치, 값) 목록을 반환합니다.
+    """
+
+    def __init__(self, patterns: Dict[str, object]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[tuple]] = [[]]
+        for pattern, value in patterns.items():
+            if pattern:
+                self._add(pattern, value)
+        self._build()
+
+    def _add(self, pattern, value):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(pattern), value))
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                # 실패 링크 상태의 출력도 함께 보고
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> List[tuple]:
+        matches = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for length, value in self._out[state]:
+                matches.append((i - length + 1, i + 1, value))
+        return matches
+
+
+def odata_quote(value: str) -> str:
+    """OData 문자열 리터럴 이스케이프 (작은따옴표는 두 번)"""
+    return str(value).replace("'", "''")
+
+
+def category_filter(categories: Iterable[str], overview: bool = False) -> Optional[str]:
+    """카테고리 목록과 질문 유형으로 OData 필터 문자열을 만든다
+
+    - overview=True : 통합 문서(item_index eq -1)만, 카테고리가 없으면 전체 통합 문서
+    - overview=False: 해당 카테고리의 항목 문서(item_index ge 0)만, 카테고리가 없으면 None(필터 없음)
+    """
+    categories = list(categories)
+    clauses = []
+    if categories:
+        joined = "|".join(odata_quote(c) for c in categories)
+        clauses.append(f"search.in(category, '{joined}', '|')")
+    if overview:
+        clauses.append("item_index eq -1")
+    elif categories:
+        clauses.append("item_index ge 0")
+    return " and ".join(clauses) or None
+
+
+class CategoryMatcher:
+    """카테고리 이름/동의어 매칭과 검색 계획(plan) 생성"""
+
+    def __init__(self, synonyms: Dict[str, List[str]]):
+        """synonyms: {카테고리 원본 이름(예: '7. 산업안전보건'): [동의어, ...]}"""
+        self.categories = list(synonyms)
+        patterns: Dict[str, object] = {}
+        for category, words in synonyms.items():
+            for word in [category] + list(words):
+                key = normalize(word)
+                # 같은 표현이 여러 카테고리에 걸치면 모두 반환
+                patterns.setdefault(key, set()).add(category)
+        self._categories = AhoCorasick(patterns)
+        self._overview = AhoCorasick({normalize(p): "overview" for p in OVERVIEW_PATTERNS})
+        self._filler = AhoCorasick({normalize(p): "filler" for p in OVERVIEW_FILLER})
+        self._all = AhoCorasick({normalize(p): "all" for p in ALL_CATEGORY_PATTERNS})
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_CATEGORY_PATH) -> "CategoryMatcher":
+        """9_field.json의 카테고리 이름과 CATEGORY_SYNONYMS로 매처 생성 (파일이 없으면 빈 매처)"""
+        synonyms: Dict[str, List[str]] = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            data = []
+        for item in data if isinstance(data, list) else []:
+            category = item.get("category") if isinstance(item, dict) else None
+            if not category:
+                continue
+            words = synonyms.setdefault(category, [])
+            # 숫자 접두사 제거 (예: '7. 산업안전보건' -> '산업안전보건')
+            if "." in category:
+                words.append(category.split(".", 1)[1].strip())
+            words.extend(CATEGORY_SYNONYMS.get(item.get("category_no"), []))
+        return cls(synonyms)
+
+    def match(self, prompt: str) -> List[str]:
+        """질문에 등장한 카테고리 원본 이름 목록 (처음 등장한 순서)"""
+        found: Dict[str, int] = {}
+        for start, _, cats in self._categories.find(normalize(prompt)):
+            for c in cats:
+                found.setdefault(c, start)
+        return sorted(found, key=lambda c: (found[c], self.categories.index(c)))
+
+    def has_topic(self, prompt: str, categories: List[str]) -> bool:
+        """카테고리 이름/동의어, 개요 표현, 요청 표현을 지우고 두 글자 이상 남는 말이 있으면 True (예: '대금지급기한')"""
+        text = normalize(prompt)
+        covered = [False] * len(text)
+        spans = [(s, e) for s, e, _ in self._categories.find(text)]
+        spans += [(s, e) for s, e, _ in self._overview.find(text)] + [(s, e) for s, e, _ in self._filler.find(text)]
+        for start, end in spans:
+            for i in range(start, end):
+                covered[i] = True
+        names = [normalize(c) for c in categories]
+        for word in re.findall(r"\w+", "".join(ch if not covered[i] else " " for i, ch in enumerate(text))):
+            # 한 글자(조사/어미)와 카테고리 원본 이름의 일부(예: '보건')는 주제어가 아님
+            if len(word) >= 2 and not any(word in n for n in names):
+                return True
+        return False
+
+    def plan(self, prompt: str, top_k: int = 5) -> Dict:
+        """질문을 검색 계획으로 변환
+
+        반환: {"categories": [...], "overview": bool, "filter": OData 문자열 또는 None, "top": 조회 개수,
+               "category_count": 전체 카테고리 수}
+        - 개요 질문은 카테고리 수만큼(전체 개요는 전체 카테고리 수만큼) 통합 문서를 가져옵니다.
+        """
+        text = normalize(prompt)
+        categories = self.match(prompt)
+        asks_all = bool(self._all.find(text))
+        overview = asks_all or (bool(categories) and bool(self._overview.find(text))
+                                and not self.has_topic(prompt, categories))
+        if asks_all:
+            categories = []
+        top = top_k
+        if overview:
+            top = len(categories) if categories else max(len(self.categories), top_k)
+        return {
+            "categories": categories,
+            "overview": overview,
+            "filter": category_filter(categories, overview),
+            "top": top,
+            "category_count": len(self.categories),
+        }
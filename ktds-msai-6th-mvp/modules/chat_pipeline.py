@@ -0,0 +1,244 @@
+"""
+채팅 한 턴의 RAG 파이프라인 (Azure Search 모드)
+
+app.py와 부하 생성기(modules/load_gen.py)가 같은 코드로 질문을 처리하도록 화면과 분리한 부분입니다.
+의도 판별 → 동일 질문 합치기(singleflight) → 임베딩/검색(마감과 단계 축소, 개요 요약, 연합 검색)
+→ 모델 라우팅 → LLM 동시 호출 제어기 대기 → 마감 안의 모델 스트리밍 순서로 실행하고,
+결과는 Flight(modules/singleflight.py)로 전달합니다. Streamlit 화면 함수(st.*)는 호출하지 않습니다.
+
+telemetry 인자는 App Insights 래퍼(modules/appinsight.py)이며, None이면 이벤트를 기록하지 않습니다.
+"""
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessageChunk
+
+from modules.category_briefs import lookup_briefs
+from modules.deadlines import DeadlineBudget, StageTimeout, local_fallback_documents, passages_answer
+from modules.embedding_batcher import embed_query
+from modules.federated_retriever import FederatedRetriever, default_sources
+from modules.llm_governor import governed
+from modules.model_router import record_route, route_question
+from modules.rag_pipeline import (
+    init_search_client,
+    retrieve_with_plan,
+    build_context_text,
+    inject_context_into_messages,
+    init_chat_model,
+    usage_summary,
+)
+from modules.singleflight import Flight, SingleFlight, flight_key
+
+logger = logging.getLogger(__name__)
+
+# 검색 대상이 아니거나 검색 결과가 없을 때의 고정 안내문 (모델 호출 없음)
+CANNED_ANSWER = ("컴플라이언스 관련 문의에 대해서만 답변을 제공하고 있음을 안내드립니다.\n"
+                 "그 외의 문의사항은 답변이 어려운 점 양해 부탁드립니다.")
+
+# 라우터가 기본 채팅 배포가 아닌 배포를 고를 때 쓰는 모델 (배포별 프로세스 공용)
+_ROUTED_MODELS: Dict[tuple, object] = {}
+_ROUTED_MODELS_LOCK = threading.Lock()
+
+
+def _track(telemetry, name: str, properties: Dict):
+    if not telemetry:
+        return
+    try:
+        telemetry.track_event(name, properties)
+    except Exception:
+        pass
+
+
+def routed_model(env: Dict, deployment: str):
+    """ROUTER_SMALL/LARGE_DEPLOYMENT 배포의 모델 (배포별로 한 번만 생성, 실패하면 None)"""
+    key = (env.get("azure_endpoint"), deployment)
+    with _ROUTED_MODELS_LOCK:
+        if key not in _ROUTED_MODELS:
+            _ROUTED_MODELS[key] = init_chat_model(env, deployment)
+        return _ROUTED_MODELS[key]
+
+
+def decide_scope(matcher, gate, prompt: str, top_k: int, telemetry=None) -> Tuple[Dict, bool]:
+    """질문의 검색 계획과 검색 대상 여부를 반환
+
+    질문에 등장한 카테고리로 검색 범위를 정하고(category_matcher.plan),
+    카테고리가 언급되지 않았고 의도 분류기(intent_gate) 점수도 낮으면 검색 대상이 아닌 것으로 봅니다.
+    반환: (category_plan, in_scope)
+    """
+    category_plan = matcher.plan(prompt, top_k)
+    intent = gate.decide(prompt)
+    if gate.should_log(intent):
+        _track(telemetry, "intent_gate", {"in_scope": intent["in_scope"], "score": intent["score"], "prompt": prompt[:200]})
+    in_scope = bool(intent["in_scope"] or category_plan["categories"] or category_plan["overview"])
+    return category_plan, in_scope
+
+
+def start_turn(single_flight: SingleFlight, prompt: str, category_plan: Dict, in_scope: bool, top_k: int, model,
+               history: List[Dict], session_id: str, env: Dict, telemetry=None) -> Tuple[Flight, bool]:
+    """질문 처리를 시작하고 결과를 받을 Flight를 반환
+
+    같은 질문(정규화) + 같은 인덱스 + 같은 이전 대화의 요청이 다른 세션에서 실행 중이면 그 결과/토큰 스트림을 나눠 받습니다.
+    (SINGLEFLIGHT=0이면 항상 따로 실행)
+    history는 마지막 질문을 포함한 대화 이력입니다.
+    반환: (flight, leader) — leader는 이 호출이 실제로 파이프라인을 실행하는지 여부
+    """
+    history_digest = hashlib.sha1(json.dumps(history[:-1], ensure_ascii=False).encode("utf-8")).hexdigest()
+    producer = lambda f: run_rag_pipeline(f, prompt, category_plan, in_scope, top_k, model, history, session_id, env,
+                                          telemetry=telemetry)
+    if os.getenv("SINGLEFLIGHT", "1") == "0":
+        return single_flight.solo(producer), True
+    flight, leader = single_flight.join(flight_key(prompt, env["search_index"], top_k, history_digest), producer)
+    if not leader:
+        _track(telemetry, "singleflight", {"role": "follower", "subscribers": flight.subscribers,
+                                           "age_ms": round((time.monotonic() - flight.started) * 1000, 1)})
+    return flight, leader
+
+
+def stream_model_within_deadline(flight: Flight, budget: DeadlineBudget, model, deployment: str,
+                                 messages_for_model: List[Dict], retrieved_docs: List[Dict], session_id: str,
+                                 telemetry=None) -> Tuple[str, Optional[float], bool]:
+    """모델 스트림을 별도 스레드에서 받아 flight로 전달
+
+    질문 마감(budget)의 남은 시간 안에 첫 토큰이 없으면 모델 응답을 포기하고 검색된 원문을 답변으로 전달합니다.
+    (늦게 도착한 모델 스트림은 첫 청크에서 닫힘)
+    모델 호출은 LLM 동시 호출 제어기(modules/llm_governor.py)의 차례를 기다린 뒤 실행하고, 대기 순번은 flight.status로 알립니다.
+    반환: (전달한 답변 텍스트, 첫 토큰 ms, 축소 여부)
+    """
+    chunks = queue.Queue()
+    abandoned = threading.Event()
+    started = time.perf_counter()
+    parts, first_token_ms = [], None
+
+    def pump():
+        try:
+            with governed(deployment, messages_for_model, session_id, "interactive",
+                          on_wait=lambda position: flight.set_status(queue_position=position), telemetry=telemetry) as ticket:
+                flight.set_status(queue_position=None)
+                # 대기하는 동안 첫 토큰 마감이 지나 원문 답변을 이미 보냈으면 모델을 호출하지 않음
+                if abandoned.is_set():
+                    return
+                for chunk in model.stream(messages_for_model):
+                    if abandoned.is_set():
+                        break
+                    usage = usage_summary(getattr(chunk, "usage_metadata", None))
+                    if ticket is not None and usage:
+                        ticket.used_tokens = usage["input_tokens"] + usage["output_tokens"]
+                    chunks.put(chunk)
+        except BaseException as e:
+            chunks.put(e)
+        finally:
+            chunks.put(None)
+
+    threading.Thread(target=pump, name="rag-model", daemon=True).start()
+    deadline = time.monotonic() + budget.stage_s("first_token")
+    while True:
+        try:
+            item = chunks.get(timeout=None if first_token_ms is not None else max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            abandoned.set()
+            budget.degrade("first_token", "timeout")
+            # meta는 이미 전달했으므로 첫 토큰 축소 여부는 상태로 알림 (부하 생성기 집계용)
+            flight.set_status(first_token_degraded=True)
+            answer = passages_answer(retrieved_docs)
+            flight.publish(AIMessageChunk(content=answer))
+            return answer, None, True
+        if item is None:
+            return "".join(parts), first_token_ms, False
+        if isinstance(item, BaseException):
+            raise item
+        flight.publish(item)
+        if item.content:
+            parts.append(item.content)
+            if first_token_ms is None:
+                first_token_ms = round((time.perf_counter() - started) * 1000, 1)
+
+
+def run_rag_pipeline(flight: Flight, prompt: str, category_plan: Dict, in_scope: bool, top_k: int, model,
+                     history: List[Dict], session_id: str, env: Dict, telemetry=None,
+                     load_model: Optional[Callable[[str], object]] = None):
+    """검색 → (개요 요약 조회) → 모델 라우팅 → LLM 스트리밍을 실행하여 결과를 flight로 전달
+
+    세션과 무관한 백그라운드 스레드에서 실행되며, 오류 메시지는 meta["errors"]로 넘겨 구독한 세션이 각자 표시합니다.
+    질문마다 마감 시간(modules/deadlines.py)을 두고 단계가 늦으면 축소합니다:
+      임베딩 지연 → 키워드 검색, 검색 지연/실패 → 로컬 색인, 첫 토큰 지연 → 검색 원문 답변 (meta["degraded"])
+    검색 후 질문 복잡도/컨텍스트 크기로 경로를 정합니다. (modules/model_router.py: 모델 없이 발췌 답변 / 작은 배포 / 큰 배포)
+    인자: in_scope(검색 대상 질문 여부), history(마지막 질문 포함 대화 이력), session_id(공정 대기열에서 사용할 요청 세션),
+          load_model(기본 채팅 배포가 아닌 배포의 모델을 만드는 함수, 기본 routed_model)
+    """
+    errors = []
+    briefs, retrieved_docs = [], []
+    budget = DeadlineBudget(telemetry=telemetry)
+    if in_scope:
+        def embed(text):
+            # 여러 세션의 질문 임베딩을 몇 ms 동안 모아 한 번의 배치 요청으로 보냄 (EMBED_BATCH_WINDOW_MS=0이면 개별 요청)
+            try:
+                vector = budget.run("embed", lambda: embed_query(text, env))
+            except StageTimeout:
+                budget.degrade("embed", "timeout")
+                return None
+            if vector is None:
+                budget.degrade("embed", "error")
+            return vector
+
+        def search(search_errors):
+            search_client = init_search_client(env["search_endpoint"], env["search_key"], env["search_index"])
+            # 개요 질문은 색인 시 만들어 둔 카테고리 요약(brief)이 있으면 그대로 답변 (LLM 호출 없음)
+            found_briefs = lookup_briefs(search_client, category_plan) if category_plan["overview"] else []
+            # 컴플라이언스 인덱스와 게시판/업로드 인덱스를 동시에 검색 (FEDERATED_SEARCH=0이면 단일 인덱스)
+            federated = None
+            if os.getenv("FEDERATED_SEARCH", "1") != "0":
+                federated = FederatedRetriever(default_sources(env, search_client))
+            docs = [] if found_briefs else retrieve_with_plan(
+                search_client, prompt, category_plan, top_k,
+                embed=embed,
+                on_error=search_errors.append,
+                # RAG_MIN_SCORE: 이 점수 미만의 검색 결과는 컨텍스트에서 제외 (미설정 시 제한 없음)
+                min_score=float(os.getenv("RAG_MIN_SCORE") or 0) or None,
+                federated=federated,
+            )
+            if federated is not None and federated.last_stats:
+                _track(telemetry, "federated_search", federated.last_stats)
+            return found_briefs, docs
+
+        search_errors = []
+        try:
+            briefs, retrieved_docs = budget.run("search", lambda: search(search_errors))
+            failed = "error" if search_errors and not retrieved_docs else None
+        except StageTimeout:
+            failed = "timeout"
+        if failed:
+            # 검색 서비스가 늦거나 실패하면 로컬 색인으로 답변 (로컬에도 없으면 원래 오류를 표시)
+            budget.degrade("search", failed)
+            retrieved_docs = local_fallback_documents(prompt, category_plan, top_k)
+            if not retrieved_docs:
+                errors.extend(search_errors)
+        else:
+            errors.extend(search_errors)
+    if briefs or not retrieved_docs:
+        flight.set_meta({"briefs": briefs, "docs": retrieved_docs, "errors": errors, "degraded": list(budget.degraded)})
+        return
+    context_text = build_context_text(retrieved_docs)
+    decision = route_question(prompt, category_plan, retrieved_docs, env, history=history, context_text=context_text)
+    flight.set_meta({"briefs": briefs, "docs": retrieved_docs, "errors": errors, "degraded": list(budget.degraded),
+                     "route": decision.route})
+    started = time.perf_counter()
+    if decision.route == "extractive":
+        # 단순 조회: 상위 문서의 해당 줄을 모델 호출 없이 바로 답변
+        flight.publish(AIMessageChunk(content=decision.answer))
+        record_route(decision, decision.answer, context_text, 0.0, round((time.perf_counter() - started) * 1000, 1),
+                     telemetry=telemetry)
+        return
+    chosen = model
+    if decision.deployment != env["chat_deployment"]:
+        chosen = (load_model or (lambda deployment: routed_model(env, deployment)))(decision.deployment) or model
+    messages_for_model = inject_context_into_messages(history, context_text)
+    answer, first_token_ms, degraded = stream_model_within_deadline(
+        flight, budget, chosen, decision.deployment, messages_for_model, retrieved_docs, session_id, telemetry=telemetry)
+    record_route(decision, answer, context_text, first_token_ms, round((time.perf_counter() - started) * 1000, 1),
+                 degraded=degraded, telemetry=telemetry)
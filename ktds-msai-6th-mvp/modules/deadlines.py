@@ -0,0 +1,175 @@
+"""
+채팅 질문 단위 마감 시간(deadline)과 단계별 단계적 축소(graceful degradation)
+
+Azure가 느리거나 멈추면 임베딩 → 검색 → 모델 호출 중 한 단계가 전체 응답을 붙잡습니다.
+질문마다 전체 마감 시간을 정하고 단계별로 나눠 쓰며, 단계가 제 시간에 끝나지 않으면 더 싼 방법으로 계속합니다.
+
+- 임베딩(embed): 마감을 넘기면 벡터 없이 키워드 검색
+- 검색(search): 마감을 넘기거나 실패하면 로컬 색인(data/9_field.json, modules/local_backend.LocalCorpus) 키워드 검색
+- 첫 토큰(first_token): 남은 시간 안에 첫 토큰이 없으면 모델 응답을 포기하고 검색된 원문을 바로 보여줌
+
+축소된 답변은 화면에 표시하고, 단계/사유별 횟수를 degradation_stats()와 App Insights degraded 이벤트로 기록합니다.
+마감을 넘긴 호출은 아직 시작 전이면 취소하고, 이미 실행 중이면 백그라운드에서 끝나도록 두고 결과만 버립니다.
+실행 중인 호출이 풀 자리를 오래 잡지 않도록 각 호출에 자체 타임아웃을 둡니다.
+(모델/임베딩은 modules/resilient_client.py, 검색은 rag_pipeline.init_search_client의 연결/읽기 타임아웃)
+
+환경변수:
+- CHAT_DEADLINE_MS: 질문 하나의 전체 마감 (기본 20000)
+- CHAT_STAGE_SHARES: 단계별 최대 비율 (기본 "embed=0.1,search=0.35", 첫 토큰은 남은 시간 전부)
+- AZURE_SEARCH_CONNECT_TIMEOUT_S / AZURE_SEARCH_READ_TIMEOUT_S / AZURE_SEARCH_RETRY_TOTAL: 앱 검색 클라이언트의
+  연결/읽기 타임아웃과 SDK 재시도 횟수 (기본 3초 / 10초 / 1회)
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEADLINE_MS = 20000.0
+DEFAULT_SHARES = {"embed": 0.1, "search": 0.35}
+MAX_PASSAGES = 3
+PASSAGE_CHARS = 600
+
+# 단계별 실행 풀 (검색 단계 안에서 임베딩 단계를 기다리므로 같은 풀을 쓰면 서로 막을 수 있음)
+_EXECUTORS: Dict[str, ThreadPoolExecutor] = {}
+_EXECUTORS_LOCK = threading.Lock()
+_COUNTS: Dict[str, int] = {}
+_COUNTS_LOCK = threading.Lock()
+
+
+class StageTimeout(TimeoutError):
+    """단계 마감 초과"""
+
+
+def parse_shares(spec: Optional[str]) -> Dict[str, float]:
+    """'embed=0.1,search=0.35' → {"embed": 0.1, "search": 0.35} (빠진 단계는 기본값)"""
+    shares = dict(DEFAULT_SHARES)
+    for part in (spec or "").split(","):
+        if "=" in part:
+            name, value = part.split("=", 1)
+            try:
+                shares[name.strip()] = float(value)
+            except ValueError:
+                pass
+    return shares
+
+
+def _executor(stage: str) -> ThreadPoolExecutor:
+    with _EXECUTORS_LOCK:
+        executor = _EXECUTORS.get(stage)
+        if executor is None:
+            executor = _EXECUTORS[stage] = ThreadPoolExecutor(max_workers=16, thread_name_prefix=f"deadline-{stage}")
+        return executor
+
+
+class DeadlineBudget:
+    """질문 하나의 마감 시간. stage_s(단계)는 전체의 비율과 남은 시간 중 작은 값"""
+
+    def __init__(self, total_ms: Optional[float] = None, shares: Optional[Dict[str, float]] = None, telemetry=None):
+        self.total_s = (float(os.getenv("CHAT_DEADLINE_MS") or DEFAULT_DEADLINE_MS) if total_ms is None else total_ms) / 1000.0
+        self.shares = shares or parse_shares(os.getenv("CHAT_STAGE_SHARES"))
+        self.started = time.monotonic()
+        self.telemetry = telemetry
+        # 이 질문에서 축소된 단계 [{"stage", "reason", "ms"}]
+        self.degraded: List[Dict] = []
+        self.timings: Dict[str, float] = {}
+
+    def remaining_s(self) -> float:
+        return max(0.0, self.total_s - (time.monotonic() - self.started))
+
+    def stage_s(self, stage: str) -> float:
+        share = self.shares.get(stage)
+        remaining = self.remaining_s()
+        return remaining if share is None else min(self.total_s * share, remaining)
+
+    def run(self, stage: str, fn: Callable, timeout_s: Optional[float] = None):
+        """fn()을 단계 마감 안에 실행. 넘기면 StageTimeout (fn의 예외는 그대로 전달)"""
+        timeout_s = self.stage_s(stage) if timeout_s is None else timeout_s
+        started = time.monotonic()
+        future = _executor(stage).submit(fn)
+        try:
+            return future.result(timeout=timeout_s)
+        except FutureTimeout:
+            # 풀에서 대기 중이던 호출이면 실행하지 않음 (실행 중이면 자체 타임아웃으로 끝남)
+            future.cancel()
+            raise StageTimeout(f"{stage} 단계가 {timeout_s * 1000:.0f}ms 안에 끝나지 않았습니다.") from None
+        finally:
+            self.timings[stage] = round((time.monotonic() - started) * 1000, 1)
+
+    def degrade(self, stage: str, reason: str):
+        """축소 기록 (화면 표시/카운터/이벤트)"""
+        ms = round((time.monotonic() - self.started) * 1000, 1)
+        self.degraded.append({"stage": stage, "reason": reason, "ms": ms})
+        with _COUNTS_LOCK:
+            key = f"{stage}:{reason}"
+            _COUNTS[key] = _COUNTS.get(key, 0) + 1
+        logger.warning(f"응답 축소: {stage} ({reason}, {ms:.0f}ms)")
+        if self.telemetry:
+            try:
+                self.telemetry.track_event("degraded", {"stage": stage, "reason": reason, "ms": ms,
+                                                        "deadline_ms": self.total_s * 1000})
+            except Exception:
+                pass
+
+
+def degradation_stats() -> Dict[str, int]:
+    """{"단계:사유": 횟수} (프로세스 시작 이후 누적)"""
+    with _COUNTS_LOCK:
+        return dict(_COUNTS)
+
+
+# 화면에 보여줄 축소 사유
+DEGRADED_LABELS = {
+    "embed": "임베딩 지연으로 키워드 검색 결과를 사용했습니다.",
+    "search": "검색 서비스 지연/오류로 로컬 색인 결과를 사용했습니다.",
+    "first_token": "답변 생성이 지연되어 검색된 원문을 먼저 보여드립니다.",
+}
+
+
+def degraded_notice(degraded: List[Dict]) -> str:
+    stages = list(dict.fromkeys(d["stage"] for d in degraded or []))
+    return " ".join(DEGRADED_LABELS.get(s, s) for s in stages)
+
+
+_LOCAL_CLIENT = None
+_LOCAL_LOCK = threading.Lock()
+
+
+def local_search_client():
+    """검색 장애 시 사용할 로컬 색인 (data/9_field.json, 프로세스에서 한 번만 생성)"""
+    global _LOCAL_CLIENT
+    with _LOCAL_LOCK:
+        if _LOCAL_CLIENT is None:
+            from modules.local_backend import LocalCorpus, LocalSearchClient
+            _LOCAL_CLIENT = LocalSearchClient(LocalCorpus.from_file())
+        return _LOCAL_CLIENT
+
+
+def local_fallback_documents(prompt: str, plan: Dict, top_k: int) -> List[Dict]:
+    """로컬 색인 키워드 검색 (개요 질문은 카테고리 통합 문서 필터)"""
+    from modules.rag_pipeline import retrieve_documents
+
+    client = local_search_client()
+    if plan.get("overview"):
+        docs = retrieve_documents(client, "*", None, plan["top"], filter=plan.get("filter"))
+    else:
+        docs = retrieve_documents(client, prompt, None, top_k, filter=plan.get("filter"))
+    if not docs and plan.get("filter"):
+        docs = retrieve_documents(client, prompt, None, top_k)
+    return [dict(d, source="local") for d in docs]
+
+
+def passages_answer(docs: List[Dict], max_passages: int = MAX_PASSAGES) -> str:
+    """모델 없이 보여줄 답변: 상위 검색 원문 몇 개"""
+    parts = [f"⚠️ {DEGRADED_LABELS['first_token']}"]
+    for i, d in enumerate(docs[:max_passages]):
+        title = " | ".join(p for p in (d.get("domain"), d.get("category")) if p) or "항목"
+        content = (d.get("content") or "").strip()
+        if len(content) > PASSAGE_CHARS:
+            content = content[:PASSAGE_CHARS].rstrip() + " …"
+        parts.append(f"**[출처 {i + 1}] {title}**\n\n{content}")
+    return "\n\n".join(parts)
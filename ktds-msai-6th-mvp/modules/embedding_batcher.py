@@ -0,0 +1,193 @@
+"""
+질문 임베딩 마이크로 배치 (세션 간 공유)
+
+채팅 턴마다 임베딩 엔드포인트에 입력 하나짜리 요청을 보내면 부하가 몰릴 때 작은 HTTP 호출이 많아지고
+임베딩 쿼터(RPM)에 먼저 걸립니다. EmbeddingBatcher는 모든 세션의 질문을 몇 밀리초(window_ms) 동안
+또는 max_batch개가 찰 때까지 모아 한 번의 배치 요청으로 보내고, 호출자별 Future에 결과를 돌려줍니다.
+
+- 배치 안에서 같은 문장은 한 번만 임베딩
+- 배치 요청은 최대 max_inflight개까지 동시에 보냄 (전송 중에도 다음 배치를 모음)
+- 실패한 배치는 해당 호출자 모두 None (get_embedding과 같은 동작)
+- 배치 크기 / 대기 시간(큐 대기) / 요청 시간 히스토그램을 stats()로 제공 → window_ms/max_batch 조정에 사용
+
+환경변수:
+- EMBED_BATCH_WINDOW_MS: 모으는 시간 (기본 5, 0이면 배치 없이 get_embedding 직접 호출)
+- EMBED_BATCH_MAX: 배치 최대 입력 수 (기본 16)
+- EMBED_BATCH_INFLIGHT: 동시에 보내는 배치 요청 수 (기본 4)
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from modules.metrics import summarize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_MS = 5.0
+DEFAULT_MAX_BATCH = 16
+DEFAULT_MAX_INFLIGHT = 4
+DEFAULT_TIMEOUT_S = 30.0
+# 히스토그램 구간 상한 (ms). 마지막 구간은 그 이상 전부
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+STATS_SAMPLES = 5000
+
+
+def _histogram(values, bounds) -> Dict[str, int]:
+    counts = {f"<={b}": 0 for b in bounds}
+    counts[f">{bounds[-1]}"] = 0
+    for v in values:
+        for b in bounds:
+            if v <= b:
+                counts[f"<={b}"] += 1
+                break
+        else:
+            counts[f">{bounds[-1]}"] += 1
+    return counts
+
+
+class EmbeddingBatcher:
+    """질문 텍스트를 모아 배치 임베딩 요청으로 보내는 디스패처 (스레드 하나 + 전송 풀)"""
+
+    def __init__(self, env: Dict, client=None, window_ms: float = DEFAULT_WINDOW_MS,
+                 max_batch: int = DEFAULT_MAX_BATCH, max_inflight: int = DEFAULT_MAX_INFLIGHT):
+        from modules.rag_pipeline import init_embedding_client
+
+        self.deployment = env.get("embedding_deployment")
+        dims = env.get("embedding_dimensions")
+        self._extra = {"dimensions": dims} if dims else {}
+        self.client = client or init_embedding_client(env)
+        self.window_s = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._sender = ThreadPoolExecutor(max_workers=max_inflight, thread_name_prefix="embed-batch")
+        self._slots = threading.Semaphore(max_inflight)
+        self._lock = threading.Lock()
+        self._batch_sizes = deque(maxlen=STATS_SAMPLES)
+        self._wait_ms = deque(maxlen=STATS_SAMPLES)
+        self._request_ms = deque(maxlen=STATS_SAMPLES)
+        self._counts = {"requests": 0, "batches": 0, "failed_batches": 0, "deduped": 0}
+        self._thread = threading.Thread(target=self._loop, name="embed-dispatcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def embed(self, text: str, timeout_s: float = DEFAULT_TIMEOUT_S) -> Optional[List[float]]:
+        """배치를 거쳐 임베딩 벡터를 반환 (실패/시간 초과 시 None)"""
+        try:
+            return self.submit(text).result(timeout=timeout_s)
+        except Exception:
+            return None
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.window_s
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            # 전송 슬롯이 빌 때까지 기다리는 동안 들어온 요청은 다음 배치로 모임
+            self._slots.acquire()
+            self._sender.submit(self._send, batch)
+
+    def _send(self, batch: List[tuple]):
+        try:
+            sent_at = time.perf_counter()
+            texts = list(dict.fromkeys(text for text, _, _ in batch))
+            try:
+                resp = self.client.embeddings.create(model=self.deployment, input=texts, **self._extra)
+                vectors = {t: item.embedding for t, item in zip(texts, resp.data)}
+                failed = False
+            except Exception:
+                logger.exception(f"배치 임베딩 실패 ({len(texts)}건)")
+                vectors, failed = {}, True
+            done_at = time.perf_counter()
+            for text, future, queued_at in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                future.set_result(vectors.get(text))
+            with self._lock:
+                self._counts["requests"] += len(batch)
+                self._counts["batches"] += 1
+                self._counts["failed_batches"] += failed
+                self._counts["deduped"] += len(batch) - len(texts)
+                self._batch_sizes.append(len(batch))
+                self._request_ms.append((done_at - sent_at) * 1000)
+                self._wait_ms.extend((sent_at - queued_at) * 1000 for _, _, queued_at in batch)
+        finally:
+            self._slots.release()
+
+    def stats(self) -> Dict:
+        """배치 크기/큐 대기/요청 시간 요약과 히스토그램 (최근 STATS_SAMPLES개 기준)"""
+        with self._lock:
+            sizes, wait, req = list(self._batch_sizes), list(self._wait_ms), list(self._request_ms)
+            counts = dict(self._counts)
+        size_hist: Dict[str, int] = {}
+        for n in sizes:
+            size_hist[str(n)] = size_hist.get(str(n), 0) + 1
+        return {
+            **counts,
+            "window_ms": self.window_s * 1000,
+            "max_batch": self.max_batch,
+            "batch_size": summarize(sizes),
+            "batch_size_histogram": dict(sorted(size_hist.items(), key=lambda kv: int(kv[0]))),
+            "wait_ms": summarize(wait),
+            "wait_ms_histogram": _histogram(wait, LATENCY_BUCKETS_MS),
+            "request_ms": summarize(req),
+            "request_ms_histogram": _histogram(req, LATENCY_BUCKETS_MS),
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            self._batch_sizes.clear()
+            self._wait_ms.clear()
+            self._request_ms.clear()
+            self._counts = {k: 0 for k in self._counts}
+
+
+_BATCHERS: Dict[tuple, EmbeddingBatcher] = {}
+_BATCHERS_LOCK = threading.Lock()
+
+
+def get_batcher(env: Dict) -> Optional[EmbeddingBatcher]:
+    """(엔드포인트, 배포, 차원)별 프로세스 공용 배처. 배치를 끄거나 임베딩 설정이 없으면 None"""
+    window_ms = float(os.getenv("EMBED_BATCH_WINDOW_MS") or DEFAULT_WINDOW_MS)
+    if window_ms <= 0 or not env.get("embedding_deployment"):
+        return None
+    key = (env.get("azure_endpoint"), env.get("embedding_deployment"), env.get("embedding_dimensions"))
+    with _BATCHERS_LOCK:
+        batcher = _BATCHERS.get(key)
+        if batcher is None:
+            from modules.rag_pipeline import init_embedding_client
+
+            client = init_embedding_client(env)
+            if client is None:
+                return None
+            batcher = EmbeddingBatcher(
+                env, client, window_ms=window_ms,
+                max_batch=int(os.getenv("EMBED_BATCH_MAX") or DEFAULT_MAX_BATCH),
+                max_inflight=int(os.getenv("EMBED_BATCH_INFLIGHT") or DEFAULT_MAX_INFLIGHT),
+            )
+            _BATCHERS[key] = batcher
+        return batcher
+
+
+def embed_query(text: str, env: Dict) -> Optional[List[float]]:
+    """질문 임베딩 (공용 배처 사용, 배치를 쓸 수 없으면 rag_pipeline.get_embedding)"""
+    batcher = get_batcher(env)
+    if batcher is None:
+        from modules.rag_pipeline import get_embedding
+        return get_embedding(text, env.get("embedding_deployment"), env)
+    return batcher.embed(text)
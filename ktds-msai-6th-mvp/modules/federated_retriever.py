@@ -0,0 +1,235 @@
+"""
+연합 검색(Federated Retriever)
+
+컴플라이언스 규정 인덱스 하나만 검색하던 것을 여러 검색 소스로 넓힙니다.
+- compliance: 컴플라이언스 9대분야 인덱스 (AZURE_SEARCH_INDEX_NAME, 카테고리 필터 적용)
+- board: 컴플라이언스 뉴스 게시판 (AZURE_SEARCH_BOARD_INDEX_NAME이 있으면 modules/board_sync.py가 동기화하는
+         뉴스 인덱스를 벡터 검색, 없으면 data/board_data.json을 메모리에 올린 로컬 키워드 검색)
+- uploads: 사용자가 업로드한 문서 인덱스 (AZURE_SEARCH_UPLOAD_INDEX_NAME이 설정된 경우만)
+
+소스별 검색을 스레드 풀에서 동시에 실행하고, 소스마다 마감 시간(deadline)이 지나면 그 결과를 기다리지 않습니다.
+(가장 느린 인덱스가 전체 질의를 막지 않음. 늦은 호출은 백그라운드에서 끝나고 결과는 버림)
+점수 체계가 다른 소스(BM25/코사인 등)를 합치기 위해 질의와 무관한 고정 척도로 0~1 정규화한 뒤
+소스 가중치를 곱해 하나의 순위로 병합합니다. (질의별 최고 점수로 나누면 관련 없는 소스의 1위도 항상 1.0이 됨)
+- 벡터 검색: Azure 코사인 점수(1 / (1 + 코사인 거리))를 코사인 유사도로 되돌려 FEDERATED_VECTOR_FLOOR~1.0 구간을 0~1로
+- 키워드 검색(BM25): 원점수 / (원점수 + FEDERATED_KEYWORD_HALF) (HALF에서 0.5, 큰 점수는 1에 수렴)
+
+환경변수:
+- FEDERATED_SEARCH: 0이면 끔 (기본 1)
+- FEDERATED_DEADLINE_MS: 소스별 마감 시간 기본값 (기본 1500)
+- FEDERATED_BOARD_WEIGHT / FEDERATED_UPLOAD_WEIGHT: 소스 가중치 (기본 0.6 / 0.8)
+- FEDERATED_VECTOR_FLOOR: 벡터 정규화의 0점 코사인 유사도 (기본 0.3)
+- FEDERATED_KEYWORD_HALF: 키워드 정규화에서 0.5가 되는 BM25 원점수 (기본 5.0)
+- FEDERATED_BOARD_MIN_SCORE: 로컬 게시판 키워드 검색의 최소 원점수 (기본 2.0)
+- FEDERATED_BOARD_MIN_COSINE: 게시판 인덱스 벡터 검색의 최소 코사인 유사도 (기본 0.35, 관련 없는 게시글 제외)
+- FEDERATED_BOARD_TAG_BOOST: 질문의 카테고리와 게시글 분야 태그(tag_category, modules/news_tagger.py)가 같을 때
+  정규화 점수에 더하는 비율 (기본 0.3)
+"""
+import json
+import logging
+import os
+import time
+from functools import lru_cache
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from modules.retriever import DEFAULT_SELECT, Retriever, RetrievalQuery
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEADLINE_S = 1.5
+DEFAULT_VECTOR_FLOOR = 0.3
+DEFAULT_KEYWORD_HALF = 5.0
+DEFAULT_BOARD_MIN_COSINE = 0.35
+BOARD_DOMAIN = "컴플라이언스 뉴스"
+DEFAULT_BOARD_PATH = os.path.join("data", "board_data.json")
+
+# 질의마다 스레드를 만들지 않도록 프로세스 공용 풀 사용 (마감 시간을 넘긴 호출도 이 풀에서 끝까지 실행됨)
+_EXECUTOR = ThreadPoolExecutor(max_workers=int(os.getenv("FEDERATED_MAX_WORKERS") or 16), thread_name_prefix="federated")
+
+
+@dataclass
+class SearchSource:
+    """연합 검색 대상 하나
+
+    use_vector: 질의 임베딩으로 벡터 검색 (인덱스의 벡터 차원이 질의 임베딩과 같아야 함). False면 키워드 검색
+    apply_filter: 카테고리 필터(category/item_index 조건)를 이 소스에 적용할지 여부
+    min_score: 이 원점수 미만 결과는 병합 전에 제외 (벡터 검색이면 cosine_to_score(최소 유사도))
+    tag_boost: 문서의 tag_category가 질문 카테고리에 속하면 정규화 점수에 (1 + tag_boost)를 곱함
+    """
+    name: str
+    search_client: object
+    weight: float = 1.0
+    deadline_s: float = DEFAULT_DEADLINE_S
+    use_vector: bool = True
+    apply_filter: bool = False
+    min_score: Optional[float] = None
+    select: Sequence[str] = DEFAULT_SELECT
+    tag_boost: float = 0.0
+
+
+BOARD_SELECT = tuple(DEFAULT_SELECT) + ("tag_category",)
+
+
+def board_documents(posts: List[Dict], tags: Optional[Dict[str, List[Dict]]] = None) -> List[Dict]:
+    """게시글 목록(board_data.json)을 검색 문서로 변환 (HTML 본문은 텍스트로, 분야 태그가 있으면 tag_category)"""
+    from modules.board_sync import post_to_text
+    from modules.news_tagger import primary_category
+
+    tags = tags or {}
+    docs = []
+    for post in posts:
+        text = post_to_text(post)
+        docs.append({
+            "id": f"post-{post.get('postid')}",
+            "domain": BOARD_DOMAIN,
+            "category": post.get("title") or "",
+            "content": f"{post.get('title') or ''}\n{text}".strip(),
+            "source": "board",
+            "createdate": post.get("createdate"),
+            "tag_category": primary_category(tags.get(str(post.get("postid"))) or []),
+        })
+    return docs
+
+
+def cosine_to_score(cosine: float) -> float:
+    """코사인 유사도 → Azure 벡터 검색 점수 (cosine 메트릭: 1 / (1 + (1 - 유사도)))"""
+    return 1.0 / (2.0 - cosine)
+
+
+def normalize_score(raw: Optional[float], vector: bool) -> float:
+    """원점수를 질의와 무관한 고정 척도로 0~1 정규화 (vector=True면 Azure 코사인 점수, False면 BM25)"""
+    if not raw or raw <= 0:
+        return 0.0
+    if vector:
+        floor = float(os.getenv("FEDERATED_VECTOR_FLOOR") or DEFAULT_VECTOR_FLOOR)
+        cosine = 2.0 - 1.0 / raw
+        return min(1.0, max(0.0, (cosine - floor) / (1.0 - floor)))
+    half = float(os.getenv("FEDERATED_KEYWORD_HALF") or DEFAULT_KEYWORD_HALF)
+    return raw / (raw + half)
+
+
+@lru_cache(maxsize=4)
+def local_board_client(path: str = DEFAULT_BOARD_PATH):
+    """게시판 인덱스가 없을 때 쓰는 메모리 내 키워드 검색 클라이언트 (경로별로 한 번만 생성)"""
+    from modules.local_backend import LocalCorpus, LocalSearchClient
+    from modules.news_tagger import post_tags
+
+    with open(path, "r", encoding="utf-8") as f:
+        posts = json.load(f)
+    return LocalSearchClient(LocalCorpus(board_documents(posts, post_tags())))
+
+
+def default_sources(env: Dict, compliance_client) -> List[SearchSource]:
+    """환경변수로 구성한 기본 소스 목록 (compliance + 게시판 + 업로드 인덱스)"""
+    from modules.rag_pipeline import init_search_client, resolve_index_name
+
+    deadline_s = float(os.getenv("FEDERATED_DEADLINE_MS") or DEFAULT_DEADLINE_S * 1000) / 1000
+    sources = [SearchSource("compliance", compliance_client, 1.0, deadline_s, apply_filter=True)]
+
+    board_weight = float(os.getenv("FEDERATED_BOARD_WEIGHT") or 0.6)
+    tag_boost = float(os.getenv("FEDERATED_BOARD_TAG_BOOST") or 0.3)
+    board_index = os.getenv("AZURE_SEARCH_BOARD_INDEX_NAME")
+    if board_index:
+        board_client = init_search_client(env["search_endpoint"], env["search_key"], resolve_index_name(board_index))
+        if board_client is not None:
+            min_cosine = float(os.getenv("FEDERATED_BOARD_MIN_COSINE") or DEFAULT_BOARD_MIN_COSINE)
+            sources.append(SearchSource("board", board_client, board_weight, deadline_s, select=BOARD_SELECT,
+                                        min_score=cosine_to_score(min_cosine), tag_boost=tag_boost))
+    else:
+        try:
+            sources.append(SearchSource("board", local_board_client(), board_weight, deadline_s, use_vector=False,
+                                        min_score=float(os.getenv("FEDERATED_BOARD_MIN_SCORE") or 2.0),
+                                        select=BOARD_SELECT, tag_boost=tag_boost))
+        except Exception:
+            logger.warning("게시판 데이터를 불러오지 못해 게시판 검색을 건너뜁니다.", exc_info=True)
+
+    upload_index = os.getenv("AZURE_SEARCH_UPLOAD_INDEX_NAME")
+    if upload_index:
+        upload_client = init_search_client(env["search_endpoint"], env["search_key"], resolve_index_name(upload_index))
+        if upload_client is not None:
+            sources.append(SearchSource("uploads", upload_client, float(os.getenv("FEDERATED_UPLOAD_WEIGHT") or 0.8),
+                                        deadline_s))
+    return sources
+
+
+class FederatedRetriever:
+    """여러 SearchSource를 동시에 검색하고 정규화 점수로 병합"""
+
+    def __init__(self, sources: List[SearchSource], executor: ThreadPoolExecutor = None):
+        self.sources = [s for s in sources if s.search_client is not None]
+        self.executor = executor or _EXECUTOR
+        # 마지막 검색의 소스별 상태 {"이름": {"status": ok|timeout|error, "ms": .., "hits": ..}}
+        self.last_stats: Dict[str, Dict] = {}
+
+    def _query(self, source: SearchSource, text, vector, top_k, filter, min_score) -> RetrievalQuery:
+        use_vector = source.use_vector and vector is not None
+        scores = [s for s in (min_score, source.min_score) if s is not None]
+        return RetrievalQuery(
+            text=None if use_vector else text,
+            vector=vector if use_vector else None,
+            top_k=top_k,
+            filter=filter if source.apply_filter else None,
+            min_score=max(scores) if scores else None,
+        )
+
+    def search(self, text: str, vector: Optional[List[float]], top_k: int = 5,
+               filter: Optional[str] = None, min_score: Optional[float] = None,
+               categories: Optional[Sequence[str]] = None) -> List[Dict]:
+        """소스별 결과를 병합한 상위 top_k 문서 dict (score=정규화 점수, raw_score/source 추가)
+
+        categories: 질문에서 찾은 카테고리 (tag_boost가 있는 소스의 분야 일치 가중치에 사용)
+        """
+        started = time.monotonic()
+        futures = {}
+        for source in self.sources:
+            query = self._query(source, text, vector, top_k, filter, min_score)
+            retriever = Retriever(source.search_client, select=source.select)
+            futures[self.executor.submit(retriever.search, query)] = (source, started + source.deadline_s,
+                                                                      query.vector is not None)
+
+        stats, results = {}, []
+        pending = set(futures)
+        while pending:
+            # 남은 소스 중 가장 이른 마감 시간까지만 기다림
+            now = time.monotonic()
+            earliest = min(futures[f][1] for f in pending)
+            done, pending = wait(pending, timeout=max(0.0, earliest - now), return_when=FIRST_COMPLETED)
+            for fut in done:
+                source = futures[fut][0]
+                elapsed_ms = round((time.monotonic() - started) * 1000, 1)
+                try:
+                    docs = fut.result()
+                except Exception:
+                    logger.warning(f"연합 검색 소스 실패: {source.name}", exc_info=True)
+                    stats[source.name] = {"status": "error", "ms": elapsed_ms, "hits": 0}
+                    continue
+                stats[source.name] = {"status": "ok", "ms": elapsed_ms, "hits": len(docs)}
+                results.append((source, docs, futures[fut][2]))
+            now = time.monotonic()
+            for fut in [f for f in pending if futures[f][1] <= now]:
+                pending.discard(fut)
+                source = futures[fut][0]
+                stats[source.name] = {"status": "timeout", "ms": round((now - started) * 1000, 1), "hits": 0}
+                logger.warning(f"연합 검색 소스 마감 초과: {source.name} ({source.deadline_s * 1000:.0f}ms)")
+        self.last_stats = stats
+        return merge_results(results, top_k, categories)
+
+
+def merge_results(results: List[tuple], top_k: int, categories: Optional[Sequence[str]] = None) -> List[Dict]:
+    """[(SearchSource, [RetrievedDoc, ...], 벡터 검색 여부), ...]를 고정 척도 정규화 점수 x 가중치 순으로 병합"""
+    categories = set(categories or [])
+    merged = []
+    for source, docs, vector in results:
+        for rank, d in enumerate(docs):
+            norm = normalize_score(d.score, vector)
+            if source.tag_boost and d.extra.get("tag_category") in categories:
+                norm *= 1 + source.tag_boost
+            item = d.to_dict()
+            item["raw_score"] = d.score
+            item["score"] = round(norm * source.weight, 4)
+            item["source"] = source.name
+            merged.append((item["score"], -rank, item))
+    merged.sort(key=lambda t: (t[0], t[1]), reverse=True)
+    return [item for _, _, item in merged[:top_k]]
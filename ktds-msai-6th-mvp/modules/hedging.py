@@ -0,0 +1,229 @@
+"""
+스트리밍 채팅 헤지 요청 (Hedged Requests)
+
+첫 토큰 지연(TTFT)의 p99는 대부분 가끔 늦게 응답하는 Azure OpenAI 요청 몇 건이 만듭니다.
+요청을 보내고 최근 TTFT의 백분위(기본 p95)만큼 기다려도 첫 토큰이 오지 않으면 두 번째 배포로 같은 요청을
+하나 더 보내고, 먼저 첫 토큰을 낸 쪽의 스트림을 사용합니다. 진 쪽은 더 이상 재시도하지 않고,
+이미 보낸 요청은 첫 토큰이 도착하는 즉시 스트림을 닫습니다.
+헤지는 별도의 예비 배포가 있을 때만 보냅니다. (같은 배포로 다시 보내면 느리거나 429를 내는 배포의 부하만 늘어남)
+
+- 헤지 예산: 최근 요청 중 헤지 비율이 HEDGE_BUDGET_PCT(기본 5%)를 넘지 않을 때만 추가 요청
+- 최근 TTFT 표본이 HEDGE_MIN_SAMPLES(기본 20)개 미만이면 HEDGE_DEFAULT_DELAY_MS(기본 2000ms)를 사용
+- 통계: 요청 수, 헤지 비율, 헤지가 이긴 횟수, 현재 헤지 지연 → HedgePolicy.stats(), App Insights llm_hedge 이벤트
+
+환경변수:
+- HEDGE_BUDGET_PCT: 헤지 요청 상한 비율 (기본 5, 0이면 헤지하지 않음)
+- HEDGE_PERCENTILE: 헤지 지연으로 쓸 TTFT 백분위 (기본 95)
+- HEDGE_MIN_SAMPLES / HEDGE_DEFAULT_DELAY_MS: 위 설명 참고
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple
+
+from modules.metrics import percentile, summarize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGET_PCT = 5.0
+DEFAULT_PERCENTILE = 95.0
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_DELAY_MS = 2000.0
+WINDOW = 500
+
+
+class HedgeSkipped(RuntimeError):
+    """헤지 opener가 요청을 보내지 않기로 함 (예: 예비 배포의 호출 한도가 찼음). 헤지로 세지 않음"""
+
+
+class HedgePolicy:
+    """최근 TTFT로 헤지 지연을 정하고, 최근 WINDOW개 요청 기준으로 헤지 비율을 제한"""
+
+    def __init__(self, budget_pct: Optional[float] = None, percentile: Optional[float] = None,
+                 min_samples: Optional[int] = None, default_delay_ms: Optional[float] = None):
+        env = os.getenv
+        self.budget_pct = float(env("HEDGE_BUDGET_PCT") or DEFAULT_BUDGET_PCT) if budget_pct is None else budget_pct
+        self.percentile = float(env("HEDGE_PERCENTILE") or DEFAULT_PERCENTILE) if percentile is None else percentile
+        self.min_samples = int(env("HEDGE_MIN_SAMPLES") or DEFAULT_MIN_SAMPLES) if min_samples is None else min_samples
+        self.default_delay_ms = float(env("HEDGE_DEFAULT_DELAY_MS") or DEFAULT_DELAY_MS) \
+            if default_delay_ms is None else default_delay_ms
+        self.telemetry = None
+        self._ttft_ms = deque(maxlen=WINDOW)
+        self._recent = deque(maxlen=WINDOW)  # 최근 요청별 헤지 여부 (예산 계산용)
+        self._in_flight_hedges = 0
+        self._lock = threading.Lock()
+        self._counts = {"requests": 0, "hedged": 0, "hedge_wins": 0, "primary_wins": 0, "cancelled": 0, "skipped": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget_pct > 0
+
+    def delay_s(self) -> float:
+        with self._lock:
+            if len(self._ttft_ms) < self.min_samples:
+                return self.default_delay_ms / 1000.0
+            return percentile(self._ttft_ms, self.percentile) / 1000.0
+
+    def try_hedge(self) -> bool:
+        """예산 안이면 헤지 1건을 기록하고 True"""
+        with self._lock:
+            # 아직 끝나지 않은 헤지도 포함 (동시에 여러 요청이 한꺼번에 헤지하지 않도록)
+            window = len(self._recent) + self._in_flight_hedges + 1
+            hedged = sum(self._recent) + self._in_flight_hedges
+            if (hedged + 1) * 100.0 > self.budget_pct * window:
+                return False
+            self._in_flight_hedges += 1
+            self._counts["hedged"] += 1
+            return True
+
+    def skip_hedge(self):
+        """try_hedge로 기록한 헤지를 실제로 보내지 않은 경우 되돌림"""
+        with self._lock:
+            self._in_flight_hedges = max(0, self._in_flight_hedges - 1)
+            self._counts["hedged"] = max(0, self._counts["hedged"] - 1)
+            self._counts["skipped"] += 1
+
+    def record(self, ttft_ms: Optional[float], hedged: bool, hedge_won: bool):
+        with self._lock:
+            self._counts["requests"] += 1
+            self._recent.append(1 if hedged else 0)
+            if hedged:
+                self._in_flight_hedges = max(0, self._in_flight_hedges - 1)
+            if ttft_ms is not None:
+                self._ttft_ms.append(ttft_ms)
+            if hedged:
+                self._counts["hedge_wins" if hedge_won else "primary_wins"] += 1
+
+    def record_cancelled(self):
+        with self._lock:
+            self._counts["cancelled"] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts = dict(self._counts)
+            ttft = list(self._ttft_ms)
+        requests = counts["requests"]
+        return {
+            **counts,
+            "hedge_rate": (counts["hedged"] / requests) if requests else 0.0,
+            "hedge_win_rate": (counts["hedge_wins"] / counts["hedged"]) if counts["hedged"] else 0.0,
+            "delay_ms": round(self.delay_s() * 1000, 1),
+            "ttft_ms": summarize(ttft),
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            self._counts = {k: 0 for k in self._counts}
+
+
+def hedged_open(open_primary: Callable[[threading.Event], Tuple], open_hedge: Callable[[threading.Event], Tuple],
+                close: Callable[[Tuple], None], policy: HedgePolicy) -> Tuple:
+    """open_*(cancelled)는 첫 토큰까지 받은 스트림 핸들을 반환. 먼저 끝난 쪽의 핸들을 반환하고 진 쪽은 close(핸들)
+
+    - 주 요청이 지연(policy.delay_s()) 안에 첫 토큰을 내거나 실패하면 헤지하지 않음
+    - 헤지한 경우 한쪽이 실패해도 다른 쪽을 기다림 (둘 다 실패하면 주 요청의 오류)
+    - 승자가 정해지면 cancelled를 세움. 진 쪽 opener는 이를 보고 남은 재시도를 그만둬야 함
+    """
+    started = time.perf_counter()
+    results: "queue.Queue[tuple]" = queue.Queue()
+    state = {"winner": None}
+    lock = threading.Lock()
+    cancelled = threading.Event()
+
+    def run(name, opener):
+        try:
+            handle = opener(cancelled)
+        except BaseException as e:
+            results.put((name, None, e))
+            return
+        with lock:
+            lost = state["winner"] is not None
+            if not lost:
+                results.put((name, handle, None))
+        if lost:
+            # 이미 다른 쪽이 이겼으면 이 스트림은 바로 닫음
+            _close(close, handle, policy)
+
+    threading.Thread(target=run, args=("primary", open_primary), name="hedge-primary", daemon=True).start()
+    hedged = decided = False
+    pending = 1
+    errors = {}
+    delay = policy.delay_s()
+    while True:
+        try:
+            name, handle, error = results.get(timeout=None if decided else delay)
+        except queue.Empty:
+            # 지연 안에 첫 토큰이 없으면 한 번만 헤지 여부를 결정 (예산 초과면 주 요청만 계속 기다림)
+            decided = True
+            if policy.try_hedge():
+                hedged = True
+                pending += 1
+                threading.Thread(target=run, args=("hedge", open_hedge), name="hedge-secondary", daemon=True).start()
+                _track(policy, "llm_hedge", {"delay_ms": round(delay * 1000, 1)})
+            continue
+        pending -= 1
+        if isinstance(error, HedgeSkipped):
+            hedged = False
+            policy.skip_hedge()
+            if pending == 0:
+                policy.record(None, False, False)
+                raise errors.get("primary") or error
+            continue
+        if error is not None:
+            errors[name] = error
+            if pending == 0:
+                policy.record(None, hedged, False)
+                raise errors.get("primary") or error
+            continue
+        with lock:
+            state["winner"] = name
+            cancelled.set()
+            # 승자가 정해지기 전에 이미 큐에 들어간 진 쪽 핸들
+            late = []
+            while not results.empty():
+                late.append(results.get_nowait()[1])
+        for other in late:
+            if other is not None:
+                _close(close, other, policy)
+        ttft_ms = (time.perf_counter() - started) * 1000
+        policy.record(ttft_ms, hedged, name == "hedge")
+        if hedged:
+            _track(policy, "llm_hedge_result", {"winner": name, "ttft_ms": round(ttft_ms, 1)})
+        return handle
+
+
+def _close(close, handle, policy: HedgePolicy):
+    try:
+        close(handle)
+    except Exception:
+        pass
+    policy.record_cancelled()
+
+
+def _track(policy: HedgePolicy, name: str, props: Dict):
+    if policy.telemetry is None:
+        return
+    try:
+        policy.telemetry.track_event(name, props)
+    except Exception:
+        pass
+
+
+_POLICY: Optional[HedgePolicy] = None
+_POLICY_LOCK = threading.Lock()
+
+
+def get_policy() -> HedgePolicy:
+    """프로세스 공용 헤지 정책 (TTFT 표본과 예산을 모든 세션이 공유)"""
+    global _POLICY
+    with _POLICY_LOCK:
+        if _POLICY is None:
+            _POLICY = HedgePolicy()
+        return _POLICY
+
+
+def hedge_stats() -> Dict:
+    return get_policy().stats()
@@ -0,0 +1,289 @@
+"""
+HNSW 파라미터 튜닝 도구
+
+create_compliance_index()의 HNSW 설정(m, efConstruction, efSearch)을 측정에 근거해 고르기 위한 도구입니다.
+내보낸 문서 벡터로 faiss HNSW 인덱스를 로컬에서 만들고, 전수(brute-force) 검색 결과를 정답으로
+파라미터 조합별 recall@k와 질의 지연시간을 측정해 recall-지연시간 경계(Pareto frontier)를 그립니다.
+선택한 프로필은 data/hnsw_profile.json에 저장되어 인덱스 생성 시 사용됩니다.
+
+- 스윕 범위는 Azure AI Search가 허용하는 값(m 4~10, efConstruction/efSearch 100~1000)으로 제한합니다.
+- 벡터 입력: .npy 파일, float32 원시 파일(.f32, --dims 필요), 로컬 코퍼스(--from-corpus), 합성 데이터(--synthetic N)
+- 질의: 실제 질문(기본 골든 질문 세트)을 문서와 같은 방식으로 임베딩 (--vectors는 Azure 임베딩, --from-corpus는 해시 임베딩)
+  또는 --query-vectors로 저장해 둔 질의 벡터. 문서 벡터에 잡음을 섞은 질의는 정답 문서가 너무 가까워 모든 조합의
+  recall이 1.0에 가까워지므로 질문 텍스트가 없는 합성 데이터에서만 사용합니다.
+- 경계 그래프와 프로필 선택 모두 질의 지연시간 p95 기준
+
+사용법 (ktds-msai-6th-mvp 폴더에서):
+  python -m modules.hnsw_tuner --vectors data/snapshot/vectors.f32 --dims 1536 --plot data/bench/hnsw_frontier.png --write
+  python -m modules.hnsw_tuner --from-corpus --dims 256 --questions data/golden_questions.jsonl
+  python -m modules.hnsw_tuner --synthetic 20000 --dims 256 --target-recall 0.95
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import faiss
+
+from modules.metrics import summarize
+
+DEFAULT_PROFILE_PATH = os.path.join("data", "hnsw_profile.json")
+DEFAULT_QUESTIONS_PATH = os.path.join("data", "golden_questions.jsonl")
+# 경계 그래프와 프로필 선택에 쓰는 지연시간 지표
+LATENCY_KEY = "p95"
+
+# Azure AI Search HNSW 파라미터 허용 범위 안의 스윕 후보
+SWEEP_M = [4, 6, 8, 10]
+SWEEP_EF_CONSTRUCTION = [100, 200, 400]
+SWEEP_EF_SEARCH = [100, 200, 300, 500]
+
+
+def load_vectors(path, dims=None):
+    """.npy 또는 float32 원시 파일을 (N, dims) 배열로 로드"""
+    if path.endswith(".npy"):
+        return np.load(path).astype("float32")
+    if not dims:
+        raise ValueError("float32 원시 벡터 파일은 --dims가 필요합니다.")
+    data = np.fromfile(path, dtype="<f4")
+    if data.size % dims:
+        raise ValueError(f"벡터 파일 크기({data.size})가 차원({dims})으로 나누어떨어지지 않습니다.")
+    return data.reshape(-1, dims)
+
+
+def corpus_vectors(dims):
+    """로컬 코퍼스 문서를 해시 임베딩으로 변환 (Azure 없이 흐름 확인용)"""
+    from modules.local_backend import load_corpus_documents, hash_embedding
+
+    docs = load_corpus_documents()
+    return np.array([hash_embedding(d.get("content") or "", dims) for d in docs], dtype="float32")
+
+
+def synthetic_vectors(n, dims, clusters=64, seed=3):
+    """군집 구조를 가진 합성 벡터 (문서 임베딩처럼 주제별로 뭉친 분포)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dims)).astype("float32")
+    labels = rng.integers(0, clusters, size=n)
+    return centers[labels] + 0.35 * rng.normal(size=(n, dims)).astype("float32")
+
+
+def load_questions(path=DEFAULT_QUESTIONS_PATH):
+    """JSONL의 question 필드 목록 (골든 질문 세트 형식)"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line)["question"] for line in f if line.strip()]
+
+
+def question_vectors(questions, dims, local=False):
+    """질문을 문서 벡터와 같은 방식으로 임베딩 (local=True면 해시 임베딩, 아니면 .env의 Azure 임베딩 배포)"""
+    if local:
+        from modules.local_backend import hash_embedding
+
+        return np.array([hash_embedding(q, dims) for q in questions], dtype="float32")
+    from modules.rag_pipeline import get_env_keys, get_embedding
+
+    env = get_env_keys()
+    env["embedding_dimensions"] = dims
+    vectors = []
+    for q in questions:
+        vec = get_embedding(q, env["embedding_deployment"], env)
+        if vec is None:
+            raise RuntimeError(f"질문 임베딩 실패: {q} (AZURE_EMBEDDING_DEPLOYMENT 설정 확인)")
+        vectors.append(vec)
+    return np.array(vectors, dtype="float32")
+
+
+def sample_queries(vectors, n, seed=5):
+    """문서 벡터에 잡음을 섞어 질의 벡터를 만듦 (질문 텍스트가 없는 합성 데이터 전용)"""
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(vectors), size=n)
+    noise = rng.normal(scale=0.1, size=(n, vectors.shape[1])).astype("float32")
+    return vectors[idx] + noise * np.linalg.norm(vectors[idx], axis=1, keepdims=True) / np.sqrt(vectors.shape[1])
+
+
+def _timed_search(index, queries, k):
+    """질의를 하나씩 검색하여 결과와 질의별 지연시간(ms)을 반환 (실서비스의 단건 질의와 같은 조건)"""
+    ids = np.empty((len(queries), k), dtype="int64")
+    latencies = []
+    for i in range(len(queries)):
+        t0 = time.perf_counter()
+        _, found = index.search(queries[i:i + 1], k)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        ids[i] = found[0]
+    return ids, latencies
+
+
+def recall_at_k(found, truth):
+    k = truth.shape[1]
+    hits = sum(len(set(f[f >= 0]).intersection(t)) for f, t in zip(found, truth))
+    return hits / float(len(truth) * k)
+
+
+def sweep(vectors, queries, k=5, ms=SWEEP_M, ef_constructions=SWEEP_EF_CONSTRUCTION, ef_searches=SWEEP_EF_SEARCH, threads=1):
+    """파라미터 조합별 recall@k, 질의 지연시간, 빌드 시간을 측정하여 결과 목록을 반환"""
+    faiss.omp_set_num_threads(threads)
+    vectors = np.ascontiguousarray(vectors, dtype="float32").copy()
+    queries = np.ascontiguousarray(queries, dtype="float32").copy()
+    # Azure 인덱스의 cosine 메트릭과 같도록 정규화 후 내적 사용
+    faiss.normalize_L2(vectors)
+    faiss.normalize_L2(queries)
+    k = min(k, len(vectors))
+
+    flat = faiss.IndexFlatIP(vectors.shape[1])
+    flat.add(vectors)
+    truth, flat_lat = _timed_search(flat, queries, k)
+    results = [{"m": None, "efConstruction": None, "efSearch": None, "kind": "brute-force",
+                "recall": 1.0, "latency_ms": summarize(flat_lat), "build_s": 0.0}]
+
+    for m, efc in itertools.product(ms, ef_constructions):
+        index = faiss.IndexHNSWFlat(vectors.shape[1], m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = efc
+        t0 = time.perf_counter()
+        index.add(vectors)
+        build_s = time.perf_counter() - t0
+        for efs in ef_searches:
+            index.hnsw.efSearch = efs
+            found, lat = _timed_search(index, queries, k)
+            results.append({"m": m, "efConstruction": efc, "efSearch": efs, "kind": "hnsw",
+                            "recall": recall_at_k(found, truth), "latency_ms": summarize(lat), "build_s": build_s})
+    return results
+
+
+def pareto_frontier(results, latency_key=LATENCY_KEY):
+    """recall은 높고 지연시간은 낮은 비지배(non-dominated) 조합만 지연시간 순으로 반환"""
+    candidates = sorted((r for r in results if r["kind"] == "hnsw"), key=lambda r: (r["latency_ms"][latency_key], -r["recall"]))
+    frontier = []
+    best_recall = -1.0
+    for r in candidates:
+        if r["recall"] > best_recall:
+            frontier.append(r)
+            best_recall = r["recall"]
+    return frontier
+
+
+def choose_profile(results, target_recall=0.95, latency_key=LATENCY_KEY):
+    """목표 recall을 만족하는 조합 중 지연시간이 가장 낮은 것(동률이면 m/efConstruction이 작은 것)을 선택"""
+    ok = [r for r in results if r["kind"] == "hnsw" and r["recall"] >= target_recall]
+    if not ok:
+        # 목표를 만족하는 조합이 없으면 recall이 가장 높은 조합
+        ok = sorted((r for r in results if r["kind"] == "hnsw"), key=lambda r: -r["recall"])[:1]
+    if not ok:
+        return None
+    return min(ok, key=lambda r: (round(r["latency_ms"][latency_key], 3), r["m"], r["efConstruction"], r["efSearch"]))
+
+
+def plot_frontier(results, path, target_recall=None):
+    """recall-지연시간 산점도와 경계선을 PNG로 저장 (matplotlib 필요)"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(8, 5))
+    for m in sorted({r["m"] for r in results if r["kind"] == "hnsw"}):
+        pts = [r for r in results if r["m"] == m]
+        ax.scatter([r["latency_ms"][LATENCY_KEY] for r in pts], [r["recall"] for r in pts], label=f"m={m}", s=18)
+    frontier = pareto_frontier(results)
+    ax.plot([r["latency_ms"][LATENCY_KEY] for r in frontier], [r["recall"] for r in frontier], "k--", linewidth=1, label="frontier")
+    brute = next((r for r in results if r["kind"] == "brute-force"), None)
+    if brute:
+        ax.axvline(brute["latency_ms"][LATENCY_KEY], color="gray", linestyle=":", label=f"brute-force {LATENCY_KEY}")
+    if target_recall:
+        ax.axhline(target_recall, color="red", linestyle=":", linewidth=1, label=f"target {target_recall}")
+    ax.set_xlabel(f"query latency {LATENCY_KEY} (ms)")
+    ax.set_ylabel("recall@k")
+    ax.set_title("HNSW recall vs latency")
+    ax.legend(fontsize=8)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fig.savefig(path, dpi=120, bbox_inches="tight")
+    plt.close(fig)
+
+
+def write_profile(choice, path=DEFAULT_PROFILE_PATH, extra=None):
+    """선택한 파라미터를 인덱스 정의가 읽는 프로필 JSON으로 저장"""
+    profile = {
+        "m": choice["m"],
+        "efConstruction": choice["efConstruction"],
+        "efSearch": choice["efSearch"],
+        "metric": "cosine",
+        "measured": {"recall": choice["recall"], "latency_ms": choice["latency_ms"], "build_s": choice["build_s"]},
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    profile["measured"].update(extra or {})
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, ensure_ascii=False, indent=2)
+    return profile
+
+
+def _int_list(value):
+    return [int(x) for x in value.split(",") if x.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HNSW 파라미터 스윕 및 프로필 선택")
+    src = parser.add_mutually_exclusive_group()
+    src.add_argument("--vectors", help="문서 벡터 파일 (.npy 또는 float32 원시 파일)")
+    src.add_argument("--from-corpus", action="store_true", help="로컬 코퍼스를 해시 임베딩으로 사용")
+    src.add_argument("--synthetic", type=int, help="합성 벡터 개수")
+    parser.add_argument("--dims", type=int, default=1536)
+    parser.add_argument("--questions", default=DEFAULT_QUESTIONS_PATH, help="질의로 임베딩할 질문 JSONL (question 필드)")
+    parser.add_argument("--query-vectors", help="저장해 둔 질의 벡터 파일 (.npy 또는 float32 원시 파일, --questions 대신 사용)")
+    parser.add_argument("--queries", type=int, default=200, help="--synthetic 질의 벡터 수 (문서 벡터에 잡음을 섞어 생성)")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--m", type=_int_list, default=SWEEP_M)
+    parser.add_argument("--ef-construction", type=_int_list, default=SWEEP_EF_CONSTRUCTION)
+    parser.add_argument("--ef-search", type=_int_list, default=SWEEP_EF_SEARCH)
+    parser.add_argument("--target-recall", type=float, default=0.95)
+    parser.add_argument("--plot", help="recall-지연시간 그래프 PNG 경로")
+    parser.add_argument("--report", help="스윕 결과 JSON 경로")
+    parser.add_argument("--write", action="store_true", help="선택한 프로필을 --profile 경로에 저장")
+    parser.add_argument("--profile", default=DEFAULT_PROFILE_PATH)
+    args = parser.parse_args(argv)
+
+    if args.vectors:
+        vectors = load_vectors(args.vectors, args.dims)
+    elif args.synthetic:
+        vectors = synthetic_vectors(args.synthetic, args.dims)
+    else:
+        vectors = corpus_vectors(args.dims)
+    if args.query_vectors:
+        queries = load_vectors(args.query_vectors, args.dims)
+    elif args.synthetic:
+        queries = sample_queries(vectors, args.queries)
+    else:
+        queries = question_vectors(load_questions(args.questions), vectors.shape[1], local=not args.vectors)
+    if queries.shape[1] != vectors.shape[1]:
+        raise SystemExit(f"질의 벡터 차원({queries.shape[1]})이 문서 벡터 차원({vectors.shape[1]})과 다릅니다.")
+
+    print(f"문서 벡터 {vectors.shape[0]}개 x {vectors.shape[1]}차원, 질의 {len(queries)}개, k={args.k}")
+    results = sweep(vectors, queries, k=args.k, ms=args.m, ef_constructions=args.ef_construction, ef_searches=args.ef_search)
+
+    print(f"{'m':>4}{'efC':>6}{'efS':>6}{'recall':>9}{'p50ms':>9}{'p95ms':>9}{'build_s':>9}")
+    for r in results:
+        if r["kind"] == "brute-force":
+            print(f"{'brute-force':>16}{r['recall']:>9.3f}{r['latency_ms']['p50']:>9.3f}{r['latency_ms']['p95']:>9.3f}{'-':>9}")
+            continue
+        print(f"{r['m']:>4}{r['efConstruction']:>6}{r['efSearch']:>6}{r['recall']:>9.3f}"
+              f"{r['latency_ms']['p50']:>9.3f}{r['latency_ms']['p95']:>9.3f}{r['build_s']:>9.2f}")
+
+    choice = choose_profile(results, args.target_recall)
+    if choice:
+        print(f"선택: m={choice['m']} efConstruction={choice['efConstruction']} efSearch={choice['efSearch']} "
+              f"(recall={choice['recall']:.3f}, p95={choice['latency_ms']['p95']:.3f}ms)")
+    if args.plot:
+        plot_frontier(results, args.plot, args.target_recall)
+        print(f"그래프 저장: {args.plot}")
+    if args.report:
+        os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"results": results, "frontier": pareto_frontier(results), "choice": choice}, f, ensure_ascii=False, indent=2)
+    if args.write and choice:
+        write_profile(choice, args.profile, {"documents": int(vectors.shape[0]), "dims": int(vectors.shape[1]),
+                                             "k": args.k, "target_recall": args.target_recall})
+        print(f"프로필 저장: {args.profile} (다음 create_compliance_index() 호출부터 적용)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
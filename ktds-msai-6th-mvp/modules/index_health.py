@@ -0,0 +1,258 @@
+"""
+인덱스 상태/용량 모니터
+
+사용자가 불편을 겪기 전에 인덱스 비대화/품질 저하를 알 수 있도록 주기적으로 다음을 수집합니다.
+- 전체/카테고리별 문서 수 (카테고리 필터 + $count)
+- 저장소 크기, 벡터 인덱스 크기 (get_index_statistics)
+- content_vector가 없는 문서 비율 (index_from_file의 임베딩 배치 실패 시 벡터 없이 올라감, has_vector 필드로 집계)
+- 고정 프로브 질문(골든 질문 앞부분)의 키워드 검색 지연시간 p50/p95와 결과 없는 질의 수
+
+수집 결과는 data/index_health.jsonl에 누적하고, 임계값을 넘으면 App Insights
+index_health_alert 이벤트로 알립니다. 앱 사이드바의 '인덱스 상태' 패널은 같은 기록을 보여줍니다.
+
+환경변수 (0이면 해당 검사를 끔):
+- INDEX_HEALTH_HISTORY: 기록 파일 경로 (기본 data/index_health.jsonl)
+- INDEX_HEALTH_MAX_MISSING_VECTOR_RATIO: 벡터 없는 문서 비율 상한 (기본 0.01)
+- INDEX_HEALTH_MAX_PROBE_P95_MS: 프로브 p95 지연 상한 (기본 1500)
+- INDEX_HEALTH_MAX_STORAGE_MB: 저장소 크기 상한 (기본 0)
+- INDEX_HEALTH_MAX_COUNT_DROP: 직전 수집 대비 문서 수 감소율 상한 (기본 0.2)
+
+사용법 (ktds-msai-6th-mvp 폴더에서):
+  python -m modules.index_health                 # 한 번 수집
+  python -m modules.index_health --interval 300  # 5분마다 수집
+  python -m modules.index_health --history 20    # 최근 기록 출력
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from modules.category_matcher import odata_quote
+from modules.metrics import summarize
+
+logger = logging.getLogger(__name__)
+
+HISTORY_PATH = os.getenv("INDEX_HEALTH_HISTORY") or os.path.join("data", "index_health.jsonl")
+DEFAULT_PROBES_PATH = os.path.join("data", "golden_questions.jsonl")
+DEFAULT_PROBE_COUNT = 10
+
+
+def load_thresholds() -> Dict[str, float]:
+    return {
+        "max_missing_vector_ratio": float(os.getenv("INDEX_HEALTH_MAX_MISSING_VECTOR_RATIO") or 0.01),
+        "max_probe_p95_ms": float(os.getenv("INDEX_HEALTH_MAX_PROBE_P95_MS") or 1500),
+        "max_storage_mb": float(os.getenv("INDEX_HEALTH_MAX_STORAGE_MB") or 0),
+        "max_count_drop": float(os.getenv("INDEX_HEALTH_MAX_COUNT_DROP") or 0.2),
+    }
+
+
+def load_probes(path: str = DEFAULT_PROBES_PATH, limit: int = DEFAULT_PROBE_COUNT) -> List[str]:
+    """고정 프로브 질문 (매번 같은 질문으로 측정해야 기록끼리 비교 가능)"""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line)["question"] for line in f if line.strip()][:limit]
+
+
+def _count(search_client, filter: Optional[str] = None) -> int:
+    results = search_client.search(search_text="*", filter=filter, top=0, include_total_count=True)
+    return results.get_count() or 0
+
+
+def _index_statistics(index_client, index_name: str) -> Dict:
+    """저장소/벡터 인덱스 크기 (바이트). 조회할 수 없으면 빈 dict"""
+    if index_client is None:
+        return {}
+    try:
+        stats = index_client.get_index_statistics(index_name)
+    except Exception:
+        logger.warning(f"인덱스 통계 조회 실패: {index_name}", exc_info=True)
+        return {}
+    if not isinstance(stats, dict):
+        stats = stats.as_dict() if hasattr(stats, "as_dict") else vars(stats)
+    return {"storage_bytes": stats.get("storage_size"), "vector_index_bytes": stats.get("vector_index_size")}
+
+
+def probe_latency(search_client, probes: List[str], top_k: int = 5) -> Dict:
+    """프로브 질문을 키워드 검색으로 실행한 지연시간 요약 (임베딩 호출 없이 검색 서비스만 측정)"""
+    from modules.retriever import Retriever, RetrievalQuery
+
+    retriever = Retriever(search_client, select=["id"])
+    latencies, empty, errors = [], 0, 0
+    for question in probes:
+        t0 = time.perf_counter()
+        try:
+            docs = retriever.search(RetrievalQuery(text=question, top_k=top_k))
+        except Exception:
+            errors += 1
+            continue
+        latencies.append((time.perf_counter() - t0) * 1000)
+        empty += not docs
+    summary = summarize(latencies)
+    return {"count": len(probes), "empty": empty, "errors": errors,
+            "p50_ms": round(summary["p50"], 1), "p95_ms": round(summary["p95"], 1), "max_ms": round(summary["max"], 1)}
+
+
+def _has_field(index_client, index_name: Optional[str], field: str) -> Optional[bool]:
+    """인덱스 스키마에 필드가 있는지 (스키마를 조회할 수 없으면 None)"""
+    if index_client is None or not index_name:
+        return None
+    try:
+        fields = index_client.get_index(index_name).fields
+    except Exception:
+        return None
+    return any(f.name == field for f in fields or []) if fields else None
+
+
+def _missing_vectors(search_client, index_client=None, index_name: Optional[str] = None) -> Optional[int]:
+    """벡터 없는 문서 수. has_vector 필드가 없는 인덱스는 알 수 없으므로 None"""
+    if _has_field(index_client, index_name, "has_vector") is False:
+        return None
+    try:
+        return _count(search_client, "has_vector ne true")
+    except Exception:
+        logger.warning(f"벡터 없는 문서 수 조회 실패 (has_vector 필드 확인 필요): {index_name}", exc_info=True)
+        return None
+
+
+def collect_health(search_client, categories: List[str], probes: List[str],
+                   index_client=None, index_name: Optional[str] = None, serving_name: Optional[str] = None) -> Dict:
+    """상태 지표 한 번 수집 (벡터 없는 문서 수를 알 수 없으면 missing_vectors/missing_vector_ratio는 None)
+
+    index는 실제 인덱스, serving은 앱이 쓰는 서비스 이름(별칭/포인터 이름)입니다.
+    """
+    total = _count(search_client)
+    missing = _missing_vectors(search_client, index_client, index_name)
+    by_category = {c: _count(search_client, f"category eq '{odata_quote(c)}'") for c in categories}
+    other = total - sum(by_category.values())
+    if other:
+        by_category["(기타)"] = other
+    return {
+        "ts": datetime.now().isoformat(timespec="seconds"),
+        "index": index_name,
+        "serving": serving_name or index_name,
+        "documents": total,
+        "by_category": by_category,
+        "missing_vectors": missing,
+        "missing_vector_ratio": None if missing is None else (round(missing / total, 4) if total else 0.0),
+        **_index_statistics(index_client, index_name),
+        "probe": probe_latency(search_client, probes),
+    }
+
+
+def check_thresholds(sample: Dict, previous: Optional[Dict] = None, thresholds: Optional[Dict] = None) -> List[Dict]:
+    """임계값을 넘은 항목 목록 [{"check", "value", "threshold"}, ...]"""
+    t = thresholds or load_thresholds()
+    alerts = []
+
+    def over(check, value, limit):
+        if limit and value is not None and value > limit:
+            alerts.append({"check": check, "value": value, "threshold": limit})
+
+    over("missing_vector_ratio", sample.get("missing_vector_ratio"), t["max_missing_vector_ratio"])
+    over("probe_p95_ms", (sample.get("probe") or {}).get("p95_ms"), t["max_probe_p95_ms"])
+    storage = sample.get("storage_bytes")
+    over("storage_mb", round(storage / 1e6, 2) if storage else None, t["max_storage_mb"])
+    # 같은 서비스 이름끼리 비교 (블루/그린 전환으로 실제 인덱스가 바뀐 직후의 문서 수 감소도 잡음)
+    if previous and _serving(previous) == _serving(sample) and previous.get("documents"):
+        drop = (previous["documents"] - sample["documents"]) / previous["documents"]
+        over("count_drop", round(drop, 4), t["max_count_drop"])
+    for category, count in (sample.get("by_category") or {}).items():
+        if count == 0:
+            alerts.append({"check": "empty_category", "value": category, "threshold": 1})
+    if (sample.get("probe") or {}).get("errors"):
+        alerts.append({"check": "probe_errors", "value": sample["probe"]["errors"], "threshold": 0})
+    return alerts
+
+
+def _serving(sample: Dict) -> Optional[str]:
+    # serving 필드가 없는 이전 기록은 실제 인덱스 이름으로 비교
+    return sample.get("serving") or sample.get("index")
+
+
+def last_sample_for(history: List[Dict], serving_name: str) -> Optional[Dict]:
+    """기록 중 같은 서비스 이름의 가장 최근 표본"""
+    for sample in reversed(history):
+        if _serving(sample) == serving_name:
+            return sample
+    return None
+
+
+def read_history(limit: int = 50, path: str = HISTORY_PATH) -> List[Dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [line for line in f if line.strip()]
+    return [json.loads(line) for line in lines[-limit:]]
+
+
+def append_history(sample: Dict, path: str = HISTORY_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(sample, ensure_ascii=False) + "\n")
+
+
+def run_check(asc=None, telemetry=None, probes: Optional[List[str]] = None, path: str = HISTORY_PATH) -> Dict:
+    """서비스 중인 인덱스를 수집 → 임계값 검사 → 기록 → 텔레메트리 전송까지 한 번 실행"""
+    from modules.category_matcher import CategoryMatcher
+    from modules.index_rebuild import get_serving_target
+
+    if asc is None:
+        from modules.azure_ai_search import AzureSearchClient
+        asc = AzureSearchClient()
+    # 별칭/포인터를 따라가 실제 인덱스를 측정 (통계 API는 별칭 이름을 받지 않음)
+    index_name = get_serving_target(asc.index_client, asc.index_name) or asc.index_name
+    sample = collect_health(asc.get_search_client(index_name), CategoryMatcher.from_file().categories,
+                            load_probes() if probes is None else probes, asc.index_client, index_name, asc.index_name)
+    sample["alerts"] = check_thresholds(sample, last_sample_for(read_history(path=path), asc.index_name))
+    append_history(sample, path)
+
+    if telemetry:
+        try:
+            summary = {k: sample.get(k) for k in (
+                "index", "documents", "missing_vector_ratio", "storage_bytes", "vector_index_bytes")}
+            summary["probe_p95_ms"] = sample["probe"]["p95_ms"]
+            telemetry.track_event("index_health", summary)
+            for alert in sample["alerts"]:
+                telemetry.track_event("index_health_alert", {"index": index_name, **alert})
+        except Exception:
+            pass
+    for alert in sample["alerts"]:
+        logger.warning(f"인덱스 상태 경고: {alert}")
+    return sample
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO)
+    logging.getLogger("httpx2").setLevel(logging.WARNING)
+
+    parser = argparse.ArgumentParser(description="인덱스 상태/용량 모니터")
+    parser.add_argument("--interval", type=float, default=0, help="수집 주기(초). 0이면 한 번만 수집")
+    parser.add_argument("--probes", type=int, default=DEFAULT_PROBE_COUNT, help="프로브 질문 수")
+    parser.add_argument("--history", type=int, default=0, help="수집하지 않고 최근 기록 N개 출력")
+    args = parser.parse_args(argv)
+
+    if args.history:
+        for sample in read_history(args.history):
+            print(json.dumps(sample, ensure_ascii=False))
+        return 0
+
+    from modules.appinsight import init_appinsights
+    from modules.azure_ai_search import AzureSearchClient
+    telemetry = init_appinsights("index-health")
+    asc = AzureSearchClient()
+    probes = load_probes(limit=args.probes)
+    while True:
+        sample = run_check(asc, telemetry, probes)
+        print(json.dumps(sample, ensure_ascii=False, indent=2))
+        if args.interval <= 0:
+            return 1 if sample["alerts"] else 0
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
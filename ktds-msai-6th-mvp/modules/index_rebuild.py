@@ -0,0 +1,278 @@
+"""
+블루/그린 인덱스 재구축
+
+서비스 중인 인덱스에 바로 덮어쓰지 않고, 새(그림자) 인덱스를 만들어 색인/검증한 뒤
+별칭(alias)을 새 인덱스로 한 번에 바꿔 서비스 중인 질의 지연시간/검색 품질에 영향을 주지 않습니다.
+
+절차:
+  1) 새 인덱스 생성: {서비스 이름}-{YYYYMMDDHHMMSS}
+  2) 색인 (AzureSearchClient.index_from_file(index_name=새 인덱스))
+  3) 문서 수 확인: get_document_count()가 업로드 성공 수에 도달할 때까지 대기
+  4) 예열 + 스모크 검증: 골든 질문 일부를 새 인덱스에 실행하여 결과 유무와 recall 확인
+     검증에 실패하면 전환하지 않고 새 인덱스를 삭제
+  5) 전환: 별칭 AZURE_SEARCH_INDEX_NAME -> 새 인덱스 (create_or_update_alias)
+     별칭을 쓸 수 없으면(같은 이름의 기존 인덱스가 있는 경우 등) 로컬 포인터 파일(data/search_index_pointer.json)에 기록
+  6) 정리: 같은 접두사의 이전 인덱스 중 최근 keep개(롤백용)만 남기고 삭제
+
+사용법 (ktds-msai-6th-mvp 폴더에서):
+  python -m modules.index_rebuild --file data/9_field.json
+  python -m modules.index_rebuild --extra data/uploads/a.json --extra data/uploads/b.json   # 기본 코퍼스 + 추가 파일
+  python -m modules.index_rebuild --smoke 10 --min-recall 0.8 --keep 2
+  python -m modules.index_rebuild --snapshot data/snapshots/prod   # 스냅샷에서 복원(임베딩 재계산 없음)
+  python -m modules.index_rebuild --rollback
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from modules.rag_pipeline import INDEX_POINTER_PATH, load_index_pointer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GOLDEN = os.path.join("data", "golden_questions.jsonl")
+DEFAULT_SOURCE = os.path.join("data", "9_field.json")
+
+
+def shadow_index_name(serving_name: str, now: Optional[datetime] = None) -> str:
+    return f"{serving_name}-{(now or datetime.now()).strftime('%Y%m%d%H%M%S')}"
+
+
+def get_serving_target(index_client, serving_name: str) -> Optional[str]:
+    """현재 서비스 이름이 가리키는 실제 인덱스 (별칭 -> 포인터 파일 -> 같은 이름의 인덱스 순)"""
+    try:
+        alias = index_client.get_alias(serving_name)
+        if alias.indexes:
+            return alias.indexes[0]
+    except Exception:
+        pass
+    pointer = load_index_pointer().get(serving_name) or {}
+    if pointer.get("index"):
+        return pointer["index"]
+    try:
+        index_client.get_index(serving_name)
+        return serving_name
+    except Exception:
+        return None
+
+
+def save_index_pointer(pointers: Dict, path: str = INDEX_POINTER_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(pointers, f, ensure_ascii=False, indent=2)
+    # 같은 파일시스템 안의 rename은 원자적이므로 앱이 반쯤 쓰인 파일을 읽지 않음
+    os.replace(tmp, path)
+
+
+def write_index_pointer(serving_name: str, index_name: str, previous: Optional[str], path: str = INDEX_POINTER_PATH):
+    pointers = load_index_pointer(path)
+    pointers[serving_name] = {"index": index_name, "previous": previous, "swapped_at": datetime.now().isoformat(timespec="seconds")}
+    save_index_pointer(pointers, path)
+
+
+def swap_serving_index(index_client, serving_name: str, index_name: str, previous: Optional[str]) -> str:
+    """별칭을 새 인덱스로 전환. 실패하면 포인터 파일에 기록하고 사용한 방식을 반환 ("alias" | "pointer")"""
+    from azure.search.documents.indexes.models import SearchAlias
+
+    try:
+        index_client.create_or_update_alias(SearchAlias(name=serving_name, indexes=[index_name]))
+        # 별칭 전환에 성공하면 이전 포인터는 의미가 없으므로 제거
+        pointers = load_index_pointer()
+        if serving_name in pointers:
+            pointers.pop(serving_name)
+            save_index_pointer(pointers)
+        return "alias"
+    except Exception as e:
+        logger.warning(f"별칭 전환 실패({e}) - 포인터 파일로 전환합니다: {INDEX_POINTER_PATH}")
+        write_index_pointer(serving_name, index_name, previous)
+        return "pointer"
+
+
+def wait_for_document_count(search_client, expected: int, timeout_s: float = 60.0, interval_s: float = 2.0) -> int:
+    """색인 직후에는 문서 수가 바로 반영되지 않으므로 기대값에 도달할 때까지 대기"""
+    deadline = time.monotonic() + timeout_s
+    count = -1
+    while True:
+        try:
+            count = search_client.get_document_count()
+        except Exception:
+            logger.exception("문서 수 조회 실패")
+        if count >= expected or time.monotonic() >= deadline:
+            return count
+        time.sleep(interval_s)
+
+
+def smoke_test(search_client, golden: List[Dict], top_k: int = 5) -> Dict:
+    """골든 질문으로 새 인덱스를 예열하고 결과 유무/recall을 확인"""
+    from modules.retriever import Retriever, RetrievalQuery
+    from modules.retrieval_eval import judge
+
+    retriever = Retriever(search_client)
+    empty, recall_sum, latencies = 0, 0.0, []
+    for item in golden:
+        t0 = time.perf_counter()
+        docs = [d.to_dict() for d in retriever.iter(RetrievalQuery(text=item["question"], top_k=top_k))]
+        latencies.append((time.perf_counter() - t0) * 1000)
+        if not docs:
+            empty += 1
+        targets = set(item.get("expected_ids") or item.get("expected_categories") or [])
+        hits = {judge(d, item) for d in docs} - {None}
+        recall_sum += (len(hits) / len(targets)) if targets else 0.0
+    n = len(golden) or 1
+    return {"queries": len(golden), "empty": empty, "recall": recall_sum / n, "latency_ms": latencies}
+
+
+def count_distinct_ids(paths: List[str]) -> int:
+    """여러 JSON 파일을 색인했을 때 남는 고유 문서 수 (같은 id는 나중 파일의 문서로 덮어씀)"""
+    from modules.azure_ai_search import build_index_documents
+
+    ids = set()
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            ids.update(d["id"] for d in build_index_documents(json.load(f), os.path.basename(path)))
+    return len(ids)
+
+
+def drop_index(index_client, index_name: str) -> bool:
+    """검증에 실패한 새 인덱스 삭제 (실패해도 재구축 결과에는 영향 없음)"""
+    try:
+        index_client.delete_index(index_name)
+        return True
+    except Exception:
+        logger.exception(f"새 인덱스 삭제 실패: {index_name}")
+        return False
+
+
+def cleanup_old_indexes(index_client, serving_name: str, keep: int, protect: List[str]) -> List[str]:
+    """'{서비스 이름}-' 접두사의 인덱스 중 최근 keep개와 protect 목록을 제외하고 삭제"""
+    prefix = f"{serving_name}-"
+    names = sorted((n for n in index_client.list_index_names() if n.startswith(prefix)), reverse=True)
+    deleted = []
+    for name in names[keep:]:
+        if name in protect:
+            continue
+        try:
+            index_client.delete_index(name)
+            deleted.append(name)
+        except Exception:
+            logger.exception(f"이전 인덱스 삭제 실패: {name}")
+    return deleted
+
+
+def rebuild(file_path: Optional[str] = None, golden_path: str = DEFAULT_GOLDEN, smoke: int = 10,
+            min_recall: float = 0.8, keep: int = 2, count_timeout_s: float = 60.0, dry_run: bool = False,
+            snapshot_dir: Optional[str] = None, extra_files: Optional[List[str]] = None) -> Dict:
+    """새 인덱스에 색인/검증 후 서비스 이름을 전환하고 결과 보고서를 반환 (검증 실패 시 전환하지 않고 새 인덱스 삭제)
+
+    snapshot_dir를 주면 JSON 파일 대신 스냅샷(modules/index_snapshot.py)을 임베딩 없이 가져옵니다.
+    extra_files는 기본 코퍼스(file_path 또는 스냅샷) 뒤에 함께 색인합니다. (앱 업로드 파일 등)
+    """
+    from modules.azure_ai_search import AzureSearchClient
+
+    asc = AzureSearchClient()
+    serving_name = asc.index_name
+    previous = get_serving_target(asc.index_client, serving_name)
+    new_index = shadow_index_name(serving_name)
+    report = {"serving_name": serving_name, "previous": previous, "index": new_index, "swapped": False}
+
+    if not asc.create_compliance_index(new_index):
+        report["error"] = "인덱스 생성 실패"
+        return report
+    try:
+        if snapshot_dir:
+            res = asc.import_snapshot(snapshot_dir, index_name=new_index)
+        else:
+            res = asc.index_from_file(file_path=file_path, index_name=new_index)
+        for extra in extra_files or []:
+            more = asc.index_from_file(file_path=extra, index_name=new_index)
+            res = {**res, **{k: res.get(k, 0) + more.get(k, 0) for k in ("total", "success", "failed")}}
+    except Exception as e:
+        logger.exception("새 인덱스 색인 실패")
+        report["error"] = f"색인 실패: {e}"
+        report["dropped"] = drop_index(asc.index_client, new_index)
+        return report
+    report["indexed"] = res
+    expected = res["success"]
+    if extra_files and not snapshot_dir and not res["failed"]:
+        # 파일끼리 id가 겹치면 나중 파일 문서로 덮어쓰므로 고유 id 수만큼만 기대
+        expected = min(expected, count_distinct_ids([file_path or DEFAULT_SOURCE] + list(extra_files)))
+    search_client = asc.get_search_client(new_index)
+    report["document_count"] = wait_for_document_count(search_client, expected, timeout_s=count_timeout_s)
+
+    golden = []
+    if golden_path and os.path.exists(golden_path):
+        with open(golden_path, "r", encoding="utf-8") as f:
+            golden = [json.loads(line) for line in f if line.strip()][:smoke]
+    smoke_result = smoke_test(search_client, golden)
+    report["smoke"] = {k: v for k, v in smoke_result.items() if k != "latency_ms"}
+
+    problems = []
+    if res["failed"] or report["document_count"] < expected:
+        problems.append(f"문서 수 불일치: 업로드 성공 {res['success']}, 실패 {res['failed']}, 인덱스 {report['document_count']}")
+    if smoke_result["empty"]:
+        problems.append(f"결과 없는 스모크 질의 {smoke_result['empty']}건")
+    if golden and smoke_result["recall"] < min_recall:
+        problems.append(f"스모크 recall {smoke_result['recall']:.2f} < {min_recall}")
+    if problems:
+        report["error"] = "; ".join(problems)
+        logger.error(f"새 인덱스 검증 실패 - 전환하지 않고 삭제합니다: {report['error']}")
+        report["dropped"] = drop_index(asc.index_client, new_index)
+        return report
+    if dry_run:
+        return report
+
+    report["swap"] = swap_serving_index(asc.index_client, serving_name, new_index, previous)
+    report["swapped"] = True
+    protect = [new_index] + ([previous] if previous else [])
+    report["deleted"] = cleanup_old_indexes(asc.index_client, serving_name, keep, protect)
+    return report
+
+
+def rollback() -> Dict:
+    """포인터 파일 또는 같은 접두사의 인덱스 목록에서 직전 인덱스로 되돌림"""
+    from modules.azure_ai_search import AzureSearchClient
+
+    asc = AzureSearchClient()
+    serving_name = asc.index_name
+    current = get_serving_target(asc.index_client, serving_name)
+    previous = (load_index_pointer().get(serving_name) or {}).get("previous")
+    if not previous:
+        prefix = f"{serving_name}-"
+        older = sorted((n for n in asc.index_client.list_index_names() if n.startswith(prefix) and n != current), reverse=True)
+        previous = older[0] if older else None
+    if not previous:
+        return {"serving_name": serving_name, "error": "되돌릴 이전 인덱스가 없습니다."}
+    how = swap_serving_index(asc.index_client, serving_name, previous, current)
+    return {"serving_name": serving_name, "index": previous, "previous": current, "swap": how, "swapped": True}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="블루/그린 인덱스 재구축")
+    parser.add_argument("--file", help="색인할 JSON (기본 data/9_field.json)")
+    parser.add_argument("--extra", action="append", default=[], help="기본 코퍼스와 함께 색인할 JSON (여러 번 지정 가능)")
+    parser.add_argument("--snapshot", help="JSON 대신 가져올 스냅샷 폴더 (modules.index_snapshot export 결과)")
+    parser.add_argument("--golden", default=DEFAULT_GOLDEN)
+    parser.add_argument("--smoke", type=int, default=10, help="스모크 검증에 사용할 골든 질문 수")
+    parser.add_argument("--min-recall", type=float, default=0.8)
+    parser.add_argument("--keep", type=int, default=2, help="남겨 둘 이전 인덱스 수(롤백용)")
+    parser.add_argument("--count-timeout", type=float, default=60.0)
+    parser.add_argument("--dry-run", action="store_true", help="색인/검증만 하고 전환하지 않음")
+    parser.add_argument("--rollback", action="store_true", help="직전 인덱스로 되돌림")
+    args = parser.parse_args(argv)
+
+    if args.rollback:
+        report = rollback()
+    else:
+        report = rebuild(args.file, args.golden, args.smoke, args.min_recall, args.keep, args.count_timeout, args.dry_run,
+                         snapshot_dir=args.snapshot, extra_files=args.extra)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0 if not report.get("error") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
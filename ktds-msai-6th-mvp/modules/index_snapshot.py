@@ -0,0 +1,213 @@
+"""
+인덱스 스냅샷(내보내기/가져오기) 파일 형식과 CLI
+
+Azure AI Search 인덱스의 문서와 벡터를 로컬 파일로 내보내고, 다시 임베딩하지 않고 인덱스로 되돌립니다.
+(재해 복구, 개발/운영 환경 복제, 오프라인 분석/로컬 서빙용)
+
+스냅샷 폴더 구조:
+  manifest.json        형식 버전, 원본 인덱스, 문서 수, 필드 목록, 벡터 필드/차원, 스키마 지문
+  columns/{필드}.jsonl 필드별 값(한 줄에 한 문서) — 열 단위로 저장하여 필요한 필드만 읽을 수 있음
+  columns/_has_vector.jsonl  문서별 벡터 유무
+  vectors.f32          float32 리틀엔디언 원시 벡터 (문서 수 x 차원, 벡터가 없는 문서는 0으로 채움)
+                       hnsw_tuner에서 바로 사용 가능: --vectors vectors.f32 --dims {차원}
+
+참고: 현재 인덱스의 content_vector는 hidden/stored=False라 검색 응답으로 벡터를 읽을 수 없습니다.
+그래서 색인 시점(index_from_file(snapshot_dir=...))에 임베딩과 함께 스냅샷을 남기고,
+인덱스에서 내보낼 때는 --vectors-from으로 그 스냅샷의 벡터를 (id, 내용)이 같은 문서에 다시 붙입니다.
+
+사용법 (ktds-msai-6th-mvp 폴더에서):
+  python -m modules.index_snapshot export --out data/snapshots/prod --vectors-from data/snapshots/indexed
+  python -m modules.index_snapshot import --src data/snapshots/prod --index compliance-9fields-dev --workers 4
+  python -m modules.index_snapshot info --src data/snapshots/prod
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from array import array
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+SNAPSHOT_FORMAT = 1
+MANIFEST_FILE = "manifest.json"
+COLUMNS_DIR = "columns"
+VECTOR_FILE = "vectors.f32"
+HAS_VECTOR_COLUMN = "_has_vector"
+DEFAULT_VECTOR_FIELD = "content_vector"
+
+
+def content_sha1(content) -> str:
+    return hashlib.sha1(str(content or "").encode("utf-8")).hexdigest()
+
+
+def _pack_vector(vector, dimensions: int) -> bytes:
+    values = array("f", vector if vector is not None else [0.0] * dimensions)
+    if len(values) != dimensions:
+        raise ValueError(f"벡터 차원 불일치: {len(values)} != {dimensions}")
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def _unpack_vector(raw: bytes) -> List[float]:
+    values = array("f")
+    values.frombytes(raw)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tolist()
+
+
+class SnapshotWriter:
+    """문서를 한 건씩 받아 열 파일과 벡터 파일에 바로 기록 (전체를 메모리에 올리지 않음)
+
+    사용 예:
+        with SnapshotWriter(out_dir, fields, dimensions) as w:
+            for doc in docs:
+                w.write(doc)
+    """
+
+    def __init__(self, out_dir: str, fields: List[str], dimensions: int,
+                 vector_field: str = DEFAULT_VECTOR_FIELD, meta: Optional[Dict] = None):
+        self.out_dir = out_dir
+        self.fields = [f for f in fields if f != vector_field]
+        self.dimensions = dimensions
+        self.vector_field = vector_field
+        self.meta = dict(meta or {})
+        self.count = 0
+        self.vectors = 0
+        self.manifest: Optional[Dict] = None
+        os.makedirs(os.path.join(out_dir, COLUMNS_DIR), exist_ok=True)
+        # 이전 스냅샷의 manifest가 남아 있으면 중간에 실패한 내보내기를 완성본으로 읽을 수 있으므로 먼저 삭제
+        if os.path.exists(os.path.join(out_dir, MANIFEST_FILE)):
+            os.remove(os.path.join(out_dir, MANIFEST_FILE))
+        self._columns = {
+            name: open(os.path.join(out_dir, COLUMNS_DIR, f"{name}.jsonl"), "w", encoding="utf-8")
+            for name in self.fields + [HAS_VECTOR_COLUMN]
+        }
+        self._vector_file = open(os.path.join(out_dir, VECTOR_FILE), "wb")
+
+    def write(self, doc: Dict):
+        for name in self.fields:
+            self._columns[name].write(json.dumps(doc.get(name), ensure_ascii=False) + "\n")
+        vector = doc.get(self.vector_field)
+        self._columns[HAS_VECTOR_COLUMN].write("true\n" if vector is not None else "false\n")
+        self._vector_file.write(_pack_vector(vector, self.dimensions))
+        self.count += 1
+        self.vectors += vector is not None
+
+    def close(self, complete: bool = True) -> Optional[Dict]:
+        """파일을 닫고 manifest.json을 기록한 뒤 manifest를 반환 (complete=False면 manifest 없이 닫음 → 가져올 수 없는 스냅샷)"""
+        for f in self._columns.values():
+            f.close()
+        self._vector_file.close()
+        if not complete:
+            return None
+        manifest = {
+            "format": SNAPSHOT_FORMAT,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "count": self.count,
+            "fields": self.fields,
+            "vector_field": self.vector_field,
+            "dimensions": self.dimensions,
+            "vectors": self.vectors,
+            **self.meta,
+        }
+        with open(os.path.join(self.out_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        self.manifest = manifest
+        return manifest
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(complete=exc_type is None)
+
+
+def read_manifest(src_dir: str) -> Dict:
+    with open(os.path.join(src_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"지원하지 않는 스냅샷 형식입니다: {manifest.get('format')}")
+    return manifest
+
+
+def iter_snapshot(src_dir: str, fields: Optional[List[str]] = None, with_vectors: bool = True) -> Iterator[Dict]:
+    """스냅샷 문서를 한 건씩 반환 (fields로 읽을 열을 제한, 벡터가 없는 문서는 벡터 필드를 넣지 않음)"""
+    manifest = read_manifest(src_dir)
+    names = [f for f in (fields or manifest["fields"]) if f in manifest["fields"]]
+    dims = manifest["dimensions"]
+    vector_field = manifest["vector_field"]
+    columns = {name: open(os.path.join(src_dir, COLUMNS_DIR, f"{name}.jsonl"), "r", encoding="utf-8")
+               for name in names + [HAS_VECTOR_COLUMN]}
+    vector_file = open(os.path.join(src_dir, VECTOR_FILE), "rb") if with_vectors else None
+    try:
+        for _ in range(manifest["count"]):
+            doc = {name: json.loads(columns[name].readline()) for name in names}
+            has_vector = json.loads(columns[HAS_VECTOR_COLUMN].readline())
+            if vector_file is not None:
+                raw = vector_file.read(dims * 4)
+                if has_vector:
+                    doc[vector_field] = _unpack_vector(raw)
+            yield doc
+    finally:
+        for f in columns.values():
+            f.close()
+        if vector_file is not None:
+            vector_file.close()
+
+
+def load_snapshot_vectors(src_dir: str) -> Dict[str, tuple]:
+    """{문서 id: (내용 sha1, 벡터)} — 인덱스에서 내보낼 때 읽을 수 없는 벡터를 채우는 데 사용"""
+    manifest = read_manifest(src_dir)
+    vectors = {}
+    for doc in iter_snapshot(src_dir, fields=["id", "content"]):
+        vector = doc.get(manifest["vector_field"])
+        if vector is not None:
+            vectors[str(doc.get("id"))] = (content_sha1(doc.get("content")), vector)
+    return vectors
+
+
+def main(argv=None):
+    import logging
+    logging.getLogger("httpx2").setLevel(logging.WARNING)
+
+    parser = argparse.ArgumentParser(description="인덱스 스냅샷 내보내기/가져오기")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_export = sub.add_parser("export", help="인덱스 문서를 스냅샷 폴더로 내보내기")
+    p_export.add_argument("--out", required=True)
+    p_export.add_argument("--index", help="대상 인덱스 (기본 AZURE_SEARCH_INDEX_NAME)")
+    p_export.add_argument("--page-size", type=int, default=1000)
+    p_export.add_argument("--vectors-from", help="벡터를 가져올 이전 스냅샷 (인덱스 벡터 필드를 읽을 수 없을 때)")
+    p_import = sub.add_parser("import", help="스냅샷을 인덱스로 병렬 업로드")
+    p_import.add_argument("--src", required=True)
+    p_import.add_argument("--index", help="대상 인덱스 (없으면 생성, 기본 AZURE_SEARCH_INDEX_NAME)")
+    p_import.add_argument("--batch-size", type=int, default=500)
+    p_import.add_argument("--workers", type=int, default=4)
+    p_info = sub.add_parser("info", help="스냅샷 manifest 출력")
+    p_info.add_argument("--src", required=True)
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        print(json.dumps(read_manifest(args.src), ensure_ascii=False, indent=2))
+        return 0
+
+    from modules.azure_ai_search import AzureSearchClient
+    asc = AzureSearchClient()
+    if args.command == "export":
+        try:
+            result = asc.export_snapshot(args.out, index_name=args.index, page_size=args.page_size,
+                                         vectors_from=args.vectors_from)
+        except (RuntimeError, ValueError) as e:
+            print(f"내보내기 실패: {e}")
+            return 1
+    else:
+        result = asc.import_snapshot(args.src, index_name=args.index, batch_size=args.batch_size,
+                                     workers=args.workers)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0 if not result.get("failed") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
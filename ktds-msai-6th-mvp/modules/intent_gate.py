@@ -0,0 +1,223 @@
+"""
+검색 전 의도 판별(Intent Gate)
+
+컴플라이언스와 무관한 질문(예: "점심메뉴 추천")을 임베딩/검색 같은 네트워크 호출 전에 걸러내어
+바로 고정 안내문으로 응답하기 위한 경량 로컬 분류기입니다.
+
+- 특징: 문자 n-gram(1~3글자)을 해시 버킷으로 변환한 희소 벡터 (한국어 형태소 분석 없이 동작)
+- 모델: 로지스틱 회귀 (순수 파이썬 SGD, 외부 패키지 불필요)
+- 학습 데이터: data/intent_examples.jsonl(범위 안/밖 예시 질문) + data/9_field.json 조항 문장 + 카테고리 이름/동의어
+- 판별은 질문 길이에 비례하는 수십 마이크로초 수준이며, 앱 시작 시 한 번 학습합니다.
+
+환경변수:
+- INTENT_GATE_THRESHOLD: 범위 안 확률이 이 값보다 낮으면 차단 (기본 0.3, 0이면 차단하지 않음)
+- INTENT_GATE_LOG: 판별 로그 수준 none | blocked(기본) | all
+
+사용법 (ktds-msai-6th-mvp 폴더에서):
+  python -m modules.intent_gate --ask "점심메뉴 추천해줘"
+  python -m modules.intent_gate --eval
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import re
+import sys
+import time
+import zlib
+from typing import Dict, List, Optional
+
+from modules.category_matcher import CATEGORY_SYNONYMS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXAMPLES_PATH = os.path.join("data", "intent_examples.jsonl")
+DEFAULT_CORPUS_PATH = os.path.join("data", "9_field.json")
+DEFAULT_THRESHOLD = 0.3
+HASH_BUCKETS = 1 << 18
+NGRAM_SIZES = (1, 2, 3)
+LOG_LEVELS = ("none", "blocked", "all")
+
+_SPACE_RE = re.compile(r"\s+")
+_CLAUSE_SPLIT_RE = re.compile(r"\n|(?=\d+\) )")
+
+
+def features(text: str) -> Dict[int, float]:
+    """문자 n-gram 해시 특징 (중복 제거, L2 정규화)"""
+    text = "^" + _SPACE_RE.sub(" ", (text or "").strip().lower()) + "$"
+    keys = set()
+    for n in NGRAM_SIZES:
+        for i in range(len(text) - n + 1):
+            keys.add(zlib.crc32(text[i:i + n].encode("utf-8")) % HASH_BUCKETS)
+    if not keys:
+        return {}
+    value = 1.0 / math.sqrt(len(keys))
+    return {k: value for k in keys}
+
+
+def _sigmoid(z: float) -> float:
+    if z < -30:
+        return 0.0
+    if z > 30:
+        return 1.0
+    return 1.0 / (1.0 + math.exp(-z))
+
+
+def load_training_examples(examples_path: str = DEFAULT_EXAMPLES_PATH,
+                           corpus_path: str = DEFAULT_CORPUS_PATH) -> List[tuple]:
+    """(문장, 라벨) 목록. 라벨 1=컴플라이언스 질문(범위 안), 0=범위 밖"""
+    examples = []
+    if os.path.exists(examples_path):
+        with open(examples_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    examples.append((item["text"], int(item["label"])))
+    try:
+        with open(corpus_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        data = []
+    for item in data if isinstance(data, list) else []:
+        if not isinstance(item, dict):
+            continue
+        # 조항 문장(예: '1) ...')을 짧게 잘라 질문 길이와 비슷하게 맞춤
+        for clause in _CLAUSE_SPLIT_RE.split(item.get("content") or ""):
+            clause = clause.strip()
+            if len(clause) >= 10:
+                examples.append((clause[:80], 1))
+        category = item.get("category")
+        if category:
+            examples.append((category, 1))
+            for word in CATEGORY_SYNONYMS.get(item.get("category_no"), []):
+                examples.append((word, 1))
+    return examples
+
+
+class IntentGate:
+    """문자 n-gram 로지스틱 회귀 분류기"""
+
+    def __init__(self, weights: Dict[int, float], bias: float, threshold: float = DEFAULT_THRESHOLD,
+                 log_level: str = "blocked"):
+        self.weights = weights
+        self.bias = bias
+        self.threshold = threshold
+        self.log_level = log_level if log_level in LOG_LEVELS else "blocked"
+
+    @classmethod
+    def train(cls, examples: List[tuple], epochs: int = 30, learning_rate: float = 0.5,
+              l2: float = 1e-4, seed: int = 0, **kwargs) -> "IntentGate":
+        """SGD로 학습. 클래스 수 차이는 샘플 가중치로 보정합니다."""
+        rows = [(features(text), label) for text, label in examples]
+        n_pos = sum(1 for _, y in rows if y == 1) or 1
+        n_neg = sum(1 for _, y in rows if y == 0) or 1
+        class_weight = {1: len(rows) / (2.0 * n_pos), 0: len(rows) / (2.0 * n_neg)}
+        weights: Dict[int, float] = {}
+        bias = 0.0
+        rng = random.Random(seed)
+        order = list(range(len(rows)))
+        for epoch in range(epochs):
+            rng.shuffle(order)
+            lr = learning_rate / (1.0 + epoch * 0.1)
+            for i in order:
+                x, y = rows[i]
+                z = bias + sum(weights.get(k, 0.0) * v for k, v in x.items())
+                grad = (_sigmoid(z) - y) * class_weight[y]
+                bias -= lr * grad
+                for k, v in x.items():
+                    w = weights.get(k, 0.0)
+                    weights[k] = w - lr * (grad * v + l2 * w)
+        return cls(weights, bias, **kwargs)
+
+    @classmethod
+    def from_files(cls, examples_path: str = DEFAULT_EXAMPLES_PATH, corpus_path: str = DEFAULT_CORPUS_PATH,
+                   threshold: Optional[float] = None, log_level: Optional[str] = None) -> "IntentGate":
+        """예시 파일과 코퍼스로 학습한 분류기 (임계값/로그 수준은 인자 > 환경변수 > 기본값)"""
+        if threshold is None:
+            threshold = float(os.getenv("INTENT_GATE_THRESHOLD") or DEFAULT_THRESHOLD)
+        if log_level is None:
+            log_level = (os.getenv("INTENT_GATE_LOG") or "blocked").strip().lower()
+        t0 = time.perf_counter()
+        gate = cls.train(load_training_examples(examples_path, corpus_path), threshold=threshold, log_level=log_level)
+        logger.info(f"Intent gate 학습 완료: {len(gate.weights)} features, {(time.perf_counter() - t0) * 1000:.0f}ms")
+        return gate
+
+    def score(self, text: str) -> float:
+        """컴플라이언스 질문일 확률 (0~1)"""
+        z = self.bias + sum(self.weights.get(k, 0.0) * v for k, v in features(text).items())
+        return _sigmoid(z)
+
+    def decide(self, text: str) -> Dict:
+        """판별 결과 {"in_scope": bool, "score": float, "elapsed_us": float}"""
+        t0 = time.perf_counter()
+        score = self.score(text)
+        decision = {
+            "in_scope": self.threshold <= 0 or score >= self.threshold,
+            "score": round(score, 4),
+            "elapsed_us": round((time.perf_counter() - t0) * 1e6, 1),
+        }
+        if self.log_level == "all" or (self.log_level == "blocked" and not decision["in_scope"]):
+            logger.info(f"Intent gate: in_scope={decision['in_scope']} score={decision['score']} prompt={text[:80]!r}")
+        return decision
+
+    def should_log(self, decision: Dict) -> bool:
+        """외부 텔레메트리(App Insights 등)로 보낼 판별인지 여부 (INTENT_GATE_LOG 기준)"""
+        return self.log_level == "all" or (self.log_level == "blocked" and not decision["in_scope"])
+
+
+def _evaluate(examples_path, corpus_path, golden_path, folds=5):
+    """예시 질문을 k-fold로 나눠 평가 + 골든 질문(전부 범위 안)의 오차단율을 임계값별로 출력"""
+    questions = []
+    with open(examples_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                questions.append((item["text"], int(item["label"])))
+    corpus_only = load_training_examples(examples_path="", corpus_path=corpus_path)
+    rng = random.Random(0)
+    rng.shuffle(questions)
+    scored = []
+    for k in range(folds):
+        test = questions[k::folds]
+        train = [q for i, q in enumerate(questions) if i % folds != k] + corpus_only
+        gate = IntentGate.train(train, log_level="none")
+        scored.extend((gate.score(t), y) for t, y in test)
+    golden = []
+    if golden_path and os.path.exists(golden_path):
+        gate = IntentGate.train(questions + corpus_only, log_level="none")
+        with open(golden_path, "r", encoding="utf-8") as f:
+            golden = [gate.score(json.loads(line)["question"]) for line in f if line.strip()]
+    print(f"{'임계값':>8}{'범위밖 차단율':>14}{'범위안 오차단율':>16}{'골든 오차단율':>14}")
+    for threshold in (0.1, 0.2, 0.3, 0.4, 0.5, 0.6):
+        neg = [s for s, y in scored if y == 0]
+        pos = [s for s, y in scored if y == 1]
+        block_rate = sum(1 for s in neg if s < threshold) / (len(neg) or 1)
+        false_block = sum(1 for s in pos if s < threshold) / (len(pos) or 1)
+        golden_block = sum(1 for s in golden if s < threshold) / (len(golden) or 1)
+        print(f"{threshold:>8.1f}{block_rate:>14.2f}{false_block:>16.2f}{golden_block:>14.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="검색 전 의도 판별기")
+    parser.add_argument("--examples", default=DEFAULT_EXAMPLES_PATH)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS_PATH)
+    parser.add_argument("--golden", default=os.path.join("data", "golden_questions.jsonl"))
+    parser.add_argument("--threshold", type=float)
+    parser.add_argument("--ask", action="append", default=[], help="판별할 질문 (여러 번 지정 가능)")
+    parser.add_argument("--eval", action="store_true", help="k-fold 교차검증과 임계값별 차단율 출력")
+    args = parser.parse_args(argv)
+
+    if args.eval:
+        _evaluate(args.examples, args.corpus, args.golden)
+    if args.ask:
+        gate = IntentGate.from_files(args.examples, args.corpus, threshold=args.threshold, log_level="none")
+        for q in args.ask:
+            d = gate.decide(q)
+            print(f"{'통과' if d['in_scope'] else '차단'}  score={d['score']:.3f}  {d['elapsed_us']:.0f}us  {q}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
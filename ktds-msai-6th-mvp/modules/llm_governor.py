@@ -0,0 +1,318 @@
+"""
+LLM 동시 호출 제어기 (Governor)
+
+동시에 나가는 모델 호출에 제한이 없으면 사용자가 몰리거나 게시판의 '요약'을 연달아 누를 때
+429가 한꺼번에 발생하고 채팅/요약이 일반 오류로 실패합니다. 프로세스 공용 LLMGovernor는
+배포(deployment)별로 다음을 적용한 뒤에만 호출을 내보냅니다.
+
+- 동시 호출 수 한도 (세마포어)
+- 분당 토큰 예산 (토큰 버킷, 입력 추정 토큰 + 예상 출력 토큰을 미리 차감하고 실제 사용량으로 정산)
+- 우선순위: interactive(채팅) > background(뉴스 요약). 높은 우선순위 대기자가 있으면 낮은 쪽은 기다림
+- 같은 우선순위 안에서는 세션별 라운드 로빈 (한 세션이 요청을 여러 개 넣어도 다른 세션이 굶지 않음)
+
+대기 중에는 on_wait(순번) 콜백으로 현재 대기 순번을 알려 화면에 표시할 수 있고,
+대기 시간은 우선순위별로 stats()에 누적되며 App Insights llm_queue 이벤트로도 기록합니다.
+
+환경변수:
+- LLM_MAX_CONCURRENCY: 배포별 동시 호출 한도 기본값 (기본 8, 0이면 제어하지 않음)
+- LLM_TPM: 배포별 분당 토큰 예산 기본값 (기본 0 = 제한 없음)
+- LLM_GOVERNOR_LIMITS: 배포별 개별 설정 "배포=동시호출/분당토큰,..." (예: gpt-4.1-mini=8/150000)
+- LLM_QUEUE_TIMEOUT_S: 최대 대기 시간 (기본 60초, 넘으면 LLMQueueTimeout)
+- LLM_OUTPUT_TOKENS: 호출당 예상 출력 토큰 (기본 500)
+"""
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from modules.metrics import estimate_tokens, summarize
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = ("interactive", "background")
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_QUEUE_TIMEOUT_S = 60.0
+DEFAULT_OUTPUT_TOKENS = 500
+POLL_INTERVAL_S = 0.25
+STATS_SAMPLES = 2000
+
+
+class LLMQueueTimeout(TimeoutError):
+    """대기 시간 안에 호출 차례가 오지 않음"""
+
+
+def estimate_request_tokens(messages, output_tokens: Optional[int] = None) -> int:
+    """메시지 입력 토큰 추정 + 예상 출력 토큰"""
+    if output_tokens is None:
+        output_tokens = int(os.getenv("LLM_OUTPUT_TOKENS") or DEFAULT_OUTPUT_TOKENS)
+    text = "\n".join(str(m.get("content") if isinstance(m, dict) else getattr(m, "content", m)) for m in messages or [])
+    return estimate_tokens(text) + output_tokens
+
+
+def parse_limits(spec: Optional[str]) -> Dict[str, tuple]:
+    """'배포=동시호출/분당토큰,...' → {배포: (동시호출, 분당토큰)}"""
+    limits = {}
+    for part in (spec or "").split(","):
+        if "=" not in part:
+            continue
+        name, value = part.split("=", 1)
+        concurrency, _, tpm = value.partition("/")
+        limits[name.strip()] = (int(concurrency or 0), int(tpm or 0))
+    return limits
+
+
+class Ticket:
+    """대기/실행 중인 호출 하나"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, session_id: str, priority: int, tokens: int):
+        self.id = next(self._ids)
+        self.session_id = session_id
+        self.priority = priority
+        self.tokens = tokens
+        self.enqueued = time.monotonic()
+        self.wait_ms: Optional[float] = None
+        self.position_at_enqueue: Optional[int] = None
+        # 실제 사용 토큰 (호출 후 채우면 release 시 토큰 예산 정산)
+        self.used_tokens: Optional[int] = None
+
+
+class _Lane:
+    """배포 하나의 동시 호출 한도, 토큰 버킷, 우선순위별 세션 라운드 로빈 대기열"""
+
+    def __init__(self, name: str, max_concurrency: int, tpm: int):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.tpm = tpm
+        self.running = 0
+        self.budget = float(tpm)
+        self.refilled = time.monotonic()
+        # 우선순위별 {세션: deque[Ticket]} (삽입 순서 = 라운드 로빈 순서)
+        self.queues: List["OrderedDict[str, deque]"] = [OrderedDict() for _ in PRIORITIES]
+
+    def refill(self):
+        if not self.tpm:
+            return
+        now = time.monotonic()
+        self.budget = min(float(self.tpm), self.budget + (now - self.refilled) * self.tpm / 60.0)
+        self.refilled = now
+
+    def enqueue(self, ticket: Ticket):
+        self.queues[ticket.priority].setdefault(ticket.session_id, deque()).append(ticket)
+
+    def remove(self, ticket: Ticket):
+        sessions = self.queues[ticket.priority]
+        q = sessions.get(ticket.session_id)
+        if q is not None and ticket in q:
+            q.remove(ticket)
+            if not q:
+                del sessions[ticket.session_id]
+
+    def head(self) -> Optional[Ticket]:
+        """다음 차례: 가장 높은 우선순위에서 라운드 로빈 순서의 첫 세션의 가장 오래된 요청"""
+        for sessions in self.queues:
+            for q in sessions.values():
+                return q[0]
+        return None
+
+    def rotate(self, ticket: Ticket):
+        """차례가 된 요청을 빼고, 그 세션을 라운드 로빈 맨 뒤로 보냄"""
+        sessions = self.queues[ticket.priority]
+        q = sessions.pop(ticket.session_id)
+        q.popleft()
+        if q:
+            sessions[ticket.session_id] = q
+
+    def position(self, ticket: Ticket) -> int:
+        """앞에 있는 대기 요청 수 + 1 (라운드 로빈 순서를 그대로 따라 계산)"""
+        ahead = sum(len(q) for sessions in self.queues[:ticket.priority] for q in sessions.values())
+        sessions = self.queues[ticket.priority]
+        own = sessions.get(ticket.session_id)
+        if own is None:
+            return ahead + 1
+        k = own.index(ticket)
+        before = True
+        for sid, q in sessions.items():
+            if sid == ticket.session_id:
+                before = False
+                continue
+            # 내 세션보다 앞 순서의 세션은 (k + 1)번째 라운드까지, 뒤 순서의 세션은 k번째 라운드까지 먼저 나감
+            ahead += min(len(q), k + 1 if before else k)
+        return ahead + k + 1
+
+    def can_start(self, ticket: Ticket) -> bool:
+        if self.max_concurrency and self.running >= self.max_concurrency:
+            return False
+        if self.tpm:
+            self.refill()
+            # 예산보다 큰 요청은 버킷이 가득 찼을 때 보냄 (영원히 막히지 않도록)
+            if self.budget < min(ticket.tokens, self.tpm):
+                return False
+        return True
+
+
+class LLMGovernor:
+    """배포별 _Lane을 관리하는 프로세스 공용 제어기"""
+
+    def __init__(self, limits: Optional[Dict[str, tuple]] = None, max_concurrency: Optional[int] = None,
+                 tpm: Optional[int] = None, telemetry=None):
+        self.default_concurrency = int(os.getenv("LLM_MAX_CONCURRENCY") or DEFAULT_MAX_CONCURRENCY) \
+            if max_concurrency is None else max_concurrency
+        self.default_tpm = int(os.getenv("LLM_TPM") or 0) if tpm is None else tpm
+        self.limits = parse_limits(os.getenv("LLM_GOVERNOR_LIMITS")) if limits is None else limits
+        self.telemetry = telemetry
+        self._lanes: Dict[str, _Lane] = {}
+        self._cond = threading.Condition()
+        self._waits = {p: deque(maxlen=STATS_SAMPLES) for p in PRIORITIES}
+        self._counts = {"admitted": 0, "timeouts": 0}
+
+    def _lane(self, deployment: str) -> _Lane:
+        lane = self._lanes.get(deployment)
+        if lane is None:
+            concurrency, tpm = self.limits.get(deployment, (self.default_concurrency, self.default_tpm))
+            lane = self._lanes[deployment] = _Lane(deployment, concurrency, tpm)
+        return lane
+
+    def acquire(self, deployment: str, session_id: str = "default", priority: str = "interactive",
+                tokens: int = 0, on_wait: Optional[Callable[[int], None]] = None,
+                timeout_s: Optional[float] = None) -> Ticket:
+        """차례가 올 때까지 대기 후 Ticket 반환. 대기 중에는 순번이 바뀔 때마다 on_wait(순번) 호출"""
+        if timeout_s is None:
+            timeout_s = float(os.getenv("LLM_QUEUE_TIMEOUT_S") or DEFAULT_QUEUE_TIMEOUT_S)
+        ticket = Ticket(session_id, PRIORITIES.index(priority), tokens)
+        deadline = ticket.enqueued + timeout_s
+        last_position = None
+        with self._cond:
+            lane = self._lane(deployment)
+            lane.enqueue(ticket)
+            ticket.position_at_enqueue = lane.position(ticket)
+            while True:
+                if lane.head() is ticket and lane.can_start(ticket):
+                    lane.rotate(ticket)
+                    lane.running += 1
+                    if lane.tpm:
+                        lane.budget -= ticket.tokens
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    lane.remove(ticket)
+                    self._counts["timeouts"] += 1
+                    self._cond.notify_all()
+                    raise LLMQueueTimeout(f"요청이 많아 {timeout_s:g}초 안에 모델 호출 차례가 오지 않았습니다.")
+                position = lane.position(ticket)
+                if on_wait and position != last_position:
+                    last_position = position
+                    # 콜백(화면 갱신)이 오래 걸려도 다른 요청을 막지 않도록 잠금 밖에서 호출
+                    self._cond.release()
+                    try:
+                        on_wait(position)
+                    except Exception:
+                        pass
+                    finally:
+                        self._cond.acquire()
+                    continue
+                # 토큰 예산은 시간이 지나면 차므로 주기적으로 다시 확인
+                self._cond.wait(timeout=min(POLL_INTERVAL_S, remaining))
+            ticket.wait_ms = round((time.monotonic() - ticket.enqueued) * 1000, 1)
+            self._waits[PRIORITIES[ticket.priority]].append(ticket.wait_ms)
+            self._counts["admitted"] += 1
+            self._cond.notify_all()
+        if self.telemetry and (ticket.wait_ms > 0 or ticket.position_at_enqueue > 1):
+            try:
+                self.telemetry.track_event("llm_queue", {
+                    "deployment": deployment, "priority": priority, "wait_ms": ticket.wait_ms,
+                    "position": ticket.position_at_enqueue, "tokens": ticket.tokens})
+            except Exception:
+                pass
+        return ticket
+
+    def try_acquire(self, deployment: str, session_id: str = "default", priority: str = "interactive",
+                    tokens: int = 0) -> Optional[Ticket]:
+        """기다리지 않고 바로 나갈 수 있을 때만 Ticket, 아니면 None (헤지처럼 대기할 이유가 없는 추가 호출용)"""
+        ticket = Ticket(session_id, PRIORITIES.index(priority), tokens)
+        with self._cond:
+            lane = self._lane(deployment)
+            # 대기자가 있으면 새치기하지 않음
+            if lane.head() is not None or not lane.can_start(ticket):
+                return None
+            lane.running += 1
+            if lane.tpm:
+                lane.budget -= ticket.tokens
+            ticket.wait_ms = 0.0
+            self._counts["admitted"] += 1
+        return ticket
+
+    def release(self, deployment: str, ticket: Ticket, used_tokens: Optional[int] = None):
+        """호출 종료. used_tokens(실제 입력+출력 토큰)가 있으면 미리 차감한 추정치와의 차이를 정산"""
+        with self._cond:
+            lane = self._lane(deployment)
+            lane.running = max(0, lane.running - 1)
+            if lane.tpm and used_tokens is not None:
+                lane.budget = min(float(lane.tpm), lane.budget + ticket.tokens - used_tokens)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, deployment: str, session_id: str = "default", priority: str = "interactive",
+             tokens: int = 0, on_wait: Optional[Callable[[int], None]] = None, timeout_s: Optional[float] = None):
+        """with GOVERNOR.slot(...) as ticket: 안에서 모델을 호출. ticket.used_tokens를 채우면 종료 시 정산"""
+        ticket = self.acquire(deployment, session_id, priority, tokens, on_wait, timeout_s)
+        try:
+            yield ticket
+        finally:
+            self.release(deployment, ticket, ticket.used_tokens)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            lanes = {name: {"running": lane.running, "max_concurrency": lane.max_concurrency,
+                            "tpm": lane.tpm, "budget": round(lane.budget, 1) if lane.tpm else None,
+                            "waiting": {PRIORITIES[i]: sum(len(q) for q in s.values()) for i, s in enumerate(lane.queues)}}
+                     for name, lane in self._lanes.items()}
+            waits = {p: summarize(v) for p, v in self._waits.items()}
+            counts = dict(self._counts)
+        return {**counts, "lanes": lanes, "wait_ms": waits}
+
+
+def current_session_id() -> str:
+    """Streamlit 세션 id (스크립트 스레드 밖이나 Streamlit 없이 실행하면 스레드 이름)"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx(suppress_warning=True)
+        if ctx is not None:
+            return ctx.session_id
+    except Exception:
+        pass
+    return threading.current_thread().name
+
+
+_GOVERNOR: Optional[LLMGovernor] = None
+_GOVERNOR_LOCK = threading.Lock()
+
+
+def get_governor(telemetry=None) -> Optional[LLMGovernor]:
+    """프로세스 공용 제어기 (LLM_MAX_CONCURRENCY=0이고 개별 설정도 없으면 None = 제어하지 않음)"""
+    global _GOVERNOR
+    with _GOVERNOR_LOCK:
+        if _GOVERNOR is None:
+            if os.getenv("LLM_MAX_CONCURRENCY") == "0" and not os.getenv("LLM_GOVERNOR_LIMITS"):
+                return None
+            _GOVERNOR = LLMGovernor()
+        if telemetry is not None and _GOVERNOR.telemetry is None:
+            _GOVERNOR.telemetry = telemetry
+        return _GOVERNOR
+
+
+@contextmanager
+def governed(deployment: str, messages, session_id: str = "default", priority: str = "interactive",
+             on_wait: Optional[Callable[[int], None]] = None, telemetry=None):
+    """공용 제어기로 호출 차례를 기다림 (제어기를 끈 경우 바로 실행)"""
+    governor = get_governor(telemetry)
+    if governor is None:
+        yield None
+        return
+    with governor.slot(deployment, session_id, priority, estimate_request_tokens(messages), on_wait) as ticket:
+        yield ticket
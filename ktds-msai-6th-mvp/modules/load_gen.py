@@ -0,0 +1,293 @@
+"""
+동시 사용자 부하 생성기
+
+N명의 가상 사용자가 동시에 챗봇을 사용하는 상황을 만들어
+실제 앱 코드(채팅: modules/chat_pipeline.py, 게시판 요약: modules/newssummary.py)를 그대로 호출하며
+동시성 단계별 처리량, 꼬리 지연시간(p95/p99), 오류율을 보고합니다.
+
+기본적으로 로컬 Azure 대체 서비스(modules/mock_azure.py)를 프로세스 안에서 띄워 사용하므로
+Azure 쿼터를 소모하지 않습니다. --target 으로 이미 떠 있는 Mock Server를 지정할 수도 있습니다.
+
+사용법 (ktds-msai-6th-mvp 폴더에서):
+  python -m modules.load_gen --concurrency 1,2,4,8,16 --sessions 4 --turns 3
+  python -m modules.load_gen --mock-set chat.rps=5 --mock-set chat.max_inflight=4 --report data/bench/load.json
+  python -m modules.load_gen --target http://127.0.0.1:8765 --summary-ratio 0.2
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import urlopen
+
+from modules.metrics import summarize
+from modules.mock_azure import start_mock_server, mock_env, parse_set_option, DEFAULT_INDEX
+from modules.rag_bench import default_questions
+
+DEFAULT_LEVELS = "1,2,4,8"
+
+
+class _TurnResult:
+    __slots__ = ("kind", "latency_ms", "ttft_ms", "error", "degraded", "shared")
+
+    def __init__(self, kind, latency_ms, ttft_ms=None, error=None, degraded=(), shared=False):
+        self.kind = kind
+        self.latency_ms = latency_ms
+        self.ttft_ms = ttft_ms
+        self.error = error
+        # 마감을 넘겨 축소된 단계 (embed/search/first_token)
+        self.degraded = list(degraded)
+        # 다른 세션의 같은 질문 결과를 나눠 받았는지 (singleflight follower)
+        self.shared = shared
+
+
+_APP_STATE = None
+_APP_STATE_LOCK = threading.Lock()
+
+
+def _app_state():
+    # 앱이 st.cache_resource로 프로세스당 한 번 만드는 카테고리 매처/의도 분류기/singleflight를 같은 방식으로 공유
+    global _APP_STATE
+    with _APP_STATE_LOCK:
+        if _APP_STATE is None:
+            from modules.category_matcher import CategoryMatcher
+            from modules.intent_gate import IntentGate
+            from modules.singleflight import SingleFlight
+            _APP_STATE = {"matcher": CategoryMatcher.from_file(), "gate": IntentGate.from_files(),
+                          "single_flight": SingleFlight()}
+        return _APP_STATE
+
+
+def chat_turn(prompt, history, env, top_k=5, session_id="default"):
+    """app.py의 Azure Search 모드 한 턴을 앱과 같은 코드(modules/chat_pipeline.py)로 실행하고 결과를 반환
+
+    의도 판별, 동일 질문 합치기(singleflight), 질문 마감/단계 축소, 개요 요약, 연합 검색, 모델 라우팅,
+    LLM 동시 호출 제어기 대기를 앱과 똑같이 거치고, 화면 출력 대신 flight의 결과/토큰 스트림을 소비해 시간을 잽니다.
+    결과 종류(kind): briefs(개요 요약), canned(고정 안내문), extractive(발췌 답변), chat(모델 답변)
+    """
+    from modules.category_briefs import format_briefs
+    from modules.chat_pipeline import CANNED_ANSWER, decide_scope, start_turn
+    from modules.rag_pipeline import init_chat_model
+
+    state = _app_state()
+    errors = []
+    t0 = time.perf_counter()
+    elapsed = lambda: (time.perf_counter() - t0) * 1000
+    # app.py는 rerun마다 기본 채팅 모델을 새로 만들므로 동일하게 재현
+    model = init_chat_model(env, env["chat_deployment"], on_error=errors.append)
+    if not model:
+        return _TurnResult("chat", elapsed(), error=errors[0] if errors else "chat model init failed")
+    history.append({"role": "user", "content": prompt})
+    category_plan, in_scope = decide_scope(state["matcher"], state["gate"], prompt, top_k)
+    flight, leader = start_turn(state["single_flight"], prompt, category_plan, in_scope, top_k, model,
+                                list(history), session_id, env)
+    try:
+        meta = flight.wait_meta()
+    except Exception as e:
+        return _TurnResult("chat", elapsed(), error=f"{type(e).__name__}: {e}", shared=not leader)
+    degraded = [d["stage"] for d in meta.get("degraded") or []]
+    if meta.get("errors"):
+        return _TurnResult("chat", elapsed(), error=meta["errors"][0], degraded=degraded, shared=not leader)
+    if meta.get("briefs"):
+        history.append({"role": "assistant", "content": format_briefs(meta["briefs"])})
+        return _TurnResult("briefs", elapsed(), degraded=degraded, shared=not leader)
+    if not meta.get("docs"):
+        # 앱은 고정 안내문으로 응답 (모델 호출 없음)
+        history.append({"role": "assistant", "content": CANNED_ANSWER})
+        return _TurnResult("canned", elapsed(), degraded=degraded, shared=not leader)
+    kind = "extractive" if meta.get("route") == "extractive" else "chat"
+    response_text = ""
+    ttft = None
+    try:
+        for chunk in flight.stream():
+            if chunk.content and ttft is None:
+                ttft = elapsed()
+            response_text += chunk.content
+    except Exception as e:
+        return _TurnResult(kind, elapsed(), ttft, error=f"{type(e).__name__}: {e}", degraded=degraded, shared=not leader)
+    if flight.status.get("first_token_degraded"):
+        degraded.append("first_token")
+    if response_text:
+        history.append({"role": "assistant", "content": response_text})
+    return _TurnResult(kind, elapsed(), ttft, degraded=degraded, shared=not leader)
+
+
+def summary_turn(post):
+    """게시판 '요약' 버튼 + '슬랙으로 전송하기'와 같은 호출을 재현"""
+    from modules.newssummary import summarize_post, post_summary_to_slack
+
+    t0 = time.perf_counter()
+    try:
+        summary = summarize_post(post)
+        resp = post_summary_to_slack(post, summary, os.getenv("SLACK_WEBHOOK_URL"))
+        error = None if resp.status_code == 200 else f"slack {resp.status_code}"
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return _TurnResult("summary", (time.perf_counter() - t0) * 1000, error=error)
+
+
+def run_level(concurrency, sessions_per_worker, turns, questions, posts, env,
+              summary_ratio=0.0, think_ms=0.0, seed=0):
+    """동시성 한 단계를 실행하여 턴 결과 목록과 경과 시간(초)을 반환"""
+    rng = random.Random(seed)
+    plans = []
+    for _ in range(concurrency * sessions_per_worker):
+        if posts and rng.random() < summary_ratio:
+            plans.append(("summary", [rng.choice(posts)]))
+        else:
+            plans.append(("chat", [rng.choice(questions) for _ in range(turns)]))
+
+    results = []
+    lock = threading.Lock()
+
+    def session(index, plan):
+        kind, items = plan
+        history = []
+        local = []
+        for i, item in enumerate(items):
+            if i and think_ms:
+                time.sleep(think_ms / 1000.0)
+            local.append(summary_turn(item) if kind == "summary"
+                         else chat_turn(item, history, env, session_id=f"load-{seed}-{index}"))
+        with lock:
+            results.extend(local)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(session, range(len(plans)), plans))
+    return results, time.perf_counter() - t0
+
+
+def _fetch_mock_stats(url):
+    try:
+        with urlopen(f"{url}/_mock/stats", timeout=5) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+    except Exception:
+        return {}
+
+
+def summarize_level(concurrency, results, elapsed, mock_stats, embedding_batches=None, circuit_breakers=None,
+                    hedging=None):
+    errors = [r for r in results if r.error]
+    error_kinds = {}
+    for r in errors:
+        key = (r.error or "").split(":", 1)[0][:60]
+        error_kinds[key] = error_kinds.get(key, 0) + 1
+    return {
+        "concurrency": concurrency,
+        "turns": len(results),
+        "elapsed_s": elapsed,
+        "throughput_tps": (len(results) / elapsed) if elapsed > 0 else 0.0,
+        "error_rate": (len(errors) / len(results)) if results else 0.0,
+        "errors": error_kinds,
+        "canned": sum(1 for r in results if r.kind == "canned"),
+        "kinds": {kind: sum(1 for r in results if r.kind == kind) for kind in sorted({r.kind for r in results})},
+        "degraded": {stage: sum(1 for r in results if stage in r.degraded)
+                     for stage in sorted({s for r in results for s in r.degraded})},
+        "shared": sum(1 for r in results if r.shared),
+        "latency_ms": summarize([r.latency_ms for r in results if not r.error]),
+        "ttft_ms": summarize([r.ttft_ms for r in results if r.ttft_ms is not None and not r.error]),
+        "upstream_throttled": {k: v.get("throttled", 0) for k, v in mock_stats.items()},
+        "embedding_batches": embedding_batches,
+        "circuit_breakers": circuit_breakers,
+        "hedging": hedging,
+    }
+
+
+def print_level(row):
+    lat, ttft = row["latency_ms"], row["ttft_ms"]
+    throttled = sum(row["upstream_throttled"].values())
+    print(f"{row['concurrency']:>5}{row['turns']:>7}{row['throughput_tps']:>10.2f}"
+          f"{ttft['p50']:>10.0f}{ttft['p99']:>10.0f}{lat['p50']:>10.0f}{lat['p99']:>10.0f}"
+          f"{row['error_rate'] * 100:>8.1f}%{throttled:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="동시 사용자 부하 생성기")
+    parser.add_argument("--target", help="이미 실행 중인 Mock Server URL (미지정 시 프로세스 내에서 시작)")
+    parser.add_argument("--index", default=DEFAULT_INDEX)
+    parser.add_argument("--concurrency", default=DEFAULT_LEVELS, help="쉼표로 구분한 동시성 단계 (예: 1,2,4,8)")
+    parser.add_argument("--sessions", type=int, default=3, help="동시성 단계마다 작업자 1명이 처리할 세션 수")
+    parser.add_argument("--turns", type=int, default=2, help="채팅 세션당 질문 수")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="같은 세션의 질문 사이 대기시간")
+    parser.add_argument("--summary-ratio", type=float, default=0.0, help="게시글 요약+슬랙 전송 세션의 비율")
+    parser.add_argument("--mock-set", action="append", default=[], help="프로세스 내 Mock Server 설정 (예: chat.rps=5)")
+    parser.add_argument("--report", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    # SDK/HTTP 클라이언트의 요청 단위 INFO 로그가 측정을 방해하지 않도록 낮춤
+    for name in ("azure", "httpx", "httpx2", "openai"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    server = None
+    url = args.target
+    if not url:
+        server = start_mock_server(parse_set_option(args.mock_set), index_name=args.index)
+        url = server.url
+    os.environ.update(mock_env(url, args.index))
+
+    from modules.embedding_batcher import get_batcher
+    from modules.resilient_client import breaker_stats
+    from modules.hedging import get_policy
+    from modules.rag_pipeline import get_env_keys
+    from modules.local_backend import load_corpus_documents
+
+    env = get_env_keys()
+    questions = default_questions(load_corpus_documents())
+    try:
+        with open(os.path.join("data", "board_data.json"), "r", encoding="utf-8") as f:
+            posts = json.load(f)
+    except Exception:
+        posts = []
+
+    levels = [int(x) for x in args.concurrency.split(",") if x.strip()]
+    print(f"대상: {url}  세션/작업자={args.sessions} 턴={args.turns} 요약비율={args.summary_ratio}")
+    print(f"{'동시성':>5}{'턴':>7}{'턴/s':>10}{'TTFT50':>10}{'TTFT99':>10}{'E2E50':>10}{'E2E99':>10}{'오류율':>9}{'429':>8}")
+    rows = []
+    for i, level in enumerate(levels):
+        if server:
+            server.reset_stats()
+        before = _fetch_mock_stats(url) if not server else {}
+        batcher = get_batcher(env)
+        if batcher:
+            batcher.reset_stats()
+        get_policy().reset_stats()
+        results, elapsed = run_level(level, args.sessions, args.turns, questions, posts, env,
+                                     summary_ratio=args.summary_ratio, think_ms=args.think_ms, seed=i)
+        stats = server.snapshot() if server else _fetch_mock_stats(url)
+        if before:
+            stats = {k: {"throttled": v.get("throttled", 0) - before.get(k, {}).get("throttled", 0)} for k, v in stats.items()}
+        row = summarize_level(level, results, elapsed, stats, batcher.stats() if batcher else None, breaker_stats(),
+                              get_policy().stats())
+        rows.append(row)
+        print_level(row)
+        if batcher and row["embedding_batches"]["requests"]:
+            b = row["embedding_batches"]
+            print(f"      임베딩 배치: 질문 {b['requests']}건 → 요청 {b['batches']}회, 배치 크기 p50={b['batch_size']['p50']:.0f} "
+                  f"max={b['batch_size']['max']:.0f}, 큐 대기 p95={b['wait_ms']['p95']:.1f}ms")
+        if row["degraded"] or row["shared"]:
+            print(f"      종류 {row['kinds']}, 축소 {row['degraded']}, 같은 질문 합침 {row['shared']}건")
+        h = row["hedging"]
+        if h["hedged"]:
+            print(f"      헤지: {h['hedged']}/{h['requests']}건 ({h['hedge_rate']:.1%}), 헤지 승 {h['hedge_wins']}회, "
+                  f"지연 {h['delay_ms']:.0f}ms")
+        for name, b in (row["circuit_breakers"] or {}).items():
+            if b["failures"] or b["state"] != "closed":
+                print(f"      브레이커 {name}: {b['state']} 실패 {b['failures']} 차단 {b['rejected']} 열림 {b['trips']}회")
+
+    if args.report:
+        os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"target": url, "levels": rows}, f, ensure_ascii=False, indent=2)
+    if server:
+        server.shutdown()
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""
+로컬 검색 백엔드 모듈
+
+Azure 없이 9_field.json 코퍼스를 메모리에 올려 검색하는 대체 구현입니다.
+- 글자 bigram 해시 기반의 결정적(deterministic) 임베딩
+- bigram 기반 키워드 점수(BM25 근사) 및 코사인 유사도 벡터 검색
+
+벤치마크 카세트 합성, 로컬 대체 서비스, 평가 도구가 같은 코퍼스/점수 체계를 공유합니다.
+실제 Azure 임베딩과 점수 값은 다르므로 지연시간·흐름 검증용으로만 사용합니다.
+"""
+import json
+import math
+import os
+import re
+import zlib
+from typing import Dict, List, Optional
+
+DEFAULT_DIMENSIONS = 256
+
+_WS_RE = re.compile(r"\s+")
+
+
+def _bigrams(text: str) -> List[str]:
+    """공백을 정리한 뒤 글자 bigram 목록을 반환 (한국어는 띄어쓰기 단위보다 bigram이 안정적)"""
+    norm = _WS_RE.sub(" ", (text or "").lower()).strip()
+    if len(norm) < 2:
+        return [norm] if norm else []
+    return [norm[i:i + 2] for i in range(len(norm) - 1)]
+
+
+def hash_embedding(text: str, dimensions: int = DEFAULT_DIMENSIONS) -> List[float]:
+    """텍스트를 bigram 해시로 투영한 L2 정규화 벡터를 반환합니다 (같은 입력이면 항상 같은 벡터)."""
+    vec = [0.0] * dimensions
+    for gram in _bigrams(text):
+        h = zlib.crc32(gram.encode("utf-8"))
+        sign = 1.0 if (h >> 31) & 1 else -1.0
+        vec[h % dimensions] += sign
+    norm = math.sqrt(sum(v * v for v in vec))
+    if norm == 0:
+        return vec
+    return [v / norm for v in vec]
+
+
+def load_corpus_documents(path: str = os.path.join("data", "9_field.json")) -> List[Dict]:
+    """로컬 JSON을 인덱스 업로드와 동일한 규칙(build_index_documents)으로 문서 리스트로 변환"""
+    from modules.azure_ai_search import build_index_documents
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return build_index_documents(data, os.path.basename(path))
+
+
+_CMP_RE = re.compile(r"^\s*(\w+)\s+(eq|ne|gt|ge|lt|le)\s+(.+?)\s*$")
+_IN_RE = re.compile(r"^\s*search\.in\(\s*(\w+)\s*,\s*'([^']*)'\s*(?:,\s*'([^']*)'\s*)?\)\s*$")
+
+
+def _literal(token: str):
+    token = token.strip()
+    if token.startswith("'") and token.endswith("'"):
+        return token[1:-1].replace("''", "'")
+    if token == "null":
+        return None
+    if token in ("true", "false"):
+        return token == "true"
+    try:
+        return int(token)
+    except ValueError:
+        return float(token)
+
+
+def parse_odata_filter(expr: Optional[str]):
+    """Azure Search OData 필터의 단순 부분집합을 문서 dict 판별 함수로 변환
+
+    지원: `field eq|ne|gt|ge|lt|le 값`, `search.in(field, 'a,b')`, `and`/`or` 결합(괄호 중첩 없음).
+    """
+    if not expr:
+        return None
+    ops = {
+        "eq": lambda a, b: a == b,
+        "ne": lambda a, b: a != b,
+        "gt": lambda a, b: a is not None and a > b,
+        "ge": lambda a, b: a is not None and a >= b,
+        "lt": lambda a, b: a is not None and a < b,
+        "le": lambda a, b: a is not None and a <= b,
+    }
+
+    def clause(text):
+        text = text.strip()
+        while text.startswith("(") and text.endswith(")"):
+            text = text[1:-1].strip()
+        m = _IN_RE.match(text)
+        if m:
+            field, values, sep = m.group(1), m.group(2), m.group(3) or ","
+            allowed = set(v.strip() for v in values.split(sep))
+            return lambda d: d.get(field) in allowed
+        m = _CMP_RE.match(text)
+        if not m:
+            raise ValueError(f"지원되지 않는 필터 식입니다: {text}")
+        field, op, value = m.group(1), ops[m.group(2)], _literal(m.group(3))
+        return lambda d: op(d.get(field), value)
+
+    groups = []
+    for part in re.split(r"\s+or\s+", expr.strip()):
+        groups.append([clause(c) for c in re.split(r"\s+and\s+", part.strip().strip("()"))])
+    return lambda d: any(all(fn(d) for fn in g) for g in groups)
+
+
+class LocalCorpus:
+    """메모리 내 문서 집합에 대한 키워드/벡터 검색
+
+    반환 형식은 Azure SearchClient.search 결과와 같은 dict(`@search.score` 포함)입니다.
+    """
+
+    def __init__(self, docs: List[Dict], dimensions: int = DEFAULT_DIMENSIONS):
+        self.dimensions = dimensions
+        self.docs = [dict(d) for d in docs]
+        self._rebuild()
+
+    def _rebuild(self):
+        self._grams = []
+        self._df: Dict[str, int] = {}
+        for d in self.docs:
+            if not d.get("content_vector"):
+                d["content_vector"] = hash_embedding(d.get("content") or "", self.dimensions)
+            counts: Dict[str, int] = {}
+            for g in _bigrams(d.get("content") or ""):
+                counts[g] = counts.get(g, 0) + 1
+            self._grams.append(counts)
+            for g in counts:
+                self._df[g] = self._df.get(g, 0) + 1
+        self._avg_len = (sum(sum(c.values()) for c in self._grams) / len(self._grams)) if self._grams else 1.0
+
+    def upsert(self, docs: List[Dict]):
+        """id 기준으로 문서를 추가/병합합니다 (mergeOrUpload와 같은 의미)."""
+        pos = {d.get("id"): i for i, d in enumerate(self.docs)}
+        for doc in docs:
+            i = pos.get(doc.get("id"))
+            if i is None:
+                pos[doc.get("id")] = len(self.docs)
+                self.docs.append(dict(doc))
+            else:
+                merged = dict(self.docs[i])
+                merged.update(doc)
+                self.docs[i] = merged
+        self._rebuild()
+
+    def delete(self, ids):
+        drop = set(ids)
+        self.docs = [d for d in self.docs if d.get("id") not in drop]
+        self._rebuild()
+
+    @classmethod
+    def from_file(cls, path: str = os.path.join("data", "9_field.json"), dimensions: int = DEFAULT_DIMENSIONS):
+        return cls(load_corpus_documents(path), dimensions)
+
+    def embed(self, text: str) -> List[float]:
+        return hash_embedding(text, self.dimensions)
+
+    def _keyword_score(self, idx: int, query_grams: List[str]) -> float:
+        # BM25 근사 (k1=1.2, b=0.75)
+        counts = self._grams[idx]
+        dl = sum(counts.values()) or 1
+        n = len(self.docs)
+        score = 0.0
+        for g in set(query_grams):
+            tf = counts.get(g, 0)
+            if not tf:
+                continue
+            df = self._df.get(g, 0)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            score += idf * (tf * 2.2) / (tf + 1.2 * (0.25 + 0.75 * dl / self._avg_len))
+        return score
+
+    def search(self, search_text: Optional[str] = None, vector: Optional[List[float]] = None,
+               top: int = 5, filter_fn=None) -> List[Dict]:
+        """키워드(search_text) 또는 벡터(vector) 검색. 둘 다 주어지면 두 점수를 합산합니다.
+
+        filter_fn: 문서 dict를 받아 bool을 반환하는 함수(OData 필터 대체)
+        """
+        query_grams = _bigrams(search_text) if search_text and search_text != "*" else []
+        scored = []
+        for i, d in enumerate(self.docs):
+            if filter_fn is not None and not filter_fn(d):
+                continue
+            score = 0.0
+            if query_grams:
+                score += self._keyword_score(i, query_grams)
+            if vector is not None:
+                dv = d["content_vector"]
+                score += sum(a * b for a, b in zip(vector, dv))
+            if not query_grams and vector is None:
+                score = 1.0
+            scored.append((score, i))
+        scored.sort(key=lambda t: t[0], reverse=True)
+        results = []
+        for score, i in scored[:top]:
+            r = dict(self.docs[i])
+            r["@search.score"] = score
+            results.append(r)
+        return results
+
+
+class EmbeddingResponse:
+    """embeddings.create() 응답과 같은 모양(.data[i].embedding)의 객체"""
+
+    class _Item:
+        def __init__(self, embedding):
+            self.embedding = embedding
+
+    def __init__(self, vectors):
+        self.data = [self._Item(v) for v in vectors]
+
+
+class LocalEmbeddingClient:
+    """hash_embedding을 사용하는 임베딩 클라이언트 (rag_pipeline.get_embedding에 주입용)"""
+
+    def __init__(self, dimensions: int = DEFAULT_DIMENSIONS):
+        self.dimensions = dimensions
+
+    @property
+    def embeddings(self):
+        return self
+
+    def create(self, model=None, input=None, dimensions=None, **kwargs):
+        inputs = [input] if isinstance(input, str) else list(input or [])
+        return EmbeddingResponse([hash_embedding(t, dimensions or self.dimensions) for t in inputs])
+
+
+class LocalSearchClient:
+    """LocalCorpus를 Azure SearchClient.search와 같은 호출 방식으로 감싼 클라이언트"""
+
+    def __init__(self, corpus: LocalCorpus):
+        self.corpus = corpus
+
+    def search(self, search_text=None, top=None, filter=None, select=None, vector=None, vector_queries=None, **kwargs):
+        query_vector = None
+        k = None
+        if isinstance(vector, dict):
+            query_vector, k = vector.get("value"), vector.get("k")
+        for vq in vector_queries or []:
+            query_vector = getattr(vq, "vector", None)
+            k = getattr(vq, "k_nearest_neighbors", None) or k
+        hits = self.corpus.search(search_text=search_text, vector=query_vector, top=top or k or 50,
+                                  filter_fn=parse_odata_filter(filter))
+        if select:
+            keep = set(select if isinstance(select, (list, tuple)) else str(select).split(","))
+            hits = [{k2: v for k2, v in h.items() if k2 in keep or k2.startswith("@search.")} for h in hits]
+        return iter(hits)
@@ -0,0 +1,67 @@
+"""
+간단한 지연시간/분포 통계 유틸리티
+
+벤치마크/부하 테스트/평가 도구가 공통으로 사용하는 백분위수 계산과 토큰 수 추정 함수입니다.
+외부 패키지(numpy 등) 없이 동작하도록 순수 파이썬으로 작성했습니다. (tiktoken은 있으면 사용)
+"""
+import math
+
+try:
+    import tiktoken
+except Exception:
+    # tiktoken이 없으면 글자 수 기반 근사치를 사용
+    tiktoken = None
+
+_ENCODING = None
+# 인코딩을 한 번 못 받으면(오프라인 등) 다시 내려받지 않고 글자 수 근사치만 사용
+_ENCODING_FAILED = False
+
+
+def percentile(values, q: float) -> float:
+    """값 목록의 q 백분위수(0~100)를 선형 보간으로 계산합니다. 빈 목록이면 0.0을 반환합니다."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return float(ordered[0])
+    pos = (len(ordered) - 1) * (q / 100.0)
+    lo = math.floor(pos)
+    hi = math.ceil(pos)
+    if lo == hi:
+        return float(ordered[lo])
+    return float(ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo))
+
+
+def summarize(values) -> dict:
+    """값 목록을 count/mean/p50/p90/p95/p99/max 요약 dict로 변환합니다."""
+    values = list(values)
+    if not values:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p90": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": float(max(values)),
+    }
+
+
+def estimate_tokens(text: str) -> int:
+    """텍스트의 토큰 수를 추정합니다 (tiktoken이 있으면 o200k_base, 없으면 한국어 기준 약 1.5자당 1토큰)."""
+    global _ENCODING, _ENCODING_FAILED
+    if not text:
+        return 0
+    if tiktoken is not None and not _ENCODING_FAILED:
+        if _ENCODING is None:
+            try:
+                _ENCODING = tiktoken.get_encoding("o200k_base")
+            except Exception:
+                _ENCODING_FAILED = True
+        if _ENCODING is not None:
+            try:
+                return len(_ENCODING.encode(text))
+            except Exception:
+                pass
+    return int(math.ceil(len(text) / 1.5))
@@ -0,0 +1,530 @@
+"""
+로컬 Azure 대체 서비스 (Mock Server)
+
+app.py, AzureSearchClient, newssummary.py가 호출하는 엔드포인트를 로컬에서 흉내 내어
+Azure 사용량(쿼터) 없이 부하 테스트를 할 수 있게 합니다.
+
+지원 엔드포인트:
+- Azure AI Search : 인덱스 조회/생성(/indexes('이름')), 문서 검색(docs/search.post.search),
+                    문서 업로드(docs/search.index), 문서 수(docs/$count), 인덱스 통계(search.stats)
+- Azure OpenAI    : 임베딩(/openai/deployments/{배포}/embeddings),
+                    채팅 완성(/openai/deployments/{배포}/chat/completions, stream=true 시 SSE)
+                    (usage.prompt_tokens_details.cached_tokens: 이전 요청과 같은 메시지 접두사가 1024 토큰 이상이면 캐시 적중으로 보고)
+- Slack Webhook   : /slack/..., /services/... 로 들어오는 POST
+- 상태 확인       : GET /_mock/stats (엔드포인트별 요청/429/지연 통계)
+
+엔드포인트 종류(search/index/embeddings/chat/slack)마다 지연시간(로그정규), 초당 처리량(토큰 버킷),
+동시 처리 한도, 무작위 429 비율과 Retry-After 값을 설정할 수 있습니다.
+
+사용법 (ktds-msai-6th-mvp 폴더에서):
+  python -m modules.mock_azure --port 8765 --set chat.rps=5 --set search.latency_ms=120
+  # 출력되는 환경변수를 .env 대신 사용하면 app.py가 Mock Server로 요청합니다.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, unquote
+
+from modules.local_backend import LocalCorpus, load_corpus_documents, hash_embedding, parse_odata_filter, _bigrams
+from modules.metrics import summarize
+
+DEFAULT_INDEX = "compliance-9fields"
+DEFAULT_EMBEDDING_DIMENSIONS = 1536
+
+# 엔드포인트 종류별 기본 설정
+#   latency_ms: 응답 지연 중앙값, jitter: 로그정규 표준편차, rps: 초당 허용 요청(0=무제한)
+#   max_inflight: 동시 처리 한도(0=무제한), error_429_rate: 무작위 429 비율, retry_after_s: 429 응답의 Retry-After
+DEFAULT_CONFIG = {
+    "search": {"latency_ms": 80.0, "jitter": 0.4, "rps": 0, "max_inflight": 0, "error_429_rate": 0.0, "retry_after_s": 1},
+    "index": {"latency_ms": 150.0, "jitter": 0.3, "rps": 0, "max_inflight": 0, "error_429_rate": 0.0, "retry_after_s": 1},
+    "embeddings": {"latency_ms": 45.0, "jitter": 0.35, "rps": 0, "max_inflight": 0, "error_429_rate": 0.0, "retry_after_s": 1},
+    "chat": {"latency_ms": 650.0, "jitter": 0.45, "rps": 0, "max_inflight": 0, "error_429_rate": 0.0, "retry_after_s": 2,
+             "gap_ms": 18.0, "chunk_chars": 3, "answer_chars": 300},
+    "slack": {"latency_ms": 120.0, "jitter": 0.3, "rps": 1, "max_inflight": 0, "error_429_rate": 0.0, "retry_after_s": 1},
+}
+
+_INDEX_RE = re.compile(r"^/indexes(?:\('([^']+)'\)|/([^/]+))(/.*)?$")
+_DEPLOY_RE = re.compile(r"^/openai/deployments/([^/]+)/(embeddings|chat/completions)$")
+
+
+def merge_config(overrides=None):
+    """기본 설정에 {"chat": {"rps": 5}} 형태의 덮어쓰기를 적용한 새 설정을 반환"""
+    config = {kind: dict(values) for kind, values in DEFAULT_CONFIG.items()}
+    for kind, values in (overrides or {}).items():
+        if kind not in config:
+            raise ValueError(f"알 수 없는 엔드포인트 종류입니다: {kind}")
+        config[kind].update(values)
+    return config
+
+
+def parse_set_option(items):
+    """--set chat.rps=5 형식의 목록을 덮어쓰기 dict로 변환"""
+    overrides = {}
+    for item in items or []:
+        key, _, value = item.partition("=")
+        kind, _, field = key.partition(".")
+        if not field:
+            raise ValueError(f"형식이 올바르지 않습니다(kind.field=value): {item}")
+        overrides.setdefault(kind, {})[field] = float(value)
+    return overrides
+
+
+class TokenBucket:
+    """초당 rate개 요청을 허용하는 토큰 버킷 (버스트는 rate개까지)"""
+
+    def __init__(self, rate: float):
+        self.rate = float(rate)
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> float:
+        """토큰을 하나 꺼내면 0, 부족하면 다음 토큰까지 기다려야 할 초를 반환"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+
+class MockAzureServer(ThreadingHTTPServer):
+    """엔드포인트별 제한/지연 설정과 인메모리 인덱스를 가진 HTTP 서버"""
+
+    daemon_threads = True
+
+    def __init__(self, address, config=None, corpus_path=os.path.join("data", "9_field.json"),
+                 index_name=DEFAULT_INDEX, dimensions=DEFAULT_EMBEDDING_DIMENSIONS, seed=11):
+        super().__init__(address, MockAzureHandler)
+        self.config = merge_config(config)
+        self.dimensions = dimensions
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.buckets = {k: TokenBucket(v["rps"]) for k, v in self.config.items() if v.get("rps")}
+        self.inflight = {k: 0 for k in self.config}
+        self.stats = {k: {"requests": 0, "throttled": 0, "latency_ms": []} for k in self.config}
+        self.indexes = {}
+        # 프롬프트 캐시 흉내: 이전 요청에서 본 메시지 접두사 해시
+        self.prompt_prefixes = set()
+        docs = load_corpus_documents(corpus_path) if corpus_path and os.path.exists(corpus_path) else []
+        self.indexes[index_name] = {"schema": {"name": index_name, "fields": []}, "corpus": LocalCorpus(docs, dimensions)}
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def cached_prompt_tokens(self, messages):
+        """Azure OpenAI 프롬프트 캐시처럼 이전 요청과 같은 메시지 접두사의 토큰 수 (1024 토큰 이상, 128 단위)"""
+        cached, tokens, keys = 0, 0, []
+        digest = zlib.crc32(b"")
+        with self.lock:
+            for m in messages:
+                digest = zlib.crc32(json.dumps(m, ensure_ascii=False, sort_keys=True).encode("utf-8"), digest)
+                tokens += len(str(m.get("content") or "")) // 2
+                keys.append(digest)
+                if digest in self.prompt_prefixes:
+                    cached = tokens
+            if len(self.prompt_prefixes) > 100000:
+                self.prompt_prefixes.clear()
+            self.prompt_prefixes.update(keys)
+        return 0 if cached < 1024 else cached // 128 * 128
+
+    def admit(self, kind):
+        """요청을 받아들이면 None, 제한에 걸리면 Retry-After 초를 반환"""
+        cfg = self.config[kind]
+        with self.lock:
+            self.stats[kind]["requests"] += 1
+            throttled = False
+            if cfg.get("error_429_rate") and self.rng.random() < cfg["error_429_rate"]:
+                throttled = True
+            elif cfg.get("max_inflight") and self.inflight[kind] >= cfg["max_inflight"]:
+                throttled = True
+            if not throttled:
+                self.inflight[kind] += 1
+        if not throttled and kind in self.buckets and self.buckets[kind].take() > 0:
+            with self.lock:
+                self.inflight[kind] -= 1
+            throttled = True
+        if throttled:
+            with self.lock:
+                self.stats[kind]["throttled"] += 1
+            return max(1, int(math.ceil(cfg.get("retry_after_s") or 1)))
+        return None
+
+    def release(self, kind, started):
+        with self.lock:
+            self.inflight[kind] -= 1
+            self.stats[kind]["latency_ms"].append((time.perf_counter() - started) * 1000)
+
+    def delay_s(self, kind, field="latency_ms"):
+        cfg = self.config[kind]
+        median = cfg.get(field) or 0.0
+        if median <= 0:
+            return 0.0
+        with self.lock:
+            ms = self.rng.lognormvariate(math.log(median), cfg.get("jitter") or 0.0)
+        return ms / 1000.0
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                kind: {"requests": s["requests"], "throttled": s["throttled"], "latency_ms": summarize(s["latency_ms"])}
+                for kind, s in self.stats.items()
+            }
+
+    def reset_stats(self):
+        with self.lock:
+            for s in self.stats.values():
+                s["requests"] = 0
+                s["throttled"] = 0
+                s["latency_ms"] = []
+
+
+class MockAzureHandler(BaseHTTPRequestHandler):
+    server_version = "MockAzure/1.0"
+
+    def log_message(self, format, *args):
+        # 부하 테스트 중 콘솔 출력이 병목이 되지 않도록 접근 로그는 남기지 않음
+        pass
+
+    # --- 공통 ---
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        raw = self.rfile.read(length)
+        try:
+            return json.loads(raw.decode("utf-8"))
+        except Exception:
+            return {}
+
+    def _send_json(self, status, body, headers=None):
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_empty(self, status):
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _throttled(self, retry_after):
+        self._send_json(429, {"error": {"code": "429", "message": "Rate limit is exceeded. (mock)"}},
+                        {"Retry-After": str(retry_after), "retry-after-ms": str(retry_after * 1000)})
+
+    def _route(self, method):
+        path = unquote(urlparse(self.path).path).rstrip("/")
+        if path == "/_mock/stats":
+            return self._send_json(200, self.server.snapshot())
+        m = _DEPLOY_RE.match(path)
+        if m and method == "POST":
+            kind = "embeddings" if m.group(2) == "embeddings" else "chat"
+            return self._guarded(kind, lambda: self._openai(kind, m.group(1)))
+        if (path.startswith("/slack") or path.startswith("/services")) and method == "POST":
+            return self._guarded("slack", self._slack)
+        m = _INDEX_RE.match(path)
+        if m:
+            name = m.group(1) or m.group(2)
+            rest = m.group(3) or ""
+            kind = "index" if (rest == "/docs/search.index" or method in ("PUT", "DELETE")) else "search"
+            return self._guarded(kind, lambda: self._search_service(method, name, rest))
+        if path == "/indexes" and method == "GET":
+            return self._send_json(200, {"value": [v["schema"] for v in self.server.indexes.values()]})
+        self._send_json(404, {"error": {"code": "NotFound", "message": f"mock: 지원하지 않는 경로 {method} {path}"}})
+
+    def _guarded(self, kind, fn):
+        retry_after = self.server.admit(kind)
+        if retry_after is not None:
+            return self._throttled(retry_after)
+        started = time.perf_counter()
+        try:
+            fn()
+        finally:
+            self.server.release(kind, started)
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_PUT(self):
+        self._route("PUT")
+
+    def do_DELETE(self):
+        self._route("DELETE")
+
+    # --- Azure AI Search ---
+
+    def _search_service(self, method, name, rest):
+        srv = self.server
+        body = self._read_json() if method in ("POST", "PUT") else {}
+        time.sleep(srv.delay_s("index" if rest == "/docs/search.index" or method in ("PUT", "DELETE") else "search"))
+        with srv.lock:
+            entry = srv.indexes.get(name)
+            if method == "PUT" and rest == "":
+                if entry is None:
+                    entry = {"schema": body, "corpus": LocalCorpus([], srv.dimensions)}
+                    srv.indexes[name] = entry
+                else:
+                    entry["schema"] = body
+                return self._send_json(201, body)
+            if method == "DELETE" and rest == "":
+                srv.indexes.pop(name, None)
+                return self._send_empty(204)
+        if entry is None:
+            return self._send_json(404, {"error": {"code": "", "message": f"No index with the name '{name}' was found."}})
+        corpus = entry["corpus"]
+        if rest == "" and method == "GET":
+            return self._send_json(200, entry["schema"])
+        if rest == "/search.stats":
+            size = sum(len(json.dumps(d, ensure_ascii=False)) for d in corpus.docs)
+            vec_size = len(corpus.docs) * srv.dimensions * 4
+            return self._send_json(200, {"documentCount": len(corpus.docs), "storageSize": size, "vectorIndexSize": vec_size})
+        if rest == "/docs/$count":
+            payload = str(len(corpus.docs)).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+        if rest == "/docs/search.index":
+            return self._index_documents(entry, body)
+        if rest in ("/docs/search.post.search", "/docs/search"):
+            return self._search_documents(corpus, body)
+        self._send_json(404, {"error": {"code": "NotFound", "message": f"mock: 지원하지 않는 경로 {rest}"}})
+
+    def _index_documents(self, entry, body):
+        upserts, deletes, results = [], [], []
+        for doc in body.get("value") or []:
+            action = doc.pop("@search.action", "upload")
+            if action == "delete":
+                deletes.append(doc.get("id"))
+            else:
+                upserts.append(doc)
+            results.append({"key": doc.get("id"), "status": True, "errorMessage": None, "statusCode": 200})
+        # 검색은 잠금 없이 entry["corpus"]를 읽으므로 복사본을 고친 뒤 통째로 교체 (copy-on-write)
+        with self.server.lock:
+            corpus = LocalCorpus(entry["corpus"].docs, self.server.dimensions)
+            if upserts:
+                corpus.upsert(upserts)
+            if deletes:
+                corpus.delete(deletes)
+            entry["corpus"] = corpus
+        self._send_json(200, {"value": results})
+
+    def _search_documents(self, corpus, body):
+        top = int(body.get("top") or 50)
+        skip = int(body.get("skip") or 0)
+        vector = None
+        for vq in body.get("vectorQueries") or []:
+            if vq.get("vector"):
+                vector = vq["vector"]
+                top = int(vq.get("k") or top) if not body.get("top") else top
+        try:
+            filter_fn = parse_odata_filter(body.get("filter"))
+        except ValueError as e:
+            return self._send_json(400, {"error": {"code": "InvalidRequestParameter", "message": str(e)}})
+        # 색인은 corpus를 교체만 하므로 잠금 없이 검색 (동시 검색이 서로를 기다리지 않음)
+        orderby = [o.split() for o in (body.get("orderby") or "").split(",") if o.strip()]
+        if orderby:
+            # $orderby: 조건에 맞는 전체 문서를 정렬한 뒤 skip/top 적용 (점수 순서 대신)
+            hits = corpus.search(search_text=body.get("search"), vector=vector, top=len(corpus.docs), filter_fn=filter_fn)
+            for field, *direction in reversed(orderby):
+                hits.sort(key=lambda h: (h.get(field) is not None, h.get(field)),
+                          reverse=bool(direction) and direction[0].lower() == "desc")
+            hits = hits[:skip + top]
+        else:
+            hits = corpus.search(search_text=body.get("search"), vector=vector, top=skip + top, filter_fn=filter_fn)
+        total = len([d for d in corpus.docs if filter_fn is None or filter_fn(d)])
+        if vector is not None and body.get("search") in (None, "", "*"):
+            # 순수 벡터 검색은 Azure cosine 메트릭과 같은 점수 체계 (1 / (1 + 코사인 거리))
+            hits = [dict(h, **{"@search.score": 1.0 / (2.0 - h["@search.score"])}) for h in hits]
+        # 인덱스 스키마의 content_vector는 hidden(retrievable=false)이므로 응답에서 제외
+        hits = [{k: v for k, v in h.items() if k != "content_vector"} for h in hits[skip:]]
+        if body.get("highlight") and body.get("search") not in (None, "", "*"):
+            hits = [self._with_highlights(h, body) for h in hits]
+        select = [s.strip() for s in (body.get("select") or "").split(",") if s.strip()]
+        if select:
+            hits = [{k: v for k, v in h.items() if k in select or k.startswith("@search.")} for h in hits]
+        result = {"value": hits}
+        if body.get("count"):
+            result["@odata.count"] = total
+        self._send_json(200, result)
+
+    @staticmethod
+    def _with_highlights(hit, body):
+        """검색어 bigram이 포함된 줄을 하이라이트 조각으로 반환 (Azure의 @search.highlights 흉내)"""
+        grams = set(_bigrams(body.get("search")))
+        pre, post = body.get("highlightPreTag", "<em>"), body.get("highlightPostTag", "</em>")
+        highlights = {}
+        for field in (f.strip() for f in body["highlight"].split(",")):
+            fragments = []
+            for line in str(hit.get(field) or "").splitlines():
+                if grams & set(_bigrams(line)):
+                    fragments.append(f"{pre}{line.strip()}{post}")
+            if fragments:
+                highlights[field] = fragments[:5]
+        if highlights:
+            hit = dict(hit, **{"@search.highlights": highlights})
+        return hit
+
+    # --- Azure OpenAI ---
+
+    def _openai(self, kind, deployment):
+        body = self._read_json()
+        if kind == "embeddings":
+            return self._embeddings(deployment, body)
+        return self._chat(deployment, body)
+
+    def _embeddings(self, deployment, body):
+        time.sleep(self.server.delay_s("embeddings"))
+        inputs = body.get("input")
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dims = int(body.get("dimensions") or self.server.dimensions)
+        data = [{"object": "embedding", "index": i, "embedding": hash_embedding(str(t), dims)} for i, t in enumerate(inputs or [])]
+        tokens = sum(len(str(t)) for t in inputs or []) // 2
+        self._send_json(200, {"object": "list", "data": data, "model": deployment,
+                              "usage": {"prompt_tokens": tokens, "total_tokens": tokens}})
+
+    def _answer_for(self, messages, answer_chars):
+        # 시스템 컨텍스트의 첫 번째 출처 내용을 요약 답변처럼 돌려줌
+        for m in messages:
+            content = m.get("content") if isinstance(m.get("content"), str) else ""
+            if m.get("role") == "system" and "[출처 1]" in content:
+                return content.split("[출처 1]", 1)[1].strip()[:answer_chars]
+        last = messages[-1].get("content") if messages else ""
+        return f"(mock) '{str(last)[:40]}'에 대한 답변입니다."
+
+    def _chat(self, deployment, body):
+        cfg = self.server.config["chat"]
+        messages = body.get("messages") or []
+        answer = self._answer_for(messages, int(cfg.get("answer_chars") or 300))
+        step = max(1, int(cfg.get("chunk_chars") or 3))
+        pieces = [answer[i:i + step] for i in range(0, len(answer), step)]
+        prompt_tokens = sum(len(str(m.get("content") or "")) for m in messages) // 2
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(pieces),
+                 "total_tokens": prompt_tokens + len(pieces),
+                 "prompt_tokens_details": {"cached_tokens": self.server.cached_prompt_tokens(messages)}}
+        base = {"id": "chatcmpl-mock", "created": int(time.time()), "model": deployment}
+        time.sleep(self.server.delay_s("chat"))
+        if not body.get("stream"):
+            return self._send_json(200, dict(base, object="chat.completion", usage=usage, choices=[
+                {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": answer}}]))
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        def emit(obj):
+            self.wfile.write(f"data: {json.dumps(obj, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        try:
+            emit(dict(base, object="chat.completion.chunk", choices=[
+                {"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}]))
+            for i, piece in enumerate(pieces):
+                if i:
+                    time.sleep(self.server.delay_s("chat", "gap_ms"))
+                emit(dict(base, object="chat.completion.chunk", choices=[
+                    {"index": 0, "delta": {"content": piece}, "finish_reason": None}]))
+            emit(dict(base, object="chat.completion.chunk", choices=[
+                {"index": 0, "delta": {}, "finish_reason": "stop"}]))
+            if (body.get("stream_options") or {}).get("include_usage"):
+                emit(dict(base, object="chat.completion.chunk", choices=[], usage=usage))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # 클라이언트가 스트림을 중간에 끊은 경우
+            pass
+
+    # --- Slack ---
+
+    def _slack(self):
+        self._read_json()
+        time.sleep(self.server.delay_s("slack"))
+        payload = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def start_mock_server(config=None, host="127.0.0.1", port=0, **kwargs):
+    """Mock Server를 백그라운드 스레드로 시작하고 서버 객체를 반환 (port=0이면 빈 포트 자동 선택)"""
+    server = MockAzureServer((host, port), config=config, **kwargs)
+    thread = threading.Thread(target=server.serve_forever, name="mock-azure", daemon=True)
+    thread.start()
+    return server
+
+
+def mock_env(url, index_name=DEFAULT_INDEX):
+    """app.py/모듈들이 Mock Server를 바라보도록 하는 환경변수 dict"""
+    return {
+        "AZURE_SEARCH_ENDPOINT": url,
+        "AZURE_SEARCH_API_KEY": "mock-key",
+        "AZURE_SEARCH_INDEX_NAME": index_name,
+        "AZURE_ENDPOINT": url,
+        "OPENAI_API_KEY": "mock-key",
+        "OPENAI_API_VERSION": "2024-10-21",
+        "AZURE_OPENAI_VERSION": "2024-10-21",
+        "AZURE_EMBEDDING_DEPLOYMENT": "text-embedding-3-large",
+        "SLACK_WEBHOOK_URL": f"{url}/slack/webhook",
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="로컬 Azure 대체 서비스 (Search / OpenAI / Slack)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--index", default=DEFAULT_INDEX)
+    parser.add_argument("--corpus", default=os.path.join("data", "9_field.json"))
+    parser.add_argument("--dimensions", type=int, default=DEFAULT_EMBEDDING_DIMENSIONS)
+    parser.add_argument("--config", help="엔드포인트별 설정 JSON 파일 ({\"chat\": {\"rps\": 5}} 형식)")
+    parser.add_argument("--set", action="append", default=[], help="개별 설정 덮어쓰기 (예: chat.rps=5)")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+    for kind, values in parse_set_option(args.set).items():
+        overrides.setdefault(kind, {}).update(values)
+
+    server = MockAzureServer((args.host, args.port), config=overrides, corpus_path=args.corpus,
+                             index_name=args.index, dimensions=args.dimensions)
+    print(f"Mock Azure 서비스 시작: {server.url}")
+    for k, v in mock_env(server.url, args.index).items():
+        print(f"  {k}={v}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
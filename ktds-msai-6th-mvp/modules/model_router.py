@@ -0,0 +1,316 @@
+"""
+질문 복잡도/컨텍스트 크기에 따른 모델 라우팅
+
+모든 질문을 같은 배포(gpt-4.1-mini)와 전체 컨텍스트로 보내면 링크 한 줄 찾는 질문도 복잡한 조항 비교와 같은
+지연/비용을 냅니다. 검색 후 질문 복잡도 점수와 컨텍스트 토큰 수로 경로를 정합니다.
+
+- extractive: 링크/사이트/메일/전화 같은 값 자체를 묻는 조회("…주소 알려줘", "…연락처 뭐야")이고
+              상위 문서에 질문 대상과 같은 줄에 그 종류의 값(링크/사이트/주소→URL·도메인, 메일→이메일, 전화/연락처→전화번호)이
+              있으면 모델 호출 없이 그 줄을 출처와 함께 바로 답변. 허용 여부를 묻는 질문("…해도 되나요")은 제외
+- small     : 일반 질문 → ROUTER_SMALL_DEPLOYMENT (기본: 채팅 배포)
+- large     : 복잡도 점수 ≥ ROUTER_LARGE_SCORE → ROUTER_LARGE_DEPLOYMENT
+              (복잡도 점수가 1 이상이면서 컨텍스트 ≥ ROUTER_LARGE_CONTEXT_TOKENS인 경우도 포함.
+               점수 0인 단순 질문은 컨텍스트가 커도 small)
+
+복잡도 점수: 질문 길이, 비교/판단/예외 표현, 접속 표현(조건 여러 개), 여러 카테고리 언급, 앞 대화를 가리키는 후속 질문.
+경로별 지연(첫 토큰, 전체)과 품질 지표(답변이 컨텍스트에 근거한 비율 grounding)를 route_stats()와
+App Insights llm_route 이벤트로 기록해 임계값 조정에 사용합니다.
+
+환경변수: ROUTER (0이면 라우팅하지 않음), ROUTER_SMALL_DEPLOYMENT, ROUTER_LARGE_DEPLOYMENT,
+          ROUTER_LARGE_SCORE (기본 3), ROUTER_LARGE_CONTEXT_TOKENS (기본 8000)
+
+사용법 (ktds-msai-6th-mvp 폴더에서, 골든 질문의 경로 분포와 점수 확인):
+  python -m modules.model_router --golden data/golden_questions.jsonl
+  python -m modules.model_router --run     # .env(또는 Mock Server)로 실제 답변까지 생성해 경로별 지연/grounding 비교
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from modules.metrics import estimate_tokens, summarize
+
+logger = logging.getLogger(__name__)
+
+ROUTES = ("extractive", "small", "large")
+DEFAULT_LARGE_SCORE = 3.0
+DEFAULT_LARGE_CONTEXT_TOKENS = 8000
+# 컨텍스트가 커도 이 점수 미만(단순 조회/사실 확인)이면 큰 배포로 올리지 않음
+MIN_CONTEXT_ESCALATION_SCORE = 1.0
+STATS_SAMPLES = 2000
+
+# 값을 묻는 조회 명사 → 답이 될 값의 종류 (URL/도메인, 이메일, 전화번호)
+LOOKUP_TERMS = {
+    "url": ("링크", "url", "주소", "사이트", "홈페이지"),
+    "email": ("이메일", "메일"),
+    "phone": ("전화", "연락처"),
+}
+# 값 자체를 달라는 요청 형태 (이 표현이 있어야 발췌 답변)
+ASK_TERMS = ("알려", "뭐야", "뭐예요", "뭔가요", "무엇", "어디야", "어디예요", "어디인가요", "가르쳐")
+# 허용 여부를 묻는 질문은 값이 있어도 판단이 필요하므로 발췌하지 않음
+PERMISSION_TERMS = ("되나요", "돼나요", "되나", "될까", "돼?", "되는지", "해도", "가능", "괜찮")
+# 질문과 줄이 같은 대상을 말하는지 볼 때 빼는 조사/어미
+_PARTICLES = ("으로", "에서", "에게", "은", "는", "이", "가", "을", "를", "의", "에", "로", "와", "과", "도")
+COMPARE_TERMS = ("비교", "차이", "다른 점", "다른점", "vs", "어느 쪽", "어느쪽", "왜", "판단", "해석", "예외",
+                 "경우에 따라", "동시에", "각각", "장단점", "우선", "충돌")
+JOIN_TERMS = ("그리고", "또는", "및", "하고", "면서", "인데", "지만", "이면", "라면", "경우")
+FOLLOW_UP_TERMS = ("그럼", "그러면", "그건", "그것", "이 경우", "그 경우", "위에서", "앞에서", "방금")
+
+# 값 종류별 패턴
+_ANSWER_PATTERNS = {
+    "url": [
+        re.compile(r"https?://[^\s<>\"')]+"),
+        # 스킴 없이 도메인만 적힌 값 (예: sldm.kt.com)
+        re.compile(r"(?<![\w@.-])(?:[a-z0-9-]+\.)+(?:com|net|org|kr)\b", re.IGNORECASE),
+    ],
+    "email": [re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")],
+    "phone": [re.compile(r"\b0\d{1,2}-\d{3,4}-\d{4}\b")],
+}
+
+
+@dataclass
+class RouteDecision:
+    route: str
+    deployment: Optional[str]
+    score: float
+    context_tokens: int
+    reasons: List[str] = field(default_factory=list)
+    # extractive 경로의 답변
+    answer: Optional[str] = None
+
+
+def complexity_score(question: str, plan: Optional[Dict] = None, history: Optional[List[Dict]] = None):
+    """(점수, 이유 목록). 점수가 높을수록 여러 조항을 비교/판단해야 하는 질문"""
+    q = (question or "").lower()
+    score, reasons = 0.0, []
+    if len(q) >= 60:
+        score += 1.0
+        reasons.append("long")
+    if len(q) >= 120:
+        score += 1.0
+    compare = [t for t in COMPARE_TERMS if t in q]
+    if compare:
+        score += min(3.0, 1.5 * len(compare))
+        reasons.append("compare:" + ",".join(compare))
+    joins = sum(q.count(t) for t in JOIN_TERMS) + max(0, q.count("?") - 1)
+    if joins:
+        score += min(1.5, 0.5 * joins)
+        reasons.append(f"clauses:{joins}")
+    categories = (plan or {}).get("categories") or []
+    if len(categories) >= 2:
+        score += 1.5
+        reasons.append(f"categories:{len(categories)}")
+    if len(history or []) > 1 and any(t in q for t in FOLLOW_UP_TERMS):
+        score += 0.5
+        reasons.append("follow_up")
+    return score, reasons
+
+
+def lookup_kinds(question: str) -> List[str]:
+    """값 자체를 묻는 질문이면 찾을 값 종류 목록 (조회 명사 + 요청 형태, 허용 여부 질문은 제외)"""
+    q = (question or "").lower()
+    if not any(t in q for t in ASK_TERMS) or any(t in q for t in PERMISSION_TERMS):
+        return []
+    kinds = [kind for kind, terms in LOOKUP_TERMS.items() if any(t in q for t in terms)]
+    # "메일 주소"는 이메일만
+    if "email" in kinds and "url" in kinds and re.search(r"메일\s*주소", q):
+        kinds.remove("url")
+    return kinds
+
+
+def _topic_terms(question: str) -> List[str]:
+    """질문에서 조회 명사/요청 형태/조사를 뺀 대상 어절 (2글자 이상)"""
+    q = (question or "").lower()
+    for t in sorted({t for terms in LOOKUP_TERMS.values() for t in terms} | set(ASK_TERMS), key=len, reverse=True):
+        q = q.replace(t, " ")
+    words = []
+    for word in re.findall(r"[0-9a-z가-힣]+", q):
+        for p in _PARTICLES:
+            if word.endswith(p) and len(word) - len(p) >= 2:
+                word = word[:-len(p)]
+                break
+        if len(word) >= 2:
+            words.append(word)
+    return words
+
+
+def extract_answer(question: str, docs: List[Dict]) -> Optional[str]:
+    """값을 묻는 조회 질문이면 상위 문서에서 질문 대상과 같은 줄 중 그 종류의 값(URL/이메일/전화번호)이 있는 줄을 반환"""
+    kinds = lookup_kinds(question)
+    if not docs or not kinds:
+        return None
+    terms = _topic_terms(question)
+    if not terms:
+        return None
+    top = docs[0]
+    lines = [line.strip() for line in (top.get("content") or "").splitlines() if line.strip()]
+    patterns = [p for kind in kinds for p in _ANSWER_PATTERNS[kind]]
+    hits = [line for line in lines
+            if any(p.search(line) for p in patterns) and any(t in line.lower() for t in terms)]
+    if not hits:
+        return None
+    title = " | ".join(p for p in (top.get("domain"), top.get("category")) if p) or "항목"
+    return "\n".join(f"- {line}" for line in hits[:3]) + f"\n\n[출처 1] {title}"
+
+
+def _deployments(env: Dict):
+    default = env.get("chat_deployment")
+    return os.getenv("ROUTER_SMALL_DEPLOYMENT") or default, os.getenv("ROUTER_LARGE_DEPLOYMENT") or default
+
+
+def route_question(question: str, plan: Dict, docs: List[Dict], env: Dict,
+                   history: Optional[List[Dict]] = None, context_text: Optional[str] = None) -> RouteDecision:
+    """검색 결과까지 본 뒤 경로 결정 (ROUTER=0이면 항상 기본 채팅 배포)"""
+    from modules.rag_pipeline import build_context_text
+
+    context_tokens = estimate_tokens(context_text if context_text is not None else build_context_text(docs))
+    if os.getenv("ROUTER", "1") == "0":
+        return RouteDecision("small", env.get("chat_deployment"), 0.0, context_tokens, ["disabled"])
+    score, reasons = complexity_score(question, plan, history)
+    small, large = _deployments(env)
+    large_score = float(os.getenv("ROUTER_LARGE_SCORE") or DEFAULT_LARGE_SCORE)
+    large_context = int(os.getenv("ROUTER_LARGE_CONTEXT_TOKENS") or DEFAULT_LARGE_CONTEXT_TOKENS)
+    if score < 1.0:
+        answer = extract_answer(question, docs)
+        if answer:
+            return RouteDecision("extractive", None, score, context_tokens, reasons + ["lookup"], answer)
+    # 경로는 복잡도로 정하고, 컨텍스트 크기는 어느 정도 복잡한 질문일 때만 큰 배포로 올리는 보조 조건
+    long_context = context_tokens >= large_context and score >= MIN_CONTEXT_ESCALATION_SCORE
+    if score >= large_score or long_context:
+        if long_context:
+            reasons.append(f"context:{context_tokens}")
+        return RouteDecision("large", large, score, context_tokens, reasons)
+    return RouteDecision("small", small, score, context_tokens, reasons)
+
+
+def _bigrams(text: str) -> set:
+    t = re.sub(r"\s+", "", text or "")
+    return {t[i:i + 2] for i in range(len(t) - 1)}
+
+
+def grounding(answer: str, context_text: str) -> Optional[float]:
+    """답변 글자 bigram 중 컨텍스트에도 있는 비율 (근거 없는 생성이 많을수록 낮음)"""
+    grams = _bigrams(answer)
+    if not grams:
+        return None
+    return round(len(grams & _bigrams(context_text)) / len(grams), 3)
+
+
+class RouteStats:
+    """경로별 첫 토큰/전체 지연, 출력 토큰, grounding 표본 (최근 STATS_SAMPLES개)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = {r: {"ttft_ms": deque(maxlen=STATS_SAMPLES), "latency_ms": deque(maxlen=STATS_SAMPLES),
+                             "output_tokens": deque(maxlen=STATS_SAMPLES), "grounding": deque(maxlen=STATS_SAMPLES)}
+                         for r in ROUTES}
+        self._counts = {r: 0 for r in ROUTES}
+
+    def record(self, route: str, ttft_ms=None, latency_ms=None, output_tokens=None, grounded=None):
+        with self._lock:
+            self._counts[route] += 1
+            samples = self._samples[route]
+            for name, value in (("ttft_ms", ttft_ms), ("latency_ms", latency_ms),
+                                ("output_tokens", output_tokens), ("grounding", grounded)):
+                if value is not None:
+                    samples[name].append(value)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {r: {"count": self._counts[r], **{k: summarize(v) for k, v in self._samples[r].items()}}
+                    for r in ROUTES}
+
+
+_STATS = RouteStats()
+
+
+def route_stats() -> Dict:
+    return _STATS.stats()
+
+
+def record_route(decision: RouteDecision, answer: str, context_text: str, ttft_ms=None, latency_ms=None,
+                 degraded: bool = False, telemetry=None):
+    """답변이 끝난 뒤 경로별 지연/품질 기록 (마감 초과로 축소된 답변은 품질 표본에서 제외)"""
+    grounded = None if degraded else grounding(answer, context_text)
+    output_tokens = estimate_tokens(answer) if answer else None
+    _STATS.record(decision.route, ttft_ms, latency_ms, output_tokens, grounded)
+    if telemetry:
+        try:
+            telemetry.track_event("llm_route", {
+                "route": decision.route, "deployment": decision.deployment, "score": decision.score,
+                "context_tokens": decision.context_tokens, "reasons": ",".join(decision.reasons),
+                "ttft_ms": ttft_ms, "latency_ms": latency_ms, "output_tokens": output_tokens,
+                "grounding": grounded, "degraded": degraded})
+        except Exception:
+            pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="질문 복잡도 기반 모델 라우팅 점검")
+    parser.add_argument("--golden", default=os.path.join("data", "golden_questions.jsonl"))
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--run", action="store_true", help="실제 모델로 답변을 생성해 경로별 지연/grounding 측정")
+    args = parser.parse_args(argv)
+
+    # SDK/HTTP 클라이언트의 요청 단위 INFO 로그가 출력을 가리지 않도록 낮춤
+    logging.getLogger("httpx2").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    from modules.category_matcher import CategoryMatcher
+    from modules.deadlines import local_search_client
+    from modules.rag_pipeline import (build_context_text, get_env_keys, init_chat_model, init_search_client,
+                                      inject_context_into_messages, retrieve_with_plan)
+    from modules.embedding_batcher import embed_query
+
+    env = get_env_keys()
+    matcher = CategoryMatcher.from_file()
+    search_client = None
+    if args.run:
+        search_client = init_search_client(env["search_endpoint"], env["search_key"], env["search_index"])
+    embed = (lambda text: embed_query(text, env)) if search_client else (lambda text: None)
+    search_client = search_client or local_search_client()
+    models = {}
+
+    with open(args.golden, "r", encoding="utf-8") as f:
+        questions = [json.loads(line)["question"] for line in f if line.strip()]
+    for q in questions:
+        plan = matcher.plan(q, args.top_k)
+        docs = retrieve_with_plan(search_client, q, plan, args.top_k, embed)
+        context_text = build_context_text(docs)
+        decision = route_question(q, plan, docs, env, context_text=context_text)
+        line = f"{decision.route:<10} {decision.score:>4.1f} {decision.context_tokens:>6}  {q[:50]}  ({','.join(decision.reasons)})"
+        if not args.run:
+            print(line)
+            continue
+        started = time.perf_counter()
+        ttft_ms, answer = None, decision.answer or ""
+        if decision.route != "extractive":
+            model = models.get(decision.deployment) or init_chat_model(env, decision.deployment)
+            models[decision.deployment] = model
+            messages = inject_context_into_messages([{"role": "user", "content": q}], context_text)
+            for chunk in model.stream(messages):
+                if chunk.content and ttft_ms is None:
+                    ttft_ms = (time.perf_counter() - started) * 1000
+                answer += chunk.content
+        latency_ms = (time.perf_counter() - started) * 1000
+        record_route(decision, answer, context_text, ttft_ms, latency_ms)
+        print(f"{line}  {latency_ms:.0f}ms")
+
+    if args.run:
+        print(f"{'경로':<10}{'건수':>6}{'TTFT50':>10}{'E2E50':>10}{'E2E95':>10}{'grounding':>11}")
+        for route, s in route_stats().items():
+            if s["count"]:
+                print(f"{route:<10}{s['count']:>6}{s['ttft_ms']['p50']:>10.0f}{s['latency_ms']['p50']:>10.0f}"
+                      f"{s['latency_ms']['p95']:>10.0f}{s['grounding']['mean']:>11.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+뉴스 게시글 유사 중복 탐지 (MinHash + LSH)
+
+같은 뉴스를 여러 부서가 조금씩 고쳐 다시 올리면 게시판 요약(show_board)이 복사본마다
+LLM 요약과 Slack 전송을 반복합니다. 제목 + 정리된 본문으로 MinHash 서명을 만들고
+LSH 밴드 버킷으로 후보 쌍만 비교해(전체 쌍 비교 없이) 유사 중복 묶음(cluster)을 만듭니다.
+
+- 슁글: 어절 3-gram (어절이 적은 짧은 글은 글자 5-gram), crc32 해시
+- 서명: num_perm개의 multiply-shift 해시 ((a*x + b) mod 2^64) >> 32 의 최솟값 (numpy가 있으면 벡터 연산)
+- LSH: bands x rows (기본 16 x 8, 유사도 약 0.71부터 후보가 될 확률이 급격히 높아짐)
+- 후보 쌍은 서명으로 추정한 자카드 유사도가 threshold(기본 0.8) 이상일 때만 같은 묶음으로 합침
+- 대표 게시글: 묶음에서 가장 먼저 올라온 글 (요약/Slack 전송은 대표만)
+
+환경변수: NEWS_DEDUP_THRESHOLD (기본 0.8)
+
+사용법 (ktds-msai-6th-mvp 폴더에서):
+  python -m modules.news_dedup --posts data/board_data.json
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import zlib
+from typing import Dict, List, Sequence
+
+try:
+    import numpy as np
+except Exception:
+    # numpy가 없으면 같은 해시를 순수 파이썬으로 계산 (결과 동일, 느림)
+    np = None
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 128
+DEFAULT_BANDS = 16
+WORD_SHINGLE = 3
+CHAR_SHINGLE = 5
+_MASK64 = (1 << 64) - 1
+_MAX_HASH = (1 << 32) - 1
+
+_TOKEN_RE = re.compile(r"[\w]+", re.UNICODE)
+
+
+def post_text(post: Dict) -> str:
+    """제목 + HTML을 걷어낸 본문"""
+    from modules.board_sync import post_to_text
+    return f"{post.get('title') or ''}\n{post_to_text(post)}"
+
+
+def shingles(text: str) -> set:
+    tokens = _TOKEN_RE.findall((text or "").lower())
+    if len(tokens) >= WORD_SHINGLE * 2:
+        grams = (" ".join(tokens[i:i + WORD_SHINGLE]) for i in range(len(tokens) - WORD_SHINGLE + 1))
+    else:
+        joined = " ".join(tokens)
+        grams = (joined[i:i + CHAR_SHINGLE] for i in range(max(1, len(joined) - CHAR_SHINGLE + 1)))
+    return {zlib.crc32(g.encode("utf-8")) for g in grams}
+
+
+class MinHasher:
+    """고정 시드의 해시 함수 묶음으로 MinHash 서명 생성 (같은 설정이면 실행마다 같은 서명)"""
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        # a는 홀수 64비트 (multiply-shift 해시 조건)
+        self._params = [(rng.getrandbits(64) | 1, rng.getrandbits(64)) for _ in range(num_perm)]
+        if np is not None:
+            self._a = np.array([a for a, _ in self._params], dtype=np.uint64)[:, None]
+            self._b = np.array([b for _, b in self._params], dtype=np.uint64)[:, None]
+
+    def signature(self, shingle_set: set) -> List[int]:
+        if not shingle_set:
+            return [_MAX_HASH] * self.num_perm
+        if np is not None:
+            x = np.fromiter(shingle_set, dtype=np.uint64, count=len(shingle_set))[None, :]
+            # uint64 곱셈/덧셈은 2^64에서 자연히 나머지 연산됨
+            with np.errstate(over="ignore"):
+                hashed = (self._a * x + self._b) >> np.uint64(32)
+            return hashed.min(axis=1).tolist()
+        values = list(shingle_set)
+        return [min((((a * x + b) & _MASK64) >> 32) for x in values) for a, b in self._params]
+
+
+def estimate_similarity(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+    """서명이 일치하는 비율 = 자카드 유사도 추정값"""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int):
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+def cluster_posts(posts: List[Dict], threshold: float = None, num_perm: int = DEFAULT_NUM_PERM,
+                  bands: int = DEFAULT_BANDS) -> Dict:
+    """게시글 목록을 유사 중복 묶음으로 나눔
+
+    반환: {
+      "clusters": [{"representative": idx, "members": [idx, ...], "similarity": {idx: 추정 유사도}}, ...],
+      "by_index": {idx: 묶음 번호},
+      "duplicates": 대표가 아닌 게시글 수,
+      "candidate_pairs": LSH 후보 쌍 수,
+    }
+    idx는 posts 리스트의 위치입니다. 묶음은 대표 게시글 순서로 정렬됩니다.
+    """
+    if threshold is None:
+        threshold = float(os.getenv("NEWS_DEDUP_THRESHOLD") or DEFAULT_THRESHOLD)
+    rows = num_perm // bands
+    hasher = MinHasher(num_perm)
+    signatures = [hasher.signature(shingles(post_text(p))) for p in posts]
+
+    buckets: Dict[tuple, List[int]] = {}
+    for idx, sig in enumerate(signatures):
+        for band in range(bands):
+            key = (band, tuple(sig[band * rows:(band + 1) * rows]))
+            buckets.setdefault(key, []).append(idx)
+
+    uf = _UnionFind(len(posts))
+    checked = set()
+    for members in buckets.values():
+        for pos, i in enumerate(members):
+            for j in members[pos + 1:]:
+                if (i, j) in checked:
+                    continue
+                checked.add((i, j))
+                sim = estimate_similarity(signatures[i], signatures[j])
+                if sim >= threshold:
+                    uf.union(i, j)
+
+    groups: Dict[int, List[int]] = {}
+    for idx in range(len(posts)):
+        groups.setdefault(uf.find(idx), []).append(idx)
+    clusters = []
+    for members in groups.values():
+        # 가장 먼저 올라온 글(원본)을 대표로
+        rep = min(members, key=lambda i: (posts[i].get("createdate") or "", posts[i].get("postid") or 0))
+        sims = {i: round(estimate_similarity(signatures[rep], signatures[i]), 3) for i in members if i != rep}
+        clusters.append({"representative": rep, "members": sorted(members), "similarity": sims})
+    clusters.sort(key=lambda c: c["representative"])
+    by_index = {i: n for n, c in enumerate(clusters) for i in c["members"]}
+    return {
+        "clusters": clusters,
+        "by_index": by_index,
+        "duplicates": len(posts) - len(clusters),
+        "candidate_pairs": len(checked),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="뉴스 게시글 유사 중복 탐지")
+    parser.add_argument("--posts", default=os.path.join("data", "board_data.json"))
+    parser.add_argument("--threshold", type=float)
+    args = parser.parse_args(argv)
+
+    with open(args.posts, "r", encoding="utf-8") as f:
+        posts = json.load(f)
+    result = cluster_posts(posts, threshold=args.threshold)
+    for c in result["clusters"]:
+        if len(c["members"]) < 2:
+            continue
+        rep = posts[c["representative"]]
+        print(f"[대표 #{rep.get('postid')}] {rep.get('title')}")
+        for i in c["members"]:
+            if i != c["representative"]:
+                print(f"   ↳ #{posts[i].get('postid')} ({c['similarity'][i]:.2f}) {posts[i].get('title')}")
+    print(f"게시글 {len(posts)}건, 묶음 {len(result['clusters'])}개, 중복 {result['duplicates']}건, "
+          f"비교한 후보 쌍 {result['candidate_pairs']}개")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
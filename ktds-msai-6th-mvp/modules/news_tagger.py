@@ -0,0 +1,262 @@
+"""
+뉴스 게시글 컴플라이언스 분야 자동 태깅
+
+게시판(data/board_data.json) 게시글에는 9대 분야 카테고리가 없어 분야별로 뉴스를 걸러 볼 수 없습니다.
+9대 분야 조항(data/9_field.json)과 게시글을 같은 임베딩 모델로 임베딩해 분야별 중심 벡터(centroid)와의
+코사인 유사도로 상위 분야를 붙입니다.
+
+- 분야 중심 벡터: 분야 조항 문장('1) ...' 단위)을 배치 임베딩 → 정규화 → 평균 → 다시 정규화
+- 게시글: 제목 + 정리된 본문 앞부분(MAX_POST_CHARS)을 배치(EMBED_BATCH개씩) 임베딩
+- 점수: (게시글 x 차원) 행렬과 (분야 x 차원) 행렬의 곱 한 번으로 전체 코사인 유사도 계산 (numpy가 없으면 순수 파이썬)
+- 태그: 최고 점수 분야 + 최고 점수와 NEWS_TAG_MARGIN(기본 0.03) 이내인 분야 (최대 NEWS_TAG_TOP, 기본 3개)
+- 결과는 data/board_tags.json에 저장하고, 내용 해시가 같은 게시글은 다음 실행에서 다시 임베딩하지 않음
+  (분야 중심 벡터도 9_field.json 내용/임베딩 모델이 바뀔 때만 다시 계산)
+
+태그는 게시판 화면(show_board)의 분야 필터, 연합 검색 board 소스의 분야 가중치(tag_category),
+뉴스 인덱스 동기화(board_sync)에 사용됩니다.
+
+사용법 (ktds-msai-6th-mvp 폴더에서):
+  python -m modules.news_tagger          # 바뀐 게시글만 태깅
+  python -m modules.news_tagger --full   # 전체 다시 태깅
+"""
+import argparse
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+try:
+    import numpy as np
+except Exception:
+    # numpy가 없으면 같은 계산을 순수 파이썬으로 수행 (결과 동일, 느림)
+    np = None
+
+logger = logging.getLogger(__name__)
+
+TAGS_PATH = os.getenv("NEWS_TAGS_PATH") or os.path.join("data", "board_tags.json")
+DEFAULT_BOARD_PATH = os.path.join("data", "board_data.json")
+DEFAULT_CATEGORY_PATH = os.path.join("data", "9_field.json")
+EMBED_BATCH = 16
+MAX_POST_CHARS = 2000
+DEFAULT_TOP = 3
+DEFAULT_MARGIN = 0.03
+
+_CLAUSE_SPLIT_RE = re.compile(r"\n|(?=\d+\) )")
+
+
+def category_clauses(path: str = DEFAULT_CATEGORY_PATH) -> Dict[str, List[str]]:
+    """{분야 이름: [분야 이름, 조항 문장, ...]}"""
+    with open(path, "r", encoding="utf-8") as f:
+        items = json.load(f)
+    clauses = {}
+    for item in items:
+        category = item.get("category")
+        if not category:
+            continue
+        texts = [category]
+        for clause in _CLAUSE_SPLIT_RE.split(item.get("content") or ""):
+            clause = clause.strip()
+            if len(clause) >= 10:
+                texts.append(clause)
+        clauses[category] = texts
+    return clauses
+
+
+def post_hash(post: Dict) -> str:
+    return hashlib.sha1(f"{post.get('title') or ''}\n{post.get('message') or ''}".encode("utf-8")).hexdigest()
+
+
+def make_embedder(env: Dict, client=None, batch_size: int = EMBED_BATCH) -> Optional[Callable]:
+    """texts -> [벡터 또는 None, ...] 함수. 임베딩 설정이 없으면 None (실패한 배치는 None으로 채움)"""
+    from modules.rag_pipeline import init_embedding_client
+
+    deployment = env.get("embedding_deployment")
+    client = client or (init_embedding_client(env) if deployment else None)
+    if client is None:
+        return None
+    dims = env.get("embedding_dimensions")
+    extra = {"dimensions": dims} if dims else {}
+
+    def embed(texts: List[str]) -> List[Optional[List[float]]]:
+        vectors = []
+        for i in range(0, len(texts), batch_size):
+            batch = texts[i:i + batch_size]
+            try:
+                resp = client.embeddings.create(model=deployment, input=batch, **extra)
+                vectors.extend(item.embedding for item in resp.data)
+            except Exception:
+                logger.exception("태깅용 임베딩 실패 (해당 배치는 태그 없이 진행)")
+                vectors.extend([None] * len(batch))
+        return vectors
+
+    return embed
+
+
+def _unit(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+def build_centroids(clauses: Dict[str, List[str]], embed: Callable) -> Dict[str, List[float]]:
+    """분야별 조항 임베딩의 정규화 평균 (모든 분야의 문장을 한 번에 배치 임베딩)"""
+    names = list(clauses)
+    texts = [t for name in names for t in clauses[name]]
+    vectors = embed(texts)
+    centroids, pos = {}, 0
+    for name in names:
+        own = [v for v in vectors[pos:pos + len(clauses[name])] if v is not None]
+        pos += len(clauses[name])
+        if not own:
+            continue
+        if np is not None:
+            m = np.asarray(own, dtype=np.float32)
+            m /= np.linalg.norm(m, axis=1, keepdims=True) + 1e-12
+            mean = m.mean(axis=0)
+            centroids[name] = (mean / (np.linalg.norm(mean) + 1e-12)).tolist()
+        else:
+            units = [_unit(v) for v in own]
+            centroids[name] = _unit([sum(col) / len(units) for col in zip(*units)])
+    return centroids
+
+
+def score_matrix(post_vectors: List[List[float]], centroids: Dict[str, List[float]]) -> List[List[float]]:
+    """게시글 x 분야 코사인 유사도 (행렬 곱 한 번)"""
+    names = list(centroids)
+    if not post_vectors or not names:
+        return [[] for _ in post_vectors]
+    if np is not None:
+        p = np.asarray(post_vectors, dtype=np.float32)
+        p /= np.linalg.norm(p, axis=1, keepdims=True) + 1e-12
+        c = np.asarray([centroids[n] for n in names], dtype=np.float32)
+        return (p @ c.T).tolist()
+    c = [centroids[n] for n in names]
+    return [[sum(a * b for a, b in zip(u, row)) for row in c] for u in (_unit(v) for v in post_vectors)]
+
+
+def top_tags(scores: List[float], names: List[str], top: int = DEFAULT_TOP, margin: float = DEFAULT_MARGIN) -> List[Dict]:
+    """최고 점수 분야와, 최고 점수와 margin 이내인 분야 (점수 내림차순)"""
+    ranked = sorted(zip(names, scores), key=lambda t: t[1], reverse=True)
+    if not ranked:
+        return []
+    best = ranked[0][1]
+    return [{"category": n, "score": round(float(s), 4)} for n, s in ranked[:top] if s >= best - margin]
+
+
+def load_tags(path: str = TAGS_PATH) -> Dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {"centroid_key": None, "centroids": {}, "posts": {}}
+
+
+def save_tags(data: Dict, path: str = TAGS_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def post_tags(path: str = TAGS_PATH) -> Dict[str, List[Dict]]:
+    """{postid 문자열: [{"category", "score"}, ...]}"""
+    return {pid: entry.get("tags") or [] for pid, entry in (load_tags(path).get("posts") or {}).items()}
+
+
+def primary_category(tags: List[Dict]) -> Optional[str]:
+    return tags[0]["category"] if tags else None
+
+
+def tag_posts(posts: List[Dict], env: Optional[Dict] = None, client=None, path: str = TAGS_PATH,
+              category_path: str = DEFAULT_CATEGORY_PATH, full: bool = False, dry_run: bool = False) -> Dict:
+    """바뀐 게시글만 임베딩해 태그를 갱신하고 결과 보고서를 반환"""
+    from modules.news_dedup import post_text
+    from modules.rag_pipeline import get_env_keys
+
+    t0 = time.perf_counter()
+    env = env or get_env_keys()
+    top = int(os.getenv("NEWS_TAG_TOP") or DEFAULT_TOP)
+    margin = float(os.getenv("NEWS_TAG_MARGIN") or DEFAULT_MARGIN)
+    data = load_tags(path)
+    data.setdefault("posts", {})
+
+    clauses = category_clauses(category_path)
+    centroid_key = hashlib.sha1(json.dumps([env.get("embedding_deployment"), env.get("embedding_dimensions"), clauses],
+                                           ensure_ascii=False).encode("utf-8")).hexdigest()
+    # 분야 중심 벡터가 바뀌면 모든 게시글 점수가 달라지므로 전체 재태깅
+    full = full or data.get("centroid_key") != centroid_key
+    pending = [p for p in posts
+               if full or (data["posts"].get(str(p.get("postid"))) or {}).get("hash") != post_hash(p)]
+    report = {"posts": len(posts), "changed": len(pending), "tagged": 0, "failed": 0, "recomputed_centroids": False}
+    if not pending or dry_run:
+        report["elapsed_s"] = round(time.perf_counter() - t0, 2)
+        return report
+
+    embed = make_embedder(env, client)
+    if embed is None:
+        logger.info("임베딩 설정이 없어 태깅을 건너뜁니다.")
+        report["failed"] = len(pending)
+        report["elapsed_s"] = round(time.perf_counter() - t0, 2)
+        return report
+    if data.get("centroid_key") != centroid_key or not data.get("centroids"):
+        centroids = build_centroids(clauses, embed)
+        if len(centroids) < len(clauses):
+            raise RuntimeError("분야 중심 벡터를 만들지 못했습니다 (임베딩 실패).")
+        data["centroids"] = {n: [round(x, 6) for x in v] for n, v in centroids.items()}
+        data["centroid_key"] = centroid_key
+        report["recomputed_centroids"] = True
+
+    vectors = embed([post_text(p)[:MAX_POST_CHARS] for p in pending])
+    ok = [(p, v) for p, v in zip(pending, vectors) if v is not None]
+    names = list(data["centroids"])
+    scores = score_matrix([v for _, v in ok], data["centroids"])
+    now = datetime.now().isoformat(timespec="seconds")
+    for (post, _), row in zip(ok, scores):
+        data["posts"][str(post.get("postid"))] = {
+            "hash": post_hash(post), "tags": top_tags(row, names, top, margin), "tagged_at": now}
+    # 게시판에서 삭제된 게시글의 태그 정리
+    live = {str(p.get("postid")) for p in posts}
+    for pid in [pid for pid in data["posts"] if pid not in live]:
+        del data["posts"][pid]
+    save_tags(data, path)
+    report["tagged"] = len(ok)
+    report["failed"] = len(pending) - len(ok)
+    report["elapsed_s"] = round(time.perf_counter() - t0, 2)
+    logger.info(f"뉴스 태깅: {report}")
+    return report
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO)
+    logging.getLogger("httpx2").setLevel(logging.WARNING)
+
+    parser = argparse.ArgumentParser(description="뉴스 게시글 컴플라이언스 분야 자동 태깅")
+    parser.add_argument("--posts", default=DEFAULT_BOARD_PATH)
+    parser.add_argument("--tags", default=TAGS_PATH)
+    parser.add_argument("--full", action="store_true", help="내용 해시와 관계없이 전체 다시 태깅")
+    parser.add_argument("--dry-run", action="store_true", help="태깅 대상 수만 계산")
+    args = parser.parse_args(argv)
+
+    with open(args.posts, "r", encoding="utf-8") as f:
+        posts = json.load(f)
+    report = tag_posts(posts, path=args.tags, full=args.full, dry_run=args.dry_run)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if not args.dry_run:
+        tags = post_tags(args.tags)
+        counts: Dict[str, int] = {}
+        for post in posts:
+            category = primary_category(tags.get(str(post.get("postid"))) or [])
+            counts[category or "(미분류)"] = counts.get(category or "(미분류)", 0) + 1
+        for category, n in sorted(counts.items()):
+            print(f"{category}: {n}건")
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,8 @@
 2. 뉴스요약 -> 슬랙 전송
 """
 import os
+import time
+import threading
 import requests
 import json
 import pandas as pd
@@ -35,7 +37,95 @@ def load_board_list(json_path: str) -> list:
         return json.load(f)
 
 
-def show_board(json_path: str = os.path.join('data', 'board_data.json')):
+@st.cache_data(show_spinner=False)
+def cluster_board(board_list: list) -> dict:
+    """유사 중복 게시글 묶음 (modules/news_dedup.py, 게시글 목록이 바뀔 때만 다시 계산)"""
+    from modules.news_dedup import cluster_posts
+    return cluster_posts(board_list)
+
+
+@st.cache_data(show_spinner=False)
+def load_board_tags(tags_path: str, mtime: float) -> dict:
+    """게시글별 분야 태그 (modules/news_tagger.py 결과, 파일이 바뀔 때만 다시 읽음)"""
+    from modules.news_tagger import post_tags
+    return post_tags(tags_path)
+
+
+@st.cache_resource(show_spinner=False)
+def _shared_board_state() -> dict:
+    """대표 postid별 요약과 슬랙 전송 기록 (프로세스 공용: 사용자가 늘어도 같은 뉴스는 한 번만 요약/전송)"""
+    return {"lock": threading.Lock(), "summaries": {}, "summary_locks": {}, "sent": set(), "sending": set()}
+
+
+def _summary_lock(shared: dict, postid) -> threading.Lock:
+    with shared["lock"]:
+        return shared["summary_locks"].setdefault(postid, threading.Lock())
+
+
+def _track_usage(telemetry, usage: dict):
+    if telemetry:
+        try:
+            telemetry.track_event("llm_usage", usage)
+        except Exception:
+            pass
+
+
+# 요약 요청마다 똑같이 맨 앞에 오는 고정 지시문 (프롬프트 캐시 적중을 위해 게시글 내용은 user 메시지에만 넣음)
+SUMMARY_SYSTEM_PROMPT = (
+    "안녕하세요, 뉴스 스크랩을 부탁드립니다. 형식은 아래와 같이 해주세요. 내용 요약은 3줄 이내로 간단하게 작성하세요. "
+    "가독성이 높이기 위해 이모티콘를 포함해서 작성해 주세요.\n"
+    "사용자가 보내는 뉴스 제목과 내용을 요약해 주세요."
+)
+
+
+@st.cache_resource(show_spinner=False)
+def init_summary_model():
+    """뉴스 요약용 모델 생성 (채팅과 같은 재시도/서킷 브레이커/예비 배포 전환 적용, 프로세스에서 한 번만 생성)"""
+    from modules.rag_pipeline import get_env_keys, init_chat_model
+    env = dict(get_env_keys(), openai_version=os.getenv('AZURE_OPENAI_VERSION'))
+    model = init_chat_model(env, 'gpt-4.1-mini')
+    if model is None:
+        raise RuntimeError('뉴스 요약 모델을 초기화할 수 없습니다.')
+    return model
+
+
+def summarize_post(post: dict, model=None, on_usage=None, session_id=None, on_wait=None) -> str:
+    """게시글 제목/내용을 모델로 요약하여 문자열로 반환
+
+    on_usage: 토큰 사용량 dict(cached_tokens, first_token_ms 포함)를 받는 콜백 (선택)
+    session_id/on_wait: LLM 동시 호출 제어기의 공정 대기열 세션과 대기 순번 콜백 (선택, 채팅보다 낮은 우선순위)
+    """
+    from modules.rag_pipeline import usage_summary
+    from modules.llm_governor import current_session_id, governed
+
+    model = model or init_summary_model()
+    messages = [
+        {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+        {"role": "user", "content": f"제목: {post.get('title', '')}\n내용: {post.get('message', '')}"}
+    ]
+    response_text = ''
+    usage, first_token_ms = None, None
+    with governed('gpt-4.1-mini', messages, session_id or current_session_id(), 'background', on_wait) as ticket:
+        started = time.perf_counter()
+        for chunk in model.stream(messages):
+            if chunk.content and first_token_ms is None:
+                first_token_ms = round((time.perf_counter() - started) * 1000, 1)
+            usage = usage_summary(getattr(chunk, 'usage_metadata', None)) or usage
+            response_text += chunk.content
+        if ticket is not None and usage:
+            ticket.used_tokens = usage['input_tokens'] + usage['output_tokens']
+    if usage and on_usage:
+        on_usage(dict(usage, first_token_ms=first_token_ms, source="news_summary"))
+    return response_text
+
+
+def post_summary_to_slack(post: dict, summary: str, slack_url: str):
+    """요약 결과를 Slack Webhook으로 전송하고 requests 응답 객체를 반환"""
+    msg = f"컴플라이언스 뉴스 요약\n제목: {post.get('title', '')}\n요약: {html_to_slack_text(summary)}"
+    return requests.post(slack_url, json={"text": msg})
+
+
+def show_board(json_path: str = os.path.join('data', 'board_data.json'), telemetry=None):
     # 세션 초기화
     if 'show_board' not in st.session_state:
         st.session_state['show_board'] = True
@@ -54,20 +144,48 @@ def show_board(json_path: str = os.path.join('data', 'board_data.json')):
         st.warning("게시글 데이터가 없습니다.")
         return
 
+    # 같은 뉴스의 재게시본은 묶음 대표 하나만 요약/Slack 전송 (요약 결과는 대표 postid로 모든 세션이 재사용)
+    shared = _shared_board_state()
+    try:
+        dedup = cluster_board(board_list)
+    except Exception:
+        dedup = None
+    clusters = dedup["clusters"] if dedup else [{"representative": i, "members": [i], "similarity": {}} for i in range(len(board_list))]
+    by_index = dedup["by_index"] if dedup else {i: i for i in range(len(board_list))}
+
+    # 분야 태그 (태깅 전이면 필터 없이 전체 표시)
+    from modules.news_tagger import TAGS_PATH, primary_category
+    tags = load_board_tags(TAGS_PATH, os.path.getmtime(TAGS_PATH)) if os.path.exists(TAGS_PATH) else {}
+
     selected_post_idx = st.session_state.get('selected_post_idx', None)
 
     if selected_post_idx is None:
+        visible = list(range(len(board_list)))
+        if tags:
+            categories = sorted({t['category'] for ts in tags.values() for t in ts})
+            selected_category = st.selectbox("분야", ["전체"] + categories, key='board_category_filter')
+            if selected_category != "전체":
+                visible = [i for i in visible
+                           if any(t['category'] == selected_category for t in tags.get(str(board_list[i].get('postid')), []))]
+                st.caption(f"{selected_category}: {len(visible)}건")
+        if dedup and dedup["duplicates"]:
+            st.caption(f"게시글 {len(board_list)}건 중 유사 중복 {dedup['duplicates']}건 — 요약/슬랙 전송은 묶음 대표 게시글만 사용합니다.")
         # header
-        header = st.columns([2, 10, 4, 4, 4, 4])
+        header = st.columns([2, 9, 3, 3, 4, 3, 3, 4])
         header[0].markdown("**번호**")
         header[1].markdown("**제목**")
         header[2].markdown("**작성자**")
         header[3].markdown("**부서**")
         header[4].markdown("**날짜**")
-        header[5].markdown("**뉴스요약**")
+        header[5].markdown("**분야**")
+        header[6].markdown("**중복**")
+        header[7].markdown("**뉴스요약**")
 
-        for idx, post in enumerate(board_list):
-            cols = st.columns([2, 10, 4, 4, 4, 4])
+        for idx in visible:
+            post = board_list[idx]
+            cluster = clusters[by_index[idx]]
+            rep_idx = cluster["representative"]
+            cols = st.columns([2, 9, 3, 3, 4, 3, 3, 4])
             cols[0].write(post.get('postid', ''))
             if cols[1].button(post.get('title', ''), key=f'title_btn_{idx}'):
                 st.session_state['selected_post_idx'] = idx
@@ -75,28 +193,36 @@ def show_board(json_path: str = os.path.join('data', 'board_data.json')):
             cols[2].write(post.get('username', ''))
             cols[3].write(post.get('detptname', ''))
             cols[4].write(format_date(post.get('createdate', '')))
+            category = primary_category(tags.get(str(post.get('postid')), []))
+            if category:
+                cols[5].write(category.split('. ', 1)[-1])
+            if len(cluster["members"]) > 1:
+                if idx == rep_idx:
+                    cols[6].write(f"대표 ({len(cluster['members'])}건)")
+                else:
+                    cols[6].write(f"↳ #{board_list[rep_idx].get('postid', '')} ({cluster['similarity'].get(idx, 0):.0%})")
 
-            # 요약 버튼
-            if cols[5].button('요약', key=f'summary_btn_{idx}'):
+            # 요약 버튼 (중복 게시글은 대표 게시글의 요약을 사용)
+            if cols[7].button('요약', key=f'summary_btn_{idx}'):
+                rep_post = board_list[rep_idx]
+                rep_id = rep_post.get('postid')
+                cache = shared['summaries']
+                if rep_id not in cache:
+                    from modules.llm_governor import LLMQueueTimeout
+                    wait_box = st.empty()
+                    # 다른 세션이 같은 뉴스를 요약 중이면 그 결과를 기다려 사용 (모델 호출은 한 번)
+                    with _summary_lock(shared, rep_id):
+                        if rep_id not in cache:
+                            try:
+                                cache[rep_id] = summarize_post(
+                                    rep_post, on_usage=lambda u: _track_usage(telemetry, u),
+                                    on_wait=lambda position: wait_box.info(f"⏳ 채팅 요청을 먼저 처리하고 있습니다. 요약 대기 {position}번째 순서입니다."))
+                            except LLMQueueTimeout as e:
+                                wait_box.warning(f"{e} 잠시 후 다시 요약을 눌러 주세요.")
+                                continue
+                    wait_box.empty()
                 # reset previous summaries
-                st.session_state['news_summaries'] = {}
-                # lazy import model to avoid startup cost
-                from langchain_openai import AzureChatOpenAI
-                model = AzureChatOpenAI(
-                    azure_endpoint=os.getenv('AZURE_ENDPOINT'),
-                    api_key=os.getenv('OPENAI_API_KEY'),
-                    api_version=os.getenv('AZURE_OPENAI_VERSION'),
-                    azure_deployment='gpt-4.1-mini'
-                )
-                prompt = (f"다음 뉴스 제목과 내용을 요약해줘.\n제목: {post.get('title', '')}\n내용: {post.get('message', '')}")
-                messages = [
-                    {"role": "system", "content": "안녕하세요, 뉴스 스크랩을 부탁드립니다. 형식은 아래와 같이 해주세요. 내용 요약은 3줄 이내로 간단하게 작성하세요. 가독성이 높이기 위해 이모티콘를 포함해서 작성해 주세요."},
-                    {"role": "user", "content": prompt}
-                ]
-                response_text = ''
-                for chunk in model.stream(messages):
-                    response_text += chunk.content
-                st.session_state['news_summaries'][idx] = response_text
+                st.session_state['news_summaries'] = {rep_idx: cache[rep_id]}
 
         # show summaries under table
         if st.session_state.get('news_summaries'):
@@ -106,20 +232,38 @@ def show_board(json_path: str = os.path.join('data', 'board_data.json')):
             for idx, summary in st.session_state['news_summaries'].items():
                 post = board_list[idx]
                 st.markdown(f"**{post.get('title', '')}**")
+                members = clusters[by_index[idx]]["members"]
+                if len(members) > 1:
+                    st.caption("같은 뉴스 묶음: " + ", ".join(f"#{board_list[i].get('postid', '')}" for i in members))
                 st.write(summary)
                 if st.button(f"슬랙으로 전송하기", key=f"slack_btn_{idx}"):
-                    if slack_url:
-                        msg = f"컴플라이언스 뉴스 요약\n제목: {post.get('title', '')}\n요약: {html_to_slack_text(summary)}"
-                        try:
-                            resp = requests.post(slack_url, json={"text": msg})
-                            if resp.status_code == 200:
-                                st.success("슬랙으로 전송되었습니다.")
-                            else:
-                                st.error(f"슬랙 전송 실패: {resp.status_code}")
-                        except Exception as e:
-                            st.error(f"슬랙 전송 오류: {e}")
-                    else:
+                    postid = post.get('postid')
+                    if not slack_url:
                         st.error('슬랙 Webhook URL이 설정되어 있지 않습니다.')
+                        continue
+                    # 전송 여부 확인과 전송 중 표시를 한 번에 (여러 세션이 동시에 눌러도 한 번만 전송)
+                    with shared['lock']:
+                        already = postid in shared['sent'] or postid in shared['sending']
+                        if not already:
+                            shared['sending'].add(postid)
+                    if already:
+                        st.info("이 뉴스 묶음의 요약은 이미 슬랙으로 전송했습니다.")
+                        continue
+                    sent = False
+                    try:
+                        resp = post_summary_to_slack(post, summary, slack_url)
+                        sent = resp.status_code == 200
+                        if sent:
+                            st.success("슬랙으로 전송되었습니다.")
+                        else:
+                            st.error(f"슬랙 전송 실패: {resp.status_code}")
+                    except Exception as e:
+                        st.error(f"슬랙 전송 오류: {e}")
+                    finally:
+                        with shared['lock']:
+                            shared['sending'].discard(postid)
+                            if sent:
+                                shared['sent'].add(postid)
 
     else:
         if st.button('목록'):
@@ -0,0 +1,598 @@
+"""
+RAG 파이프라인 오프라인 벤치마크
+
+app.py의 RAG 경로(임베딩 -> 검색 -> 컨텍스트 구성 -> 메시지 주입 -> 스트리밍)를
+Azure 없이 반복 측정하기 위한 도구입니다.
+
+1. record     : 실제 Azure Search / 임베딩 / 채팅 응답과 지연시간을 카세트(JSON)로 녹화
+2. synthesize : Azure 없이 9_field.json 코퍼스(modules/local_backend.py)로 카세트를 합성
+3. run        : 카세트를 재생하며 단계별/전체 지연시간, 메모리 할당량, 처리량을 측정
+
+재생 시 네트워크 지연은 녹화된 지연시간에 맞춘 로그정규분포에서 샘플링하므로
+실제와 비슷한 분포를 유지하면서도 오프라인 Linux 환경에서 회귀를 잡을 수 있습니다.
+
+사용법 (ktds-msai-6th-mvp 폴더에서):
+  python -m modules.rag_bench record --out data/bench/rag_cassette.json
+  python -m modules.rag_bench synthesize --out data/bench/rag_cassette.json
+  python -m modules.rag_bench run --cassette data/bench/rag_cassette.json --report data/bench/report.json
+  python -m modules.rag_bench run --baseline data/bench/baseline.json --tolerance 0.2   # 회귀 시 종료코드 1
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.local_backend import EmbeddingResponse
+from modules.metrics import summarize
+from modules.rag_pipeline import (
+    get_env_keys,
+    init_search_client,
+    init_embedding_client,
+    get_embedding,
+    retrieve_documents,
+    build_context_text,
+    inject_context_into_messages,
+    init_chat_model,
+)
+
+CASSETTE_VERSION = 1
+DEFAULT_CASSETTE = os.path.join("data", "bench", "rag_cassette.json")
+STAGES = ["embedding", "retrieve", "build_context", "inject", "first_token", "stream", "end_to_end"]
+
+# 합성 카세트의 기본 지연시간 분포 (중앙값 ms, 로그 표준편차)
+SYNTHETIC_LATENCY = {
+    "embedding": (45.0, 0.35),
+    "search": (80.0, 0.40),
+    "ttft": (650.0, 0.45),
+    "gap": (18.0, 0.60),
+}
+
+# 카세트에 포함할 기본 질문 (README 시나리오 예시 포함)
+BASE_QUESTIONS = [
+    "임직원 보안수준진단사이트 주소 알려줘",
+    "KT가 규정한 산업안전보건 알려줘",
+    "컴플라이언스 9대분야 설명해줘",
+]
+
+
+def default_questions(docs, per_category: int = 2):
+    """코퍼스에서 카테고리 개요 질문과 조항 질문을 만들어 기본 질문 목록을 생성"""
+    questions = list(BASE_QUESTIONS)
+    seen = {}
+    for d in docs:
+        cat = d.get("category") or ""
+        short = cat.split(".", 1)[1].strip() if "." in cat else cat
+        if not short:
+            continue
+        if d.get("item_index") == -1:
+            questions.append(f"{short} 설명해줘")
+            continue
+        if seen.get(short, 0) >= per_category:
+            continue
+        first_line = (d.get("content") or "").strip().split("\n", 1)[0]
+        snippet = first_line.lstrip("0123456789) ").strip()[:40]
+        if snippet:
+            questions.append(f"{short} 관련해서 '{snippet}' 내용 알려줘")
+            seen[short] = seen.get(short, 0) + 1
+    return list(dict.fromkeys(questions))
+
+
+def _strip_result(r):
+    # 카세트 크기를 줄이기 위해 벡터 필드는 저장하지 않음
+    return {k: v for k, v in dict(r).items() if k != "content_vector"}
+
+
+def _vector_key(vector):
+    return tuple(round(float(v), 6) for v in list(vector)[:8])
+
+
+class _Chunk:
+    """model.stream()이 반환하는 청크와 같은 모양(.content)의 객체"""
+
+    def __init__(self, content):
+        self.content = content
+
+
+# --- 녹화 ---
+
+class _Recorder:
+    """현재 질문(prompt) 기준으로 각 단계 응답과 지연시간을 모으는 저장소"""
+
+    def __init__(self):
+        self.entries = {}
+        self._local = threading.local()
+
+    def begin(self, prompt):
+        self._local.prompt = prompt
+        self.entries.setdefault(prompt, {"prompt": prompt, "embedding": None, "search": None, "chat": None})
+
+    def put(self, stage, value):
+        self.entries[self._local.prompt][stage] = value
+
+
+class RecordingEmbeddingClient:
+    def __init__(self, real, recorder):
+        self._real = real
+        self._recorder = recorder
+
+    @property
+    def embeddings(self):
+        return self
+
+    def create(self, model, input, **kwargs):
+        t0 = time.perf_counter()
+        resp = self._real.embeddings.create(model=model, input=input, **kwargs)
+        latency_ms = (time.perf_counter() - t0) * 1000
+        self._recorder.put("embedding", {"vector": list(resp.data[0].embedding), "latency_ms": latency_ms})
+        return resp
+
+
+class RecordingSearchClient:
+    def __init__(self, real, recorder):
+        self._real = real
+        self._recorder = recorder
+
+    def search(self, *args, **kwargs):
+        t0 = time.perf_counter()
+        # 페이징 결과는 순회 시점에 네트워크 호출이 일어나므로 목록으로 소비한 뒤 시간을 잼
+        results = [_strip_result(r) for r in self._real.search(*args, **kwargs)]
+        latency_ms = (time.perf_counter() - t0) * 1000
+        self._recorder.put("search", {"results": results, "latency_ms": latency_ms})
+        return iter(results)
+
+
+class RecordingChatModel:
+    def __init__(self, real, recorder):
+        self._real = real
+        self._recorder = recorder
+
+    def stream(self, messages, **kwargs):
+        chunks, gaps = [], []
+        t0 = time.perf_counter()
+        last = t0
+        ttft_ms = None
+        for chunk in self._real.stream(messages, **kwargs):
+            now = time.perf_counter()
+            if ttft_ms is None:
+                ttft_ms = (now - t0) * 1000
+            else:
+                gaps.append((now - last) * 1000)
+            last = now
+            chunks.append(chunk.content)
+            yield chunk
+        self._recorder.put("chat", {"chunks": chunks, "ttft_ms": ttft_ms or 0.0, "gaps_ms": gaps})
+
+
+def record_cassette(questions, top_k: int = 5):
+    """실제 Azure 서비스에 질문을 보내며 응답을 녹화하여 카세트 dict를 반환"""
+    env = get_env_keys()
+    search_client = init_search_client(env["search_endpoint"], env["search_key"], env["search_index"])
+    emb_client = init_embedding_client(env)
+    model = init_chat_model(env, env["chat_deployment"])
+    if not (search_client and model):
+        raise ValueError("녹화하려면 Azure Search와 Azure OpenAI 환경변수(.env)가 필요합니다.")
+
+    recorder = _Recorder()
+    rec_search = RecordingSearchClient(search_client, recorder)
+    rec_emb = RecordingEmbeddingClient(emb_client, recorder) if emb_client else None
+    rec_model = RecordingChatModel(model, recorder)
+    for q in questions:
+        recorder.begin(q)
+        vec = get_embedding(q, env["embedding_deployment"], env, client=rec_emb)
+        docs = retrieve_documents(rec_search, q, vec, top_k)
+        msgs = inject_context_into_messages([{"role": "user", "content": q}], build_context_text(docs))
+        for _ in rec_model.stream(msgs):
+            pass
+    return {
+        "version": CASSETTE_VERSION,
+        "source": "recorded",
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "top_k": top_k,
+        "embedding_deployment": env["embedding_deployment"],
+        "entries": list(recorder.entries.values()),
+    }
+
+
+# --- 합성 ---
+
+def synthesize_cassette(corpus_path: str = os.path.join("data", "9_field.json"), top_k: int = 5,
+                        seed: int = 7, answer_chars: int = 300, chunk_chars: int = 3):
+    """9_field.json 코퍼스와 기본 지연시간 분포로 카세트를 합성 (Azure 불필요)"""
+    from modules.local_backend import LocalCorpus
+
+    rng = random.Random(seed)
+    corpus = LocalCorpus.from_file(corpus_path)
+
+    def draw(kind):
+        median, sigma = SYNTHETIC_LATENCY[kind]
+        return rng.lognormvariate(math.log(median), sigma)
+
+    entries = []
+    for q in default_questions(corpus.docs):
+        vector = corpus.embed(q)
+        results = [_strip_result(r) for r in corpus.search(search_text=q, vector=vector, top=top_k)]
+        answer = (results[0].get("content") or "")[:answer_chars] if results else "관련 규정을 찾지 못했습니다."
+        chunks = [answer[i:i + chunk_chars] for i in range(0, len(answer), chunk_chars)]
+        entries.append({
+            "prompt": q,
+            "embedding": {"vector": vector, "latency_ms": draw("embedding")},
+            "search": {"results": results, "latency_ms": draw("search")},
+            "chat": {"chunks": chunks, "ttft_ms": draw("ttft"), "gaps_ms": [draw("gap") for _ in chunks[1:]]},
+        })
+    return {
+        "version": CASSETTE_VERSION,
+        "source": "synthetic",
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "top_k": top_k,
+        "embedding_deployment": "local-hash",
+        "entries": entries,
+    }
+
+
+# --- 재생 ---
+
+class LatencyModel:
+    """녹화된 지연시간(ms) 표본에 로그정규분포를 맞춰 재생 시 샘플링"""
+
+    def __init__(self, samples_ms, rng, scale: float = 1.0):
+        logs = [math.log(s) for s in samples_ms if s and s > 0]
+        self.mu = sum(logs) / len(logs) if logs else 0.0
+        var = sum((x - self.mu) ** 2 for x in logs) / len(logs) if logs else 0.0
+        self.sigma = max(math.sqrt(var), 0.05)
+        self.enabled = bool(logs) and scale > 0
+        self.scale = scale
+        self._rng = rng
+        self._lock = threading.Lock()
+
+    def sample_s(self) -> float:
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            ms = self._rng.lognormvariate(self.mu, self.sigma)
+        return ms * self.scale / 1000.0
+
+    def sleep(self):
+        s = self.sample_s()
+        if s > 0:
+            time.sleep(s)
+
+
+class Cassette:
+    """카세트 파일을 로드하고 재생용 클라이언트를 생성"""
+
+    def __init__(self, data, latency_scale: float = 1.0, seed: int = 13):
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"지원되지 않는 카세트 버전입니다: {data.get('version')}")
+        self.data = data
+        self.entries = data.get("entries") or []
+        self.by_prompt = {e["prompt"]: e for e in self.entries}
+        self.by_vector = {}
+        for e in self.entries:
+            if e.get("embedding"):
+                self.by_vector[_vector_key(e["embedding"]["vector"])] = e
+        rng = random.Random(seed)
+        self.misses = 0
+
+        def samples(stage, field):
+            return [e[stage][field] for e in self.entries if e.get(stage)]
+
+        gaps = [g for e in self.entries if e.get("chat") for g in e["chat"].get("gaps_ms") or []]
+        self.latency = {
+            "embedding": LatencyModel(samples("embedding", "latency_ms"), rng, latency_scale),
+            "search": LatencyModel(samples("search", "latency_ms"), rng, latency_scale),
+            "ttft": LatencyModel(samples("chat", "ttft_ms"), rng, latency_scale),
+            "gap": LatencyModel(gaps, rng, latency_scale),
+        }
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), **kwargs)
+
+    def save(self, path):
+        save_cassette(self.data, path)
+
+    def embedding_client(self):
+        return ReplayEmbeddingClient(self)
+
+    def search_client(self):
+        return ReplaySearchClient(self)
+
+    def chat_model(self):
+        return ReplayChatModel(self)
+
+
+def save_cassette(data, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+class ReplayEmbeddingClient:
+    def __init__(self, cassette):
+        self._c = cassette
+
+    @property
+    def embeddings(self):
+        return self
+
+    def create(self, model, input, **kwargs):
+        entry = self._c.by_prompt.get(input if isinstance(input, str) else input[0])
+        self._c.latency["embedding"].sleep()
+        if not entry or not entry.get("embedding"):
+            self._c.misses += 1
+            raise KeyError("카세트에 없는 임베딩 요청입니다.")
+        return EmbeddingResponse([entry["embedding"]["vector"]])
+
+
+class ReplaySearchClient:
+    def __init__(self, cassette):
+        self._c = cassette
+
+    def search(self, search_text=None, **kwargs):
+        entry = None
+        vector = kwargs.get("vector")
+        query_vector = vector.get("value") if isinstance(vector, dict) else None
+        for vq in kwargs.get("vector_queries") or []:
+            query_vector = getattr(vq, "vector", None)
+        if query_vector is not None:
+            entry = self._c.by_vector.get(_vector_key(query_vector))
+        if entry is None and search_text:
+            entry = self._c.by_prompt.get(search_text)
+        self._c.latency["search"].sleep()
+        if not entry or not entry.get("search"):
+            self._c.misses += 1
+            return iter([])
+        top = kwargs.get("top") or (vector or {}).get("k") or len(entry["search"]["results"])
+        return iter([dict(r) for r in entry["search"]["results"][:top]])
+
+
+class ReplayChatModel:
+    def __init__(self, cassette):
+        self._c = cassette
+
+    def stream(self, messages, **kwargs):
+        prompt = messages[-1]["content"] if messages else ""
+        entry = self._c.by_prompt.get(prompt)
+        if not entry or not entry.get("chat"):
+            self._c.misses += 1
+            return
+        self._c.latency["ttft"].sleep()
+        for i, piece in enumerate(entry["chat"]["chunks"]):
+            if i:
+                self._c.latency["gap"].sleep()
+            yield _Chunk(piece)
+
+
+# --- 측정 ---
+
+def run_question(prompt, clients, env, top_k, history=None):
+    """질문 하나를 app.py와 같은 순서로 처리하며 단계별 지연시간(ms)을 반환"""
+    emb_client, search_client, model = clients
+    timings = {}
+    t0 = time.perf_counter()
+    vec = get_embedding(prompt, env["embedding_deployment"], env, client=emb_client)
+    t1 = time.perf_counter()
+    docs = retrieve_documents(search_client, prompt, vec, top_k)
+    t2 = time.perf_counter()
+    context_text = build_context_text(docs)
+    t3 = time.perf_counter()
+    messages = list(history or []) + [{"role": "user", "content": prompt}]
+    messages_for_model = inject_context_into_messages(messages, context_text)
+    t4 = time.perf_counter()
+    response_text = ""
+    first = None
+    for chunk in model.stream(messages_for_model):
+        if first is None:
+            first = time.perf_counter()
+        response_text += chunk.content
+    t5 = time.perf_counter()
+    timings["embedding"] = (t1 - t0) * 1000
+    timings["retrieve"] = (t2 - t1) * 1000
+    timings["build_context"] = (t3 - t2) * 1000
+    timings["inject"] = (t4 - t3) * 1000
+    timings["first_token"] = ((first or t5) - t4) * 1000
+    timings["stream"] = (t5 - t4) * 1000
+    timings["end_to_end"] = (t5 - t0) * 1000
+    return timings, len(docs), len(response_text)
+
+
+def measure_allocations(cassette_data, env, top_k):
+    """지연 없이 재생하며 tracemalloc으로 단계별 최대 할당량(바이트)을 측정"""
+    cassette = Cassette(cassette_data, latency_scale=0)
+    emb_client, search_client, model = cassette.embedding_client(), cassette.search_client(), cassette.chat_model()
+    allocs = {s: [] for s in ("embedding", "retrieve", "build_context", "inject", "stream")}
+
+    def traced(stage, fn):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        result = fn()
+        allocs[stage].append(max(0, tracemalloc.get_traced_memory()[1] - before))
+        return result
+
+    def consume(msgs):
+        text = ""
+        for chunk in model.stream(msgs):
+            text += chunk.content
+        return text
+
+    tracemalloc.start()
+    try:
+        for entry in cassette.entries:
+            q = entry["prompt"]
+            vec = traced("embedding", lambda: get_embedding(q, env["embedding_deployment"], env, client=emb_client))
+            docs = traced("retrieve", lambda: retrieve_documents(search_client, q, vec, top_k))
+            ctx = traced("build_context", lambda: build_context_text(docs))
+            msgs = traced("inject", lambda: inject_context_into_messages([{"role": "user", "content": q}], ctx))
+            traced("stream", lambda: consume(msgs))
+    finally:
+        tracemalloc.stop()
+    return {stage: summarize(values) for stage, values in allocs.items()}
+
+
+def run_benchmark(cassette_data, repeat: int = 3, concurrency: int = 1, latency_scale: float = 1.0,
+                  top_k: int = None, seed: int = 13):
+    """카세트를 재생하며 단계별 지연시간/할당량/처리량을 측정하여 보고서 dict를 반환"""
+    cassette = Cassette(cassette_data, latency_scale=latency_scale, seed=seed)
+    top_k = top_k or int(cassette_data.get("top_k") or 5)
+    env = dict(get_env_keys())
+    # 재생 클라이언트는 배포 이름만 확인하므로 녹화 당시 배포 이름을 사용
+    env["embedding_deployment"] = cassette_data.get("embedding_deployment") or "replay"
+    clients = (cassette.embedding_client(), cassette.search_client(), cassette.chat_model())
+    prompts = [e["prompt"] for e in cassette.entries] * max(1, repeat)
+
+    samples = {s: [] for s in STAGES}
+    doc_counts = []
+    lock = threading.Lock()
+
+    def one(prompt):
+        timings, n_docs, _ = run_question(prompt, clients, env, top_k)
+        with lock:
+            for stage, value in timings.items():
+                samples[stage].append(value)
+            doc_counts.append(n_docs)
+
+    # 워밍업 1회 (import/캐시 영향 제거)
+    if prompts:
+        warm = Cassette(cassette_data, latency_scale=0)
+        run_question(prompts[0], (warm.embedding_client(), warm.search_client(), warm.chat_model()), env, top_k)
+
+    wall0 = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, prompts))
+    else:
+        for p in prompts:
+            one(p)
+    wall = time.perf_counter() - wall0
+
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "cassette_source": cassette_data.get("source"),
+        "questions": len(prompts),
+        "concurrency": concurrency,
+        "latency_scale": latency_scale,
+        "top_k": top_k,
+        "replay_misses": cassette.misses,
+        "avg_docs": (sum(doc_counts) / len(doc_counts)) if doc_counts else 0.0,
+        "throughput_qps": (len(prompts) / wall) if wall > 0 else 0.0,
+        "latency_ms": {stage: summarize(values) for stage, values in samples.items()},
+        "alloc_bytes": measure_allocations(cassette_data, env, top_k),
+    }
+
+
+def compare_reports(report, baseline, tolerance: float = 0.2, min_abs_ms: float = 0.05):
+    """기준 보고서 대비 p50 지연시간/할당량이 tolerance 비율 이상 늘어난 항목 목록을 반환"""
+    regressions = []
+    for section, min_abs in (("latency_ms", min_abs_ms), ("alloc_bytes", 1024)):
+        for stage, cur in (report.get(section) or {}).items():
+            base = (baseline.get(section) or {}).get(stage)
+            if not base:
+                continue
+            b, c = base.get("p50", 0.0), cur.get("p50", 0.0)
+            if c > b * (1 + tolerance) and (c - b) > min_abs:
+                regressions.append(f"{section}.{stage}: p50 {b:.3f} -> {c:.3f}")
+    base_qps = baseline.get("throughput_qps") or 0.0
+    # 처리량은 동시성/지연 배율이 같은 조건끼리만 비교
+    same_setup = (baseline.get("concurrency"), baseline.get("latency_scale")) == (report.get("concurrency"), report.get("latency_scale"))
+    if base_qps and same_setup and report.get("throughput_qps", 0.0) < base_qps * (1 - tolerance):
+        regressions.append(f"throughput_qps: {base_qps:.2f} -> {report['throughput_qps']:.2f}")
+    return regressions
+
+
+def print_report(report):
+    print(f"질문 수={report['questions']} 동시성={report['concurrency']} "
+          f"처리량={report['throughput_qps']:.2f} q/s 평균 문서수={report['avg_docs']:.1f} "
+          f"재생 누락={report['replay_misses']}")
+    print(f"{'stage':<14}{'p50(ms)':>10}{'p90(ms)':>10}{'p99(ms)':>10}{'alloc p50(KiB)':>16}")
+    for stage in STAGES:
+        lat = report["latency_ms"][stage]
+        alloc = report["alloc_bytes"].get(stage)
+        alloc_txt = f"{alloc['p50'] / 1024:.1f}" if alloc else "-"
+        print(f"{stage:<14}{lat['p50']:>10.3f}{lat['p90']:>10.3f}{lat['p99']:>10.3f}{alloc_txt:>16}")
+
+
+def _load_questions(path):
+    if not path:
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            return [json.loads(line)["question"] for line in f if line.strip()]
+        return [line.strip() for line in f if line.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RAG 파이프라인 오프라인 벤치마크")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_rec = sub.add_parser("record", help="실제 Azure 응답을 카세트로 녹화")
+    p_rec.add_argument("--out", default=DEFAULT_CASSETTE)
+    p_rec.add_argument("--questions", help="질문 목록 파일(.txt 한 줄 하나 또는 .jsonl의 question 필드)")
+    p_rec.add_argument("--top-k", type=int, default=5)
+
+    p_syn = sub.add_parser("synthesize", help="9_field.json으로 카세트 합성 (Azure 불필요)")
+    p_syn.add_argument("--out", default=DEFAULT_CASSETTE)
+    p_syn.add_argument("--corpus", default=os.path.join("data", "9_field.json"))
+    p_syn.add_argument("--top-k", type=int, default=5)
+    p_syn.add_argument("--seed", type=int, default=7)
+
+    p_run = sub.add_parser("run", help="카세트를 재생하여 벤치마크 실행")
+    p_run.add_argument("--cassette", default=DEFAULT_CASSETTE)
+    p_run.add_argument("--repeat", type=int, default=3)
+    p_run.add_argument("--concurrency", type=int, default=1)
+    p_run.add_argument("--latency-scale", type=float, default=1.0, help="재생 지연 배율 (0이면 CPU 구간만 측정)")
+    p_run.add_argument("--top-k", type=int)
+    p_run.add_argument("--report", help="결과 JSON 저장 경로")
+    p_run.add_argument("--baseline", help="비교할 기준 결과 JSON")
+    p_run.add_argument("--tolerance", type=float, default=0.2)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        from modules.local_backend import load_corpus_documents
+        questions = _load_questions(args.questions) or default_questions(load_corpus_documents())
+        data = record_cassette(questions, top_k=args.top_k)
+        save_cassette(data, args.out)
+        print(f"녹화 완료: {len(data['entries'])}건 -> {args.out}")
+        return 0
+
+    if args.command == "synthesize":
+        data = synthesize_cassette(args.corpus, top_k=args.top_k, seed=args.seed)
+        save_cassette(data, args.out)
+        print(f"합성 완료: {len(data['entries'])}건 -> {args.out}")
+        return 0
+
+    if not os.path.exists(args.cassette):
+        # 카세트가 없으면 로컬 코퍼스로 합성하여 바로 실행
+        print(f"카세트가 없어 합성합니다: {args.cassette}")
+        save_cassette(synthesize_cassette(), args.cassette)
+    with open(args.cassette, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    report = run_benchmark(data, repeat=args.repeat, concurrency=args.concurrency,
+                           latency_scale=args.latency_scale, top_k=args.top_k)
+    print_report(report)
+    if args.report:
+        os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_reports(report, baseline, args.tolerance)
+        if regressions:
+            print("성능 회귀 감지:")
+            for r in regressions:
+                print(" -", r)
+            return 1
+        print("기준 대비 회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""
+RAG 파이프라인 공통 함수 모듈
+
+app.py의 챗봇 흐름(임베딩 -> 검색 -> 컨텍스트 구성 -> 메시지 주입)을
+Streamlit 없이도 호출할 수 있도록 분리한 함수들입니다.
+벤치마크(modules/rag_bench.py)와 같은 오프라인 도구에서도 동일한 코드를 사용합니다.
+
+클라이언트 객체(search_client, embedding client, model)는 인자로 주입할 수 있어
+녹화/재생용 대체 객체로 바꿔 끼울 수 있습니다.
+"""
+import os
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 인덱스 content_vector 차원과 같아야 합니다. (text-embedding-3-*는 dimensions 파라미터로 축소 가능)
+DEFAULT_EMBEDDING_DIMENSIONS = 1536
+
+
+def get_embedding_dimensions():
+    """AZURE_EMBEDDING_DIMENSIONS 환경변수(기본 1536). 0이면 dimensions 파라미터를 보내지 않음(ada-002 등)"""
+    try:
+        return int(os.getenv("AZURE_EMBEDDING_DIMENSIONS") or DEFAULT_EMBEDDING_DIMENSIONS)
+    except ValueError:
+        return DEFAULT_EMBEDDING_DIMENSIONS
+
+
+# 블루/그린 재구축(modules/index_rebuild.py)이 별칭 대신 사용하는 서비스 인덱스 포인터 파일
+INDEX_POINTER_PATH = os.getenv("AZURE_SEARCH_INDEX_POINTER") or os.path.join("data", "search_index_pointer.json")
+
+
+def load_index_pointer(path=INDEX_POINTER_PATH):
+    """{서비스 이름: {"index": 실제 인덱스, "previous": 이전 인덱스, ...}} (파일이 없으면 빈 dict)"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def resolve_index_name(name):
+    """서비스 이름을 실제로 조회할 인덱스 이름으로 변환 (포인터가 없으면 그대로 = 인덱스 또는 별칭 이름)"""
+    if not name:
+        return name
+    return (load_index_pointer().get(name) or {}).get("index") or name
+
+
+# 환경변수 키를 읽어 딕셔너리로 반환합니다.
+# 반환값 예시: {"search_endpoint": "...", "search_key": "...", "search_index": "...", ...}
+def get_env_keys():
+    return {
+        "search_endpoint": os.getenv("AZURE_SEARCH_ENDPOINT"),
+        "search_key": os.getenv("AZURE_SEARCH_API_KEY"),
+        "search_index": resolve_index_name(os.getenv("AZURE_SEARCH_INDEX_NAME")),
+        "embedding_deployment": os.getenv("AZURE_EMBEDDING_DEPLOYMENT"),
+        "embedding_dimensions": get_embedding_dimensions(),
+        "chat_deployment": "gpt-4.1-mini",
+        "azure_endpoint": os.getenv("AZURE_ENDPOINT"),
+        "openai_key": os.getenv("OPENAI_API_KEY"),
+        "openai_version": os.getenv("OPENAI_API_VERSION")
+    }
+
+
+# Azure Search용 SearchClient를 초기화하여 반환합니다.
+# 인자: endpoint(검색 서비스 엔드포인트), key(검색 서비스 키), index(인덱스 이름)
+# 반환: SearchClient 인스턴스 또는 초기화 실패 시 None
+def init_search_client(endpoint, key, index):
+    if not (endpoint and key and index):
+        return None
+    try:
+        from azure.search.documents import SearchClient
+        from azure.core.credentials import AzureKeyCredential
+        # SDK 기본값(읽기 타임아웃 수 분 + 재시도 3회)이면 마감을 넘겨 버려진 검색이 실행 풀 자리를 오래 차지하므로 짧게 제한
+        return SearchClient(endpoint=endpoint, index_name=index, credential=AzureKeyCredential(key),
+                            connection_timeout=float(os.getenv("AZURE_SEARCH_CONNECT_TIMEOUT_S") or 3),
+                            read_timeout=float(os.getenv("AZURE_SEARCH_READ_TIMEOUT_S") or 10),
+                            retry_total=int(os.getenv("AZURE_SEARCH_RETRY_TOTAL") or 1))
+    except Exception:
+        return None
+
+
+# 임베딩 요청에 사용할 클라이언트를 생성합니다.
+# azure.ai.openai가 없으면 openai 패키지의 AzureOpenAI 클라이언트를 사용하며,
+# 기본적으로 재시도/서킷 브레이커/예비 배포 전환을 적용한 ResilientEmbeddingClient로 감쌉니다. (modules/resilient_client.py)
+# 반환: embeddings.create(model=..., input=...)를 제공하는 객체 또는 실패 시 None
+def init_embedding_client(env):
+    if not (env.get("openai_key") and env.get("azure_endpoint")):
+        return None
+    try:
+        import importlib
+        oa_mod = importlib.import_module("azure.ai.openai")
+        OpenAIClient = getattr(oa_mod, "OpenAIClient")
+        from azure.core.credentials import AzureKeyCredential as CoreAzureKey
+        return OpenAIClient(env["azure_endpoint"], CoreAzureKey(env["openai_key"]))
+    except Exception:
+        pass
+    try:
+        from openai import AzureOpenAI
+        from modules.resilient_client import ResilientEmbeddingClient, enabled
+        if enabled():
+            return ResilientEmbeddingClient(env)
+        return AzureOpenAI(
+            azure_endpoint=env["azure_endpoint"],
+            api_key=env["openai_key"],
+            api_version=env.get("openai_version"),
+        )
+    except Exception:
+        return None
+
+
+# 주어진 프롬프트에 대해 Azure OpenAI 임베딩을 요청하여 벡터를 반환합니다.
+# 인자: prompt(텍스트), deployment(임베딩 모델 이름), env(환경변수 딕셔너리), client(선택: 주입할 임베딩 클라이언트)
+# 반환: embedding 벡터(list) 또는 실패 시 None
+def get_embedding(prompt, deployment, env, client=None):
+    if not deployment:
+        return None
+    try:
+        oa_client = client or init_embedding_client(env)
+        if oa_client is None:
+            return None
+        # 인덱스 벡터 차원과 맞추기 위해 dimensions를 함께 요청 (0이면 모델 기본 차원)
+        dims = env.get("embedding_dimensions", DEFAULT_EMBEDDING_DIMENSIONS)
+        extra = {"dimensions": dims} if dims else {}
+        emb_resp = oa_client.embeddings.create(model=deployment, input=prompt, **extra)
+        return emb_resp.data[0].embedding
+    except Exception as e:
+        # 호출자는 None이면 키워드 검색으로 진행 (재시도/전환은 클라이언트가 이미 수행)
+        logger.warning(f"임베딩 실패: {type(e).__name__}: {e}")
+        return None
+
+
+# Azure Search에서 프롬프트(또는 임베딩)를 사용해 문서를 검색하여 리스트로 반환합니다.
+# 질의 구성(select 필드, 벡터 질의, 최소 점수)은 modules/retriever.py의 Retriever가 담당합니다.
+# 인자: search_client, prompt, embedding_vector, top_k, on_error(선택: 오류 메시지를 표시할 콜백, 예: st.error),
+#       filter(선택: OData 필터, 예: category_matcher가 만든 category/item_index 조건), min_score(선택: 최소 점수)
+# 반환: 문서 dict 리스트 (id, domain, category, content, score)
+def retrieve_documents(search_client, prompt, embedding_vector, top_k, on_error=None, filter=None, min_score=None):
+    if not search_client:
+        return []
+    try:
+        from modules.retriever import Retriever, RetrievalQuery
+        query = RetrievalQuery(
+            text=None if embedding_vector is not None else prompt,
+            vector=embedding_vector,
+            top_k=top_k,
+            filter=filter,
+            min_score=min_score,
+        )
+        return [d.to_dict() for d in Retriever(search_client).iter(query)]
+    except Exception as e:
+        logger.exception("Azure Search 조회 실패")
+        if on_error:
+            on_error(f"Azure Search 조회 실패: {e}")
+        return []
+
+
+# category_matcher.CategoryMatcher.plan() 결과(검색 계획)에 따라 문서를 검색합니다.
+# 개요 질문은 통합 문서(item_index == -1)를 필터로 바로 조회하여 임베딩을 생략하고,
+# 필터 결과가 없으면(인덱스의 category 값이 다른 경우 등) 필터 없이 다시 검색합니다.
+# 인자: plan(검색 계획 dict), embed(프롬프트를 받아 임베딩 벡터 또는 None을 반환하는 함수),
+#       min_score(선택: 질의 검색의 최소 점수, 필터로 바로 조회하는 개요 질문에는 적용하지 않음),
+#       federated(선택: modules/federated_retriever.FederatedRetriever — 질의 검색을 게시판/업로드 인덱스까지 동시에 수행)
+def retrieve_with_plan(search_client, prompt, plan, top_k, embed, on_error=None, min_score=None, federated=None):
+    def search(vector, filter):
+        if federated is not None:
+            return federated.search(prompt, vector, top_k, filter=filter, min_score=min_score,
+                                    categories=plan.get("categories"))
+        return retrieve_documents(search_client, prompt, vector, top_k, on_error=on_error, filter=filter,
+                                  min_score=min_score)
+
+    embedding_vector = None
+    if plan["overview"]:
+        docs = retrieve_documents(search_client, "*", None, plan["top"], on_error=on_error, filter=plan["filter"])
+    else:
+        embedding_vector = embed(prompt)
+        docs = search(embedding_vector, plan["filter"])
+    if plan["filter"] and not any(d.get("source", "compliance") == "compliance" for d in docs):
+        if embedding_vector is None:
+            embedding_vector = embed(prompt)
+        docs = search(embedding_vector, None)
+    return docs
+
+
+def build_context_text(retrieved_docs):
+    """
+    검색된 문서 리스트로부터 모델에 주입할 컨텍스트 텍스트를 생성합니다.
+    각 문서마다 출처 헤더를 붙여 하나의 문자열로 합쳐 반환합니다.
+    """
+    if not retrieved_docs:
+        return ""
+    parts = []
+    for i, d in enumerate(retrieved_docs):
+        header = f"[출처 {i+1}] "
+        if d.get("domain"):
+            header += d.get("domain") + " | "
+        parts.append(header + d.get("content", ""))
+    return "\n\n".join(parts)
+
+
+# 모든 요청에서 글자 하나 다르지 않게 맨 앞에 두는 고정 지시문
+# 공급자 프롬프트 캐시는 앞부분이 같은 요청끼리만 재사용되므로, 검색 컨텍스트/대화 이력 같은 가변 내용은 이 뒤에 둡니다.
+SYSTEM_PROMPT = (
+    "당신은 주식회사 KT의 컴플라이언스 담당자입니다.\n"
+    "사용자들의 컴플라이언스 관련 질의에 답변을 도와주는 helpful assistant입니다.\n"
+    "컴플라이언스는 기업활동에서 벌어질 수 있는 법률적, 윤리적, 재무적, 비재무적 위험요소를 사전에 억제하고 방지하는 활동을 의미합니다.\n"
+    "확실하지 않거나 답변이 없으면 모른다고 명시하세요.\n"
+    "답변은 뒤따르는 '참고 문서' 메시지의 내용을 근거로 작성하세요."
+)
+
+
+def inject_context_into_messages(messages, context_text):
+    """
+    [고정 지시문] + [이전 대화] + [참고 문서] + [마지막 사용자 질문] 순서로 모델 입력을 만듭니다.
+    고정 지시문과 이전 대화는 턴이 바뀌어도 앞부분이 그대로 유지되어 프롬프트 캐시에 적중하고,
+    매번 달라지는 검색 컨텍스트는 마지막 질문 바로 앞에만 들어갑니다.
+    context_text가 빈 경우 원본 메시지를 그대로 반환합니다.
+    """
+    if not context_text:
+        return messages
+    msgs = [m for m in messages]
+    history, last = msgs[:-1], msgs[-1:]
+    return (
+        [{"role": "system", "content": SYSTEM_PROMPT}]
+        + history
+        + [{"role": "system", "content": "참고 문서:\n\n" + context_text}]
+        + last
+    )
+
+
+def usage_summary(usage_metadata):
+    """
+    LangChain 응답의 usage_metadata를 텔레메트리용 dict로 변환합니다.
+    cached_tokens는 공급자 프롬프트 캐시에서 읽은 입력 토큰 수입니다. 사용량 정보가 없으면 None.
+    """
+    if not usage_metadata:
+        return None
+    input_tokens = usage_metadata.get("input_tokens") or 0
+    cached = (usage_metadata.get("input_token_details") or {}).get("cache_read") or 0
+    return {
+        "input_tokens": input_tokens,
+        "output_tokens": usage_metadata.get("output_tokens") or 0,
+        "cached_tokens": cached,
+        "cache_ratio": round(cached / input_tokens, 3) if input_tokens else 0.0,
+    }
+
+
+# LangChain 기반 AzureChatOpenAI 모델을 초기화하여 반환합니다.
+# 기본적으로 호출 타임아웃/재시도(Retry-After)/서킷 브레이커/예비 배포 전환을 적용한 ResilientChatModel로 감쌉니다.
+# (LLM_RESILIENCE=0이면 AzureChatOpenAI를 그대로 반환)
+# 인자: env(환경변수 딕셔너리), deployment(챗 모델 배포 이름), on_error(선택: 오류 메시지 콜백)
+# 반환: stream()/invoke()를 제공하는 모델 인스턴스 또는 실패 시 None
+def init_chat_model(env, deployment, on_error=None):
+    # 스트리밍 마지막 청크로 토큰 사용량(캐시 적중 토큰 포함)을 받음. 구버전 API라 stream_options를 거부하면 LLM_STREAM_USAGE=0
+    stream_usage = os.getenv("LLM_STREAM_USAGE", "1") != "0"
+    try:
+        from modules.resilient_client import ResilientChatModel, enabled
+        if enabled():
+            model = ResilientChatModel(env, deployment, stream_usage=stream_usage)
+            # 설정 오류는 첫 호출이 아니라 초기화 시점에 드러나도록 주 대상 모델을 미리 생성
+            model.primary()
+            return model
+        from langchain_openai import AzureChatOpenAI
+        return AzureChatOpenAI(
+            azure_endpoint=env["azure_endpoint"],
+            api_key=env["openai_key"],
+            api_version=env["openai_version"],
+            azure_deployment=deployment,
+            stream_usage=stream_usage,
+        )
+    except Exception as e:
+        logger.exception("모델 초기화 실패")
+        if on_error:
+            on_error(f"모델 초기화 실패: {e}")
+        return None
+
+
+# 로컬 JSON에서 카테고리명을 읽어 리스트로 반환합니다.
+# 반환값에는 원본 '번호. 이름'과 번호를 제거한 단축명(예: '산업안전보건')을 모두 포함합니다.
+def load_local_categories(path="data/9_field.json"):
+    cats = []
+    try:
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, list):
+                for item in data:
+                    c = item.get("category")
+                    if c:
+                        cats.append(c)
+                        # 숫자 접두사 제거 (예: '7. 산업안전보건' -> '산업안전보건')
+                        short = c
+                        if "." in c:
+                            short = c.split(".", 1)[1].strip()
+                        cats.append(short)
+    except Exception:
+        # 실패해도 빈 리스트 반환
+        return []
+    return list(dict.fromkeys([c for c in cats if c]))
@@ -0,0 +1,492 @@
+"""
+Azure OpenAI 호출 복원력 (재시도 / 서킷 브레이커 / 예비 배포 전환)
+
+SDK 기본값(요청 타임아웃 10분, 자체 재시도)에 맡기면 느리거나 429를 내는 배포에서 사용자가
+타임아웃까지 멈춰 있다가 일반 오류를 봅니다. 이 모듈은 채팅/임베딩 호출을 감싸서
+
+- 호출마다 짧은 타임아웃 + 질문 하나당 전체 마감 시간(deadline)
+- 지수 백오프(지터 포함), 429/503의 Retry-After(retry-after-ms) 값을 우선 사용
+- 엔드포인트+배포별 서킷 브레이커 (연속 실패 시 열림 → 일정 시간 뒤 한 번 시험 호출)
+- 주 배포가 쿨다운/차단 상태이면 설정된 예비 배포(다른 배포 또는 다른 리전)로 바로 전환
+
+을 적용합니다. 스트리밍은 첫 토큰을 받기 전까지만 재시도/전환합니다. (이미 토큰을 보여준 뒤에는 다시 보내지 않음)
+첫 토큰이 늦으면 modules/hedging.py의 정책에 따라 예비 배포로 헤지 요청을 보냅니다. (예비 배포가 설정된 경우만)
+헤지 요청도 예비 배포의 LLM 제어기(modules/llm_governor.py) 자리를 바로 얻을 수 있을 때만 보냅니다.
+브레이커 상태는 breaker_stats()로 조회하고, 상태가 바뀔 때 App Insights circuit_breaker 이벤트로 기록합니다.
+
+환경변수:
+- LLM_RESILIENCE: 0이면 감싸지 않고 SDK 클라이언트를 그대로 사용 (기본 1)
+- LLM_CALL_TIMEOUT_S / EMBED_CALL_TIMEOUT_S: 호출 1회 타임아웃 (기본 30 / 10초)
+- LLM_DEADLINE_S / EMBED_DEADLINE_S: 재시도를 포함한 전체 마감 (기본 60 / 15초)
+- LLM_MAX_ATTEMPTS: 최대 시도 횟수 (기본 4)
+- CIRCUIT_FAILURE_THRESHOLD: 브레이커를 여는 연속 실패 수 (기본 5), CIRCUIT_RESET_S: 열린 상태 유지 시간 (기본 30초)
+- AZURE_FAILOVER_ENDPOINT / AZURE_FAILOVER_API_KEY / AZURE_FAILOVER_API_VERSION: 예비 리전 (없으면 주 엔드포인트)
+- AZURE_FAILOVER_CHAT_DEPLOYMENT / AZURE_FAILOVER_EMBEDDING_DEPLOYMENT: 예비 배포 이름 (없으면 같은 이름)
+  예비 임베딩 배포는 인덱스와 같은 모델/차원이어야 합니다.
+"""
+import email.utils
+import logging
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from modules.hedging import HedgeSkipped, get_policy, hedged_open
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+DEFAULT_MAX_ATTEMPTS = 4
+BASE_BACKOFF_S = 0.5
+MAX_BACKOFF_S = 8.0
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_S = 30.0
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """모든 대상의 브레이커가 열려 있어 호출하지 않음"""
+
+
+class DeadlineExceeded(TimeoutError):
+    """재시도를 포함한 마감 시간 초과"""
+
+
+class CallCancelled(RuntimeError):
+    """다른 요청(헤지)이 먼저 응답해 남은 재시도를 그만둠"""
+
+
+class HedgeRejected(HedgeSkipped):
+    """예비 배포의 제어기 자리가 없어 헤지 요청을 보내지 않음"""
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+
+def enabled() -> bool:
+    return os.getenv("LLM_RESILIENCE", "1") != "0"
+
+
+def retry_after_s(exc) -> Optional[float]:
+    """예외에 담긴 HTTP 응답의 retry-after-ms / Retry-After(초 또는 HTTP 날짜) 값"""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        value = headers.get("retry-after-ms")
+        if value:
+            return float(value) / 1000.0
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            parsed = email.utils.parsedate_to_datetime(value)
+            return max(0.0, parsed.timestamp() - time.time())
+    except Exception:
+        return None
+
+
+def classify(exc) -> Tuple[bool, Optional[float]]:
+    """(재시도 가능 여부, Retry-After 초). 4xx 요청 오류는 재시도하지 않음"""
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUS, retry_after_s(exc)
+    # 상태 코드가 없는 연결 실패/타임아웃 (openai.APIConnectionError, APITimeoutError, httpx 예외 등)
+    name = type(exc).__name__
+    if isinstance(exc, (TimeoutError, ConnectionError)) or "Timeout" in name or "Connection" in name:
+        return True, None
+    return False, None
+
+
+def backoff_s(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Retry-After가 있으면 그 값, 없으면 BASE_BACKOFF_S * 2^(attempt-1)에 지터(±50%)"""
+    if retry_after is not None:
+        return min(retry_after, MAX_BACKOFF_S * 4)
+    delay = min(MAX_BACKOFF_S, BASE_BACKOFF_S * (2 ** max(0, attempt - 1)))
+    return delay * random.uniform(0.5, 1.5)
+
+
+class CircuitBreaker:
+    """연속 실패가 threshold에 이르면 열림(OPEN) → reset_s 뒤 시험 호출 1건 허용(HALF_OPEN) → 성공 시 닫힘"""
+
+    def __init__(self, name: str, failure_threshold: Optional[int] = None, reset_s: Optional[float] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or int(_env_float("CIRCUIT_FAILURE_THRESHOLD", DEFAULT_FAILURE_THRESHOLD))
+        self.reset_s = reset_s if reset_s is not None else _env_float("CIRCUIT_RESET_S", DEFAULT_RESET_S)
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.counts = {"successes": 0, "failures": 0, "rejected": 0, "trips": 0}
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_s:
+                self._transition(HALF_OPEN)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.counts["rejected"] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.counts["successes"] += 1
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+            if self.state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.counts["failures"] += 1
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.consecutive_failures >= self.failure_threshold):
+                self.counts["trips"] += 1
+                self.opened_at = time.monotonic()
+                self._transition(OPEN)
+
+    def _transition(self, state: str):
+        previous, self.state = self.state, state
+        level = logging.WARNING if state == OPEN else logging.INFO
+        logger.log(level, f"서킷 브레이커 {self.name}: {previous} → {state}")
+        if _TELEMETRY is not None:
+            try:
+                _TELEMETRY.track_event("circuit_breaker", {
+                    "target": self.name, "from": previous, "to": state,
+                    "consecutive_failures": self.consecutive_failures})
+            except Exception:
+                pass
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.consecutive_failures, **self.counts}
+
+
+_TELEMETRY = None
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def attach_telemetry(telemetry):
+    """브레이커 상태 변화를 기록할 App Insights 클라이언트 (처음 한 번만 설정)"""
+    global _TELEMETRY
+    if telemetry is not None and _TELEMETRY is None:
+        _TELEMETRY = telemetry
+        get_policy().telemetry = telemetry
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    with _BREAKERS_LOCK:
+        breaker = _BREAKERS.get(name)
+        if breaker is None:
+            breaker = _BREAKERS[name] = CircuitBreaker(name)
+        return breaker
+
+
+def breaker_stats() -> Dict[str, Dict]:
+    """{대상 이름: {state, consecutive_failures, successes, failures, rejected, trips}}"""
+    with _BREAKERS_LOCK:
+        breakers = list(_BREAKERS.values())
+    return {b.name: b.stats() for b in breakers}
+
+
+class Target:
+    """호출 대상 하나 (엔드포인트 + 배포). 브레이커는 name 단위로 공유"""
+
+    def __init__(self, endpoint: str, api_key: str, api_version: Optional[str], deployment: str, role: str = "primary"):
+        self.endpoint = endpoint
+        self.api_key = api_key
+        self.api_version = api_version
+        self.deployment = deployment
+        self.role = role
+        host = (endpoint or "").split("//", 1)[-1].split("/", 1)[0]
+        self.name = f"{host}/{deployment}"
+        self.breaker = get_breaker(self.name)
+
+
+def build_targets(env: Dict, deployment: str, kind: str = "chat") -> List[Target]:
+    """주 대상 + (설정되어 있으면) 예비 대상. kind: chat | embedding"""
+    targets = [Target(env.get("azure_endpoint"), env.get("openai_key"), env.get("openai_version"), deployment)]
+    failover_endpoint = os.getenv("AZURE_FAILOVER_ENDPOINT")
+    failover_deployment = os.getenv(f"AZURE_FAILOVER_{kind.upper()}_DEPLOYMENT")
+    if failover_endpoint or failover_deployment:
+        secondary = Target(
+            failover_endpoint or env.get("azure_endpoint"),
+            os.getenv("AZURE_FAILOVER_API_KEY") or env.get("openai_key"),
+            os.getenv("AZURE_FAILOVER_API_VERSION") or env.get("openai_version"),
+            failover_deployment or deployment,
+            role="failover",
+        )
+        if secondary.name != targets[0].name:
+            targets.append(secondary)
+    return targets
+
+
+def call_with_failover(targets: List[Target], call: Callable[[Target], object], deadline_s: float,
+                       max_attempts: Optional[int] = None, cancelled: Optional[threading.Event] = None):
+    """대상 순서(주 → 예비)대로 call(target)을 시도
+
+    - 실패한 대상은 백오프(Retry-After 우선) 동안 쉬게 하고, 그 사이 쉬지 않는 다른 대상이 있으면 바로 전환
+    - 브레이커가 열린 대상은 건너뜀
+    - 재시도할 수 없는 오류(4xx 요청 오류 등)는 그대로 발생
+    - cancelled가 세워지면 다음 시도를 하지 않고 CallCancelled (헤지 경쟁에서 진 쪽)
+    """
+    if max_attempts is None:
+        max_attempts = int(_env_float("LLM_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS))
+    deadline = time.monotonic() + deadline_s
+    cooldown_until = {t.name: 0.0 for t in targets}
+    last_error: Optional[BaseException] = None
+    attempt = 0
+    while attempt < max_attempts:
+        if cancelled is not None and cancelled.is_set():
+            raise CallCancelled("다른 요청이 먼저 응답해 재시도를 중단했습니다.")
+        now = time.monotonic()
+        if now >= deadline:
+            break
+        ready = [t for t in targets if cooldown_until[t.name] <= now]
+        if not ready:
+            # 모든 대상이 쉬는 중이면 가장 먼저 풀리는 시점까지 대기 (마감을 넘기면 포기)
+            wake = min(cooldown_until.values())
+            if wake >= deadline:
+                break
+            if cancelled is not None:
+                cancelled.wait(wake - now)
+            else:
+                time.sleep(wake - now)
+            continue
+        target = next((t for t in ready if t.breaker.allow()), None)
+        if target is None:
+            if last_error is None:
+                raise CircuitOpenError("모든 모델 배포의 서킷 브레이커가 열려 있습니다: " + ", ".join(t.name for t in targets))
+            break
+        attempt += 1
+        try:
+            result = call(target)
+        except Exception as e:
+            retryable, retry_after = classify(e)
+            if not retryable:
+                # 요청 자체의 오류(400 등)는 대상이 응답한 것이므로 브레이커 실패로 세지 않음
+                target.breaker.record_success()
+                raise
+            target.breaker.record_failure()
+            last_error = e
+            delay = backoff_s(attempt, retry_after)
+            cooldown_until[target.name] = time.monotonic() + delay
+            logger.warning(f"{target.name} 호출 실패 ({type(e).__name__}), {delay:.1f}초 뒤 재시도 가능 "
+                           f"[{attempt}/{max_attempts}]")
+            continue
+        target.breaker.record_success()
+        return result
+    if last_error is not None:
+        raise last_error
+    raise DeadlineExceeded(f"{deadline_s:g}초 안에 모델 호출을 완료하지 못했습니다.")
+
+
+class ResilientChatModel:
+    """AzureChatOpenAI 대상별 인스턴스를 감싼 채팅 모델 (stream / invoke)"""
+
+    def __init__(self, env: Dict, deployment: str, **model_kwargs):
+        self.deployment = deployment
+        self.targets = build_targets(env, deployment, "chat")
+        self.call_timeout_s = _env_float("LLM_CALL_TIMEOUT_S", 30.0)
+        self.deadline_s = _env_float("LLM_DEADLINE_S", 60.0)
+        self._model_kwargs = model_kwargs
+        self._models: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _model(self, target: Target):
+        with self._lock:
+            model = self._models.get(target.name)
+            if model is None:
+                from langchain_openai import AzureChatOpenAI
+                # 재시도/타임아웃은 이 래퍼가 관리하므로 SDK 자체 재시도는 끔
+                model = AzureChatOpenAI(
+                    azure_endpoint=target.endpoint,
+                    api_key=target.api_key,
+                    api_version=target.api_version,
+                    azure_deployment=target.deployment,
+                    timeout=self.call_timeout_s,
+                    max_retries=0,
+                    **self._model_kwargs,
+                )
+                self._models[target.name] = model
+            return model
+
+    def primary(self):
+        return self._model(self.targets[0])
+
+    def _open_stream(self, targets: List[Target], messages, kwargs,
+                     cancelled: Optional[threading.Event] = None) -> Tuple:
+        """첫 토큰까지 받은 (대상, 앞 청크 목록, 나머지 청크 iterator). 그 전까지는 재시도/전환"""
+        def call(target):
+            iterator = iter(self._model(target).stream(messages, **kwargs))
+            # 내용 없는 앞 청크(역할, 콘텐츠 필터 결과 등)는 모아 두고 첫 토큰이 올 때까지 받음
+            head = []
+            for chunk in iterator:
+                head.append(chunk)
+                if chunk.content or getattr(chunk, "usage_metadata", None):
+                    break
+            return target, head, iterator
+
+        return call_with_failover(targets, call, self.deadline_s, cancelled=cancelled)
+
+    def _open_hedge(self, messages, kwargs, cancelled: threading.Event) -> Tuple:
+        """예비 배포로 보내는 헤지 요청. 호출자가 잡은 제어기 자리는 주 배포 것이므로 예비 배포 자리를 따로 잡음"""
+        from modules.llm_governor import current_session_id, estimate_request_tokens, get_governor
+        targets = self.targets[1:]
+        governor = get_governor()
+        ticket = None
+        if governor is not None:
+            # 헤지는 기다릴 가치가 없으므로 바로 자리가 없으면 보내지 않음 (동시 호출/토큰 한도 유지)
+            ticket = governor.try_acquire(targets[0].deployment, current_session_id(), "interactive",
+                                          estimate_request_tokens(messages))
+            if ticket is None:
+                raise HedgeRejected(f"{targets[0].deployment} 배포에 여유가 없어 헤지하지 않습니다.")
+        release = (lambda used: governor.release(targets[0].deployment, ticket, used)) if ticket else None
+        try:
+            target, head, iterator = self._open_stream(targets, messages, kwargs, cancelled)
+        except BaseException:
+            if release:
+                release(None)
+            raise
+        if release:
+            iterator = _SlotStream(head, iterator, release)
+        return target, head, iterator
+
+    def stream(self, messages, **kwargs):
+        """첫 토큰을 받을 때까지 재시도/전환(느리면 헤지 요청)한 뒤 나머지 청크를 그대로 전달"""
+        policy = get_policy()
+        # 헤지는 별도 예비 배포가 있을 때만 (같은 배포로 한 번 더 보내면 느린 배포의 부하만 늘어남)
+        if policy.enabled and len(self.targets) > 1:
+            target, head, iterator = hedged_open(
+                lambda cancelled: self._open_stream(self.targets, messages, kwargs, cancelled),
+                lambda cancelled: self._open_hedge(messages, kwargs, cancelled),
+                _close_stream, policy)
+        else:
+            target, head, iterator = self._open_stream(self.targets, messages, kwargs)
+        try:
+            yield from head
+            try:
+                yield from iterator
+            except Exception:
+                # 응답 도중 끊긴 경우도 대상의 실패로 기록 (이미 출력한 토큰 때문에 재시도하지 않음)
+                target.breaker.record_failure()
+                raise
+        finally:
+            # 호출자가 중간에 그만둬도 헤지가 잡은 제어기 자리를 반납
+            if isinstance(iterator, _SlotStream):
+                iterator.close()
+
+    def invoke(self, messages, **kwargs):
+        return call_with_failover(self.targets, lambda t: self._model(t).invoke(messages, **kwargs), self.deadline_s)
+
+
+def _close_stream(handle: Tuple):
+    """헤지에서 진 스트림을 닫아 HTTP 응답을 끊음"""
+    close = getattr(handle[2], "close", None)
+    if close:
+        close()
+
+
+class _SlotStream:
+    """헤지 스트림의 나머지 청크 iterator. 끝나거나 닫힐 때 제어기 자리를 실제 사용 토큰으로 정산해 반납"""
+
+    def __init__(self, head: List, iterator, release: Callable[[Optional[int]], None]):
+        self._iterator = iterator
+        self._release = release
+        self._used: Optional[int] = None
+        self._lock = threading.Lock()
+        for chunk in head:
+            self._count(chunk)
+
+    def _count(self, chunk):
+        usage = getattr(chunk, "usage_metadata", None)
+        if usage:
+            self._used = (self._used or 0) + (usage.get("input_tokens") or 0) + (usage.get("output_tokens") or 0)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            chunk = next(self._iterator)
+        except BaseException:
+            self.close()
+            raise
+        self._count(chunk)
+        return chunk
+
+    def close(self):
+        with self._lock:
+            release, self._release = self._release, None
+        if release is None:
+            return
+        try:
+            close = getattr(self._iterator, "close", None)
+            if close:
+                close()
+        finally:
+            release(self._used)
+
+
+class _ResilientEmbeddings:
+    def __init__(self, owner: "ResilientEmbeddingClient"):
+        self._owner = owner
+
+    def create(self, model: str, input, **kwargs):
+        owner = self._owner
+
+        def call(target):
+            # 주 대상은 호출자가 지정한 배포, 예비 대상은 설정된 예비 배포
+            deployment = model if target.role == "primary" else target.deployment
+            return owner.client_for(target).embeddings.create(model=deployment, input=input, **kwargs)
+
+        return call_with_failover(owner.targets_for(model), call, owner.deadline_s)
+
+
+class ResilientEmbeddingClient:
+    """openai AzureOpenAI와 같은 embeddings.create(...) 인터페이스의 임베딩 클라이언트"""
+
+    def __init__(self, env: Dict):
+        self._env = env
+        self.call_timeout_s = _env_float("EMBED_CALL_TIMEOUT_S", 10.0)
+        self.deadline_s = _env_float("EMBED_DEADLINE_S", 15.0)
+        self._clients: Dict[Tuple, object] = {}
+        self._targets: Dict[str, List[Target]] = {}
+        self._lock = threading.Lock()
+        self.embeddings = _ResilientEmbeddings(self)
+
+    def targets_for(self, deployment: str) -> List[Target]:
+        with self._lock:
+            targets = self._targets.get(deployment)
+            if targets is None:
+                targets = self._targets[deployment] = build_targets(self._env, deployment, "embedding")
+            return targets
+
+    def client_for(self, target: Target):
+        key = (target.endpoint, target.api_key, target.api_version)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                from openai import AzureOpenAI
+                client = AzureOpenAI(
+                    azure_endpoint=target.endpoint,
+                    api_key=target.api_key,
+                    api_version=target.api_version,
+                    timeout=self.call_timeout_s,
+                    max_retries=0,
+                )
+                self._clients[key] = client
+            return client
@@ -0,0 +1,223 @@
+"""
+검색 품질/지연시간 평가 도구
+
+골든 질문 세트(JSONL)를 앱과 같은 검색 경로(rag_pipeline.get_embedding -> retrieve_documents)로 실행하여
+설정(config)별로 recall@k, MRR, 컨텍스트 토큰 수, 검색 지연시간 백분위수를 계산하고 나란히 비교합니다.
+
+골든 세트 형식 (data/golden_questions.jsonl, 한 줄에 하나):
+  {"question": "...", "expected_categories": ["4. 정보보호"], "expected_ids": ["cat-4"]}
+  - expected_ids가 있으면 문서 id 기준, 없으면 category 기준으로 정답 여부를 판단합니다.
+  - category 기준(조항 질문)에서는 카테고리 통합 문서(item_index == -1, id 'cat-N')를 정답으로 치지 않습니다.
+    (조항 질문을 개요로 잘못 분류해 통합 문서만 가져와도 정답으로 보이지 않도록)
+
+백엔드:
+  - local : 9_field.json 로컬 코퍼스(modules/local_backend.py)를 프로세스 안에서 검색
+  - azure : .env(또는 Mock Server 환경변수)의 Azure Search/임베딩 설정을 사용
+
+사용법 (ktds-msai-6th-mvp 폴더에서):
+  python -m modules.retrieval_eval --backend local
+  python -m modules.retrieval_eval --backend azure --config text-k3:text:3 --config vec-k5:vector:5
+  python -m modules.retrieval_eval --configs data/eval_configs.json --report data/bench/eval.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from modules.metrics import summarize, estimate_tokens
+from modules.rag_pipeline import get_env_keys, init_search_client, get_embedding, retrieve_documents, retrieve_with_plan, build_context_text
+from modules.category_matcher import CategoryMatcher
+
+DEFAULT_GOLDEN = os.path.join("data", "golden_questions.jsonl")
+
+# 기본 비교 설정: (이름, 검색 방식, top_k)
+DEFAULT_CONFIGS = [
+    {"name": "text-k3", "mode": "text", "top_k": 3},
+    {"name": "text-k5", "mode": "text", "top_k": 5},
+    {"name": "vector-k3", "mode": "vector", "top_k": 3},
+    {"name": "vector-k5", "mode": "vector", "top_k": 5},
+    {"name": "text+cat-k5", "mode": "text+cat", "top_k": 5},
+    {"name": "vector+cat-k5", "mode": "vector+cat", "top_k": 5},
+]
+# '+cat'은 앱과 같이 카테고리 매처의 필터(category/item_index)를 적용
+SUPPORTED_MODES = ("text", "vector", "text+cat", "vector+cat")
+
+
+def load_golden_set(path=DEFAULT_GOLDEN):
+    items = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                items.append(json.loads(line))
+    return items
+
+
+def parse_config_option(value):
+    """'이름:방식:top_k' 형식의 문자열을 설정 dict로 변환"""
+    parts = value.split(":")
+    if len(parts) != 3:
+        raise ValueError(f"설정 형식이 올바르지 않습니다(이름:방식:top_k): {value}")
+    return {"name": parts[0], "mode": parts[1], "top_k": int(parts[2])}
+
+
+class Backend:
+    """검색 클라이언트/임베딩 클라이언트 묶음 (설정의 index 필드로 인덱스를 바꿀 수 있음)"""
+
+    def __init__(self, kind="local", corpus_path=os.path.join("data", "9_field.json")):
+        self.kind = kind
+        self.env = get_env_keys()
+        self._clients = {}
+        self.matcher = CategoryMatcher.from_file(corpus_path)
+        if kind == "local":
+            from modules.local_backend import LocalCorpus, LocalSearchClient, LocalEmbeddingClient
+
+            corpus = LocalCorpus.from_file(corpus_path)
+            self._local_search = LocalSearchClient(corpus)
+            self.embedding_client = LocalEmbeddingClient(corpus.dimensions)
+            self.env["embedding_deployment"] = "local-hash"
+            self.env["embedding_dimensions"] = corpus.dimensions
+        elif kind == "azure":
+            self.embedding_client = None
+        else:
+            raise ValueError(f"알 수 없는 백엔드입니다: {kind}")
+
+    def search_client(self, index=None):
+        if self.kind == "local":
+            return self._local_search
+        index = index or self.env["search_index"]
+        if index not in self._clients:
+            self._clients[index] = init_search_client(self.env["search_endpoint"], self.env["search_key"], index)
+        return self._clients[index]
+
+
+def judge(doc, item):
+    """검색된 문서가 골든 항목의 정답인지 판단하여 정답 키(id 또는 category)를 반환"""
+    expected_ids = item.get("expected_ids") or []
+    if expected_ids:
+        return doc.get("id") if doc.get("id") in expected_ids else None
+    if is_aggregate(doc):
+        return None
+    cat = doc.get("category")
+    return cat if cat in (item.get("expected_categories") or []) else None
+
+
+def is_aggregate(doc):
+    """카테고리 통합 문서 여부 (검색 select에 item_index가 없으면 id 형식 'cat-N'으로 판단)"""
+    if doc.get("item_index") is not None:
+        return doc.get("item_index") == -1
+    return str(doc.get("id") or "").startswith("cat-")
+
+
+def evaluate_config(config, golden, backend):
+    """설정 하나로 골든 세트를 실행하여 질문별 결과와 요약 지표를 반환"""
+    mode = config.get("mode", "vector")
+    if mode not in SUPPORTED_MODES:
+        raise ValueError(f"지원되지 않는 검색 방식입니다: {mode} (지원: {', '.join(SUPPORTED_MODES)})")
+    top_k = int(config.get("top_k", 5))
+    search_client = backend.search_client(config.get("index"))
+    env = backend.env
+    use_vector = mode.startswith("vector")
+
+    def embed(text):
+        if not use_vector:
+            return None
+        return get_embedding(text, env["embedding_deployment"], env, client=backend.embedding_client)
+
+    errors = []
+    rows = []
+    for item in golden:
+        q = item["question"]
+        t0 = time.perf_counter()
+        if mode.endswith("+cat"):
+            # 임베딩 시간은 검색 계획 안에서 함께 측정됨
+            vec = None
+            t1 = time.perf_counter()
+            docs = retrieve_with_plan(search_client, q, backend.matcher.plan(q, top_k), top_k, embed, on_error=errors.append)
+        else:
+            vec = embed(q)
+            t1 = time.perf_counter()
+            docs = retrieve_documents(search_client, q, vec, top_k, on_error=errors.append)
+        t2 = time.perf_counter()
+        targets = set(item.get("expected_ids") or item.get("expected_categories") or [])
+        hits = set()
+        first_rank = None
+        for rank, d in enumerate(docs, start=1):
+            key = judge(d, item)
+            if key is not None:
+                hits.add(key)
+                if first_rank is None:
+                    first_rank = rank
+        rows.append({
+            "question": q,
+            "recall": (len(hits) / len(targets)) if targets else 0.0,
+            "rr": (1.0 / first_rank) if first_rank else 0.0,
+            "context_tokens": estimate_tokens(build_context_text(docs)),
+            "embedding_ms": (t1 - t0) * 1000,
+            "search_ms": (t2 - t1) * 1000,
+            "latency_ms": (t2 - t0) * 1000,
+            "retrieved": [d.get("id") for d in docs],
+            "embedding_missing": mode == "vector" and vec is None,
+        })
+    n = len(rows) or 1
+    return {
+        "config": config,
+        "recall": sum(r["recall"] for r in rows) / n,
+        "mrr": sum(r["rr"] for r in rows) / n,
+        "context_tokens": summarize([r["context_tokens"] for r in rows]),
+        "latency_ms": summarize([r["latency_ms"] for r in rows]),
+        "search_ms": summarize([r["search_ms"] for r in rows]),
+        "embedding_missing": sum(1 for r in rows if r["embedding_missing"]),
+        "errors": len(errors),
+        "rows": rows,
+    }
+
+
+def print_comparison(results):
+    names = [r["config"]["name"] for r in results]
+    width = max(12, max(len(n) for n in names) + 2)
+    print(f"{'지표':<16}" + "".join(f"{n:>{width}}" for n in names))
+    lines = [
+        ("recall@k", lambda r: f"{r['recall']:.3f}"),
+        ("MRR", lambda r: f"{r['mrr']:.3f}"),
+        ("ctx tokens avg", lambda r: f"{r['context_tokens']['mean']:.0f}"),
+        ("latency p50 ms", lambda r: f"{r['latency_ms']['p50']:.1f}"),
+        ("latency p95 ms", lambda r: f"{r['latency_ms']['p95']:.1f}"),
+        ("latency p99 ms", lambda r: f"{r['latency_ms']['p99']:.1f}"),
+        ("emb missing", lambda r: str(r["embedding_missing"])),
+        ("errors", lambda r: str(r["errors"])),
+    ]
+    for label, fmt in lines:
+        print(f"{label:<16}" + "".join(f"{fmt(r):>{width}}" for r in results))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="검색 품질/지연시간 평가")
+    parser.add_argument("--golden", default=DEFAULT_GOLDEN)
+    parser.add_argument("--backend", choices=["local", "azure"], default="local")
+    parser.add_argument("--config", action="append", default=[], help="이름:방식:top_k (예: vec-k5:vector:5)")
+    parser.add_argument("--configs", help="설정 목록 JSON 파일 ([{\"name\":..., \"mode\":..., \"top_k\":..., \"index\":...}])")
+    parser.add_argument("--report", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    configs = [parse_config_option(c) for c in args.config]
+    if args.configs:
+        with open(args.configs, "r", encoding="utf-8") as f:
+            configs.extend(json.load(f))
+    configs = configs or DEFAULT_CONFIGS
+
+    golden = load_golden_set(args.golden)
+    backend = Backend(args.backend)
+    results = [evaluate_config(c, golden, backend) for c in configs]
+    print(f"골든 세트: {args.golden} ({len(golden)}문항)  백엔드: {args.backend}")
+    print_comparison(results)
+
+    if args.report:
+        os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"golden": args.golden, "backend": args.backend, "results": results}, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
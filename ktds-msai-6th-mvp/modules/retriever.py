@@ -0,0 +1,119 @@
+"""
+검색(Retriever) 서비스 모듈
+
+Azure AI Search 질의를 한 곳에서 만들고 결과를 필요한 필드만 담은 객체로 돌려줍니다.
+
+- select로 필요한 필드(id, domain, category, content)만 요청 (벡터 등 나머지 필드는 전송하지 않음)
+- 하이라이트(highlight) 기반 스니펫 또는 글자 수 기준 스니펫
+- 결과를 지연(lazy) 순회: 필요한 개수를 채우거나 최소 점수(min_score) 아래로 내려가면 다음 페이지를 요청하지 않음
+- 벡터 질의는 VectorizedQuery(vector_queries) 한 가지 방식으로만 호출
+
+app.py(rag_pipeline.retrieve_documents)와 Day 6 실습(lab_07.py)이 같은 API를 사용합니다.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from azure.search.documents.models import VectorizedQuery
+
+DEFAULT_SELECT = ("id", "domain", "category", "content")
+_STANDARD_FIELDS = set(DEFAULT_SELECT)
+HIGHLIGHT_PRE_TAG = "**"
+HIGHLIGHT_POST_TAG = "**"
+
+
+@dataclass
+class RetrievalQuery:
+    """검색 요청 하나
+
+    text: 키워드 검색어 ("*"는 필터 조건만으로 조회). vector만 있으면 순수 벡터 검색
+    filter: OData 필터 (예: category_matcher가 만든 category/item_index 조건)
+    min_score: 이 점수 미만의 결과는 버림 (결과가 점수 내림차순이므로 그 지점에서 순회 중단)
+    snippet_chars: content를 이 글자 수로 자름 (None이면 전체)
+    highlight: 키워드가 걸린 구간만 스니펫으로 사용 (키워드 검색일 때만 의미 있음)
+    """
+    text: Optional[str] = None
+    vector: Optional[List[float]] = None
+    top_k: int = 5
+    filter: Optional[str] = None
+    min_score: Optional[float] = None
+    snippet_chars: Optional[int] = None
+    highlight: bool = False
+
+
+@dataclass
+class RetrievedDoc:
+    id: Optional[str]
+    domain: Optional[str]
+    category: str
+    content: str
+    score: Optional[float]
+    highlights: List[str] = field(default_factory=list)
+    # select에 추가로 지정한 필드 값 (예: brief, brief_hash)
+    extra: Dict = field(default_factory=dict)
+
+    def to_dict(self) -> Dict:
+        """기존 코드(컨텍스트 구성/화면 표시)가 쓰는 dict 형식"""
+        return {
+            "id": self.id,
+            "domain": self.domain,
+            "category": self.category,
+            "content": self.content,
+            "score": self.score,
+        }
+
+
+class Retriever:
+    """SearchClient(또는 같은 search() 인터페이스의 대체 객체)를 감싼 검색 서비스"""
+
+    def __init__(self, search_client, select: Sequence[str] = DEFAULT_SELECT,
+                 vector_field: str = "content_vector", content_field: str = "content"):
+        self.search_client = search_client
+        self.select = list(select)
+        self.vector_field = vector_field
+        self.content_field = content_field
+
+    def _request(self, query: RetrievalQuery):
+        kwargs = {"select": self.select, "top": query.top_k}
+        if query.filter:
+            kwargs["filter"] = query.filter
+        if query.vector is not None:
+            kwargs["vector_queries"] = [
+                VectorizedQuery(vector=query.vector, k_nearest_neighbors=query.top_k, fields=self.vector_field)
+            ]
+        if query.highlight and query.text and query.text != "*":
+            kwargs["highlight_fields"] = self.content_field
+            kwargs["highlight_pre_tag"] = HIGHLIGHT_PRE_TAG
+            kwargs["highlight_post_tag"] = HIGHLIGHT_POST_TAG
+        return self.search_client.search(search_text=query.text, **kwargs)
+
+    def _to_doc(self, r, query: RetrievalQuery) -> RetrievedDoc:
+        content = r.get(self.content_field) or r.get("text") or ""
+        highlights = list((r.get("@search.highlights") or {}).get(self.content_field) or [])
+        if highlights:
+            content = " … ".join(highlights)
+        elif query.snippet_chars and len(content) > query.snippet_chars:
+            content = content[:query.snippet_chars].rstrip() + "…"
+        return RetrievedDoc(
+            id=r.get("id") or r.get("@search.documentId"),
+            domain=r.get("domain"),
+            category=r.get("category") or r.get("title") or "",
+            content=content,
+            score=r.get("@search.score"),
+            highlights=highlights,
+            extra={k: r.get(k) for k in self.select if k not in _STANDARD_FIELDS and k != self.content_field},
+        )
+
+    def iter(self, query: RetrievalQuery) -> Iterator[RetrievedDoc]:
+        """결과를 하나씩 돌려주는 제너레이터 (SDK 페이지는 순회가 필요할 때만 요청됨)"""
+        count = 0
+        for r in self._request(query):
+            score = r.get("@search.score")
+            if query.min_score is not None and score is not None and score < query.min_score:
+                break
+            yield self._to_doc(r, query)
+            count += 1
+            if count >= query.top_k:
+                break
+
+    def search(self, query: RetrievalQuery) -> List[RetrievedDoc]:
+        return list(self.iter(query))
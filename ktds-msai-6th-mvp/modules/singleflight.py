@@ -0,0 +1,162 @@
+"""
+동일 질문 요청 합치기 (Singleflight)
+
+공지 직후처럼 여러 직원이 몇 초 안에 같은 질문을 하면 세션마다 임베딩 → 검색 → LLM 스트리밍을 따로 실행합니다.
+프로세스 공용 SingleFlight는 (정규화한 질문 + 인덱스 버전 + 이전 대화 등) 키가 같은 요청이 실행 중이면
+새로 실행하지 않고 진행 중인 요청에 구독자로 붙어 같은 결과/토큰 스트림을 나눠 받게 합니다.
+(동시에 N명이 물어도 상위 호출은 한 번)
+
+- 파이프라인은 어느 세션에도 속하지 않은 요청별 백그라운드 스레드에서 실행 (첫 요청자가 화면을 떠나도 나머지 구독자는 계속 받음)
+  고정 크기 풀을 쓰지 않으므로 동시 답변 수는 여기서 제한하지 않음 (LLM 호출 동시성은 llm_governor가 대기 순번과 함께 제한)
+- 늦게 붙은 구독자는 이미 나온 청크부터 다시 받은 뒤 이어지는 청크를 받음
+- 완료되면 키를 지우므로 완료된 결과를 캐시하지는 않음 (진행 중인 요청만 합침)
+
+사용 예:
+    flight, leader = SINGLE_FLIGHT.join(key, producer)   # producer(flight)는 새로 실행될 때만 호출
+    flight = SINGLE_FLIGHT.solo(producer)                # 합치지 않고 항상 새로 실행 (SINGLEFLIGHT=0)
+    meta = flight.wait_meta()                            # producer가 set_meta로 넘긴 검색 결과 등
+    for chunk in flight.stream():
+        ...
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from modules.category_matcher import normalize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT_S = 300.0
+
+
+def flight_key(question: str, *parts) -> Tuple:
+    """띄어쓰기/대소문자/문장부호 차이를 무시한 질문 + 결과에 영향을 주는 나머지 값"""
+    text = normalize(question).rstrip("?？.!")
+    return (text,) + tuple(parts)
+
+
+class Flight:
+    """실행 중인 요청 하나의 결과(meta)와 청크 목록. 구독자 수와 무관하게 producer는 한 번만 실행됨"""
+
+    def __init__(self, key):
+        self.key = key
+        self.started = time.monotonic()
+        self.subscribers = 1
+        self.meta: Optional[Dict] = None
+        # 진행 상태 (예: {"queue_position": 3}) — 첫 청크 전까지 구독자 화면에 표시
+        self.status: Dict = {}
+        self.error: Optional[BaseException] = None
+        self.done = False
+        self._chunks: List[Any] = []
+        self._cond = threading.Condition()
+
+    # --- producer 쪽 ---
+    def set_meta(self, meta: Dict):
+        with self._cond:
+            self.meta = meta
+            self._cond.notify_all()
+
+    def set_status(self, **status):
+        with self._cond:
+            self.status = dict(self.status, **status)
+            self._cond.notify_all()
+
+    def publish(self, chunk):
+        with self._cond:
+            self._chunks.append(chunk)
+            self._cond.notify_all()
+
+    def close(self, error: Optional[BaseException] = None):
+        with self._cond:
+            self.error = error
+            self.done = True
+            if self.meta is None:
+                self.meta = {}
+            self._cond.notify_all()
+
+    # --- 구독자 쪽 ---
+    def wait_meta(self, timeout_s: float = DEFAULT_TIMEOUT_S) -> Dict:
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.meta is not None, timeout=timeout_s):
+                raise TimeoutError("요청 결과를 기다리는 시간이 초과되었습니다.")
+            if self.error is not None and not self._chunks:
+                raise self.error
+            return self.meta
+
+    def wait_started(self, timeout_s: float) -> bool:
+        """첫 청크가 나왔거나 끝났으면 True. timeout_s 동안 상태 변화가 없으면 False"""
+        with self._cond:
+            if self._chunks or self.done:
+                return True
+            self._cond.wait(timeout=timeout_s)
+            return bool(self._chunks or self.done)
+
+    def stream(self, timeout_s: float = DEFAULT_TIMEOUT_S) -> Iterator[Any]:
+        """처음부터 모든 청크를 순서대로 반환 (producer가 끝날 때까지 대기)"""
+        pos = 0
+        while True:
+            with self._cond:
+                if not self._cond.wait_for(lambda: pos < len(self._chunks) or self.done, timeout=timeout_s):
+                    raise TimeoutError("토큰 스트림을 기다리는 시간이 초과되었습니다.")
+                pending = self._chunks[pos:]
+                finished = self.done
+                error = self.error
+            for chunk in pending:
+                yield chunk
+            pos += len(pending)
+            if finished and pos >= len(self._chunks):
+                if error is not None:
+                    raise error
+                return
+
+
+class SingleFlight:
+    """키별로 실행 중인 Flight를 관리하는 프로세스 공용 레지스트리"""
+
+    def __init__(self):
+        self._flights: Dict[Any, Flight] = {}
+        self._lock = threading.Lock()
+        self.stats = {"leaders": 0, "followers": 0}
+
+    def join(self, key, producer: Callable[[Flight], None]) -> Tuple[Flight, bool]:
+        """(flight, leader). 같은 키가 실행 중이면 그 flight에 붙고 leader=False"""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.subscribers += 1
+                self.stats["followers"] += 1
+                return flight, False
+            flight = Flight(key)
+            self._flights[key] = flight
+            self.stats["leaders"] += 1
+        self._start(flight, producer)
+        return flight, True
+
+    def solo(self, producer: Callable[[Flight], None]) -> Flight:
+        """키에 등록하지 않고 바로 실행 (다른 요청과 합치지 않음)"""
+        flight = Flight(None)
+        self._start(flight, producer)
+        return flight
+
+    def _start(self, flight: Flight, producer: Callable[[Flight], None]):
+        # 스트림이 끝날 때까지 스레드를 점유하므로 풀 대신 요청마다 스레드 (풀이 차면 대기 순번 없이 밀림)
+        threading.Thread(target=self._run, args=(flight, producer), name="singleflight", daemon=True).start()
+
+    def _run(self, flight: Flight, producer: Callable[[Flight], None]):
+        error = None
+        try:
+            producer(flight)
+        except BaseException as e:
+            logger.exception("singleflight 요청 실패")
+            error = e
+        finally:
+            # 완료 전에 키를 지워 이후 요청은 새로 실행 (이미 붙은 구독자는 남은 청크를 계속 받음)
+            with self._lock:
+                if flight.key is not None and self._flights.get(flight.key) is flight:
+                    del self._flights[flight.key]
+            flight.close(error)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
@@ -0,0 +1,70 @@
+"""
+스트리밍 응답 렌더러
+
+모델 스트리밍 청크마다 placeholder.markdown(전체 문자열)을 호출하면
+답변 길이에 대해 제곱으로 늘어나는 문자열 재전송/재렌더링이 발생합니다.
+StreamRenderer는 청크를 리스트 버퍼에 모아 두었다가 시간 간격 또는 누적 바이트 수 기준으로만 화면을 갱신합니다.
+
+- 첫 토큰은 즉시 표시 (체감 첫 응답 시간 유지)
+- 이후에는 interval_s가 지났거나 아직 표시하지 않은 바이트가 max_pending_bytes 이상일 때만 갱신
+- close()에서 남은 내용을 반드시 표시
+"""
+import time
+from typing import Callable, List
+
+DEFAULT_INTERVAL_S = 0.05
+DEFAULT_MAX_PENDING_BYTES = 512
+
+
+class StreamRenderer:
+    """render(전체 텍스트) 호출 횟수를 줄이는 스트리밍 버퍼
+
+    사용 예:
+        renderer = StreamRenderer(placeholder.markdown)
+        for chunk in model.stream(messages):
+            renderer.write(chunk.content)
+        response_text = renderer.close()
+    """
+
+    def __init__(self, render: Callable[[str], object], interval_s: float = DEFAULT_INTERVAL_S,
+                 max_pending_bytes: int = DEFAULT_MAX_PENDING_BYTES, clock: Callable[[], float] = time.monotonic):
+        self._render = render
+        self._interval_s = interval_s
+        self._max_pending_bytes = max_pending_bytes
+        self._clock = clock
+        self._parts: List[str] = []
+        self._pending_bytes = 0
+        self._last_flush = None
+        self.chunks = 0
+        self.flushes = 0
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def write(self, piece: str):
+        if not piece:
+            return
+        self._parts.append(piece)
+        self.chunks += 1
+        self._pending_bytes += len(piece.encode("utf-8"))
+        now = self._clock()
+        if (self._last_flush is None
+                or now - self._last_flush >= self._interval_s
+                or self._pending_bytes >= self._max_pending_bytes):
+            self._flush(now)
+
+    def _flush(self, now=None):
+        # 여러 조각을 한 문자열로 합쳐 다음 flush부터는 합치는 비용이 작게 유지되도록 함
+        text = "".join(self._parts)
+        self._parts = [text]
+        self._render(text)
+        self._pending_bytes = 0
+        self._last_flush = self._clock() if now is None else now
+        self.flushes += 1
+
+    def close(self) -> str:
+        """남은 내용을 표시하고 전체 텍스트를 반환"""
+        if self._pending_bytes:
+            self._flush()
+        return self.text